@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+توحيد النص العربي وتقسيمه إلى كلمات - سوق الإمارات
+مشترك بين فهرس البحث وحساب المنتجات ذات الصلة حتى تتطابق الكلمات في الاثنين
+"""
+
+import re
+
+# أقصر كلمة تدخل الفهرس
+MIN_TOKEN_LENGTH = 2
+
+# التشكيل والتطويل وعلامات القرآن
+_ARABIC_DIACRITICS = re.compile(r'[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+# رموز التنسيق في الأوصاف
+_TEXT_NOISE = re.compile(r'\*\*|&nbsp;|\ufeff')
+_ARABIC_LETTER_VARIANTS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+})
+_TOKEN_PATTERN = re.compile(r'[^\W_]+')
+# أداة التعريف في بداية الكلمة (وال، بال، كال، فال، ال)
+_ARABIC_ARTICLE = re.compile(r'^[وبكف]?ال(?=..)')
+
+def normalize_text(text):
+    """توحيد النص العربي للبحث: حذف التشكيل ورموز التنسيق وتوحيد أشكال الألف والياء والتاء المربوطة"""
+    text = _TEXT_NOISE.sub(' ', text or '')
+    text = _ARABIC_DIACRITICS.sub('', text)
+    return text.translate(_ARABIC_LETTER_VARIANTS).lower()
+
+def tokenize(text):
+    """كلمات النص بعد التوحيد وحذف أداة التعريف (بدون الكلمات الأقصر من MIN_TOKEN_LENGTH)"""
+    tokens = (_ARABIC_ARTICLE.sub('', token) for token in _TOKEN_PATTERN.findall(normalize_text(text)))
+    return [token for token in tokens if len(token) >= MIN_TOKEN_LENGTH]
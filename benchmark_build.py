@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+قياس أداء سكربتات البناء على كتالوج عربي اصطناعي - سوق الإمارات
+يولد كتالوجًا حتميًا بنفس مخطط uae-products.json بأحجام 1k حتى 1M، ويقيس كل مرحلة في عملية منفصلة
+(الزمن، عدد العناصر في الثانية، أقصى ذاكرة) ويقارن النتائج بخط أساس محفوظ
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from html import escape as html_escape
+from multiprocessing import get_context
+from pathlib import Path
+
+from build_output import OutputWriter
+from build_report import peak_rss_mb
+
+BENCHMARK_BASELINE_PATH = 'data/benchmark-baseline.json'
+BENCHMARK_SEED = 2024
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_TOLERANCE = 0.10
+
+# ترتيب المراحل مهم: pages-incremental يعيد تشغيل البناء على مخرجات pages
+STAGES = ('slug', 'render', 'related', 'dedup', 'pages', 'pages-incremental', 'sitemap', 'seo')
+
+# مفردات الكتالوج الاصطناعي لكل فئة: (أسماء، صفات)
+CATEGORY_VOCABULARY = {
+    'الأجهزة المنزلية والكهربائية': (
+        ('غسالة', 'مكنسة', 'خلاط', 'مكواة', 'مروحة', 'سخان', 'قلاية هوائية', 'ماكينة قهوة'),
+        ('محمولة', 'كهربائية', 'ذكية', 'لاسلكية', 'موفرة للطاقة', 'قابلة للطي'),
+    ),
+    'منتجات متنوعة': (
+        ('منظم', 'حقيبة', 'مصباح', 'ساعة حائط', 'مرآة', 'صندوق تخزين', 'حامل'),
+        ('متعدد الاستخدامات', 'عملي', 'أنيق', 'مقاوم للماء', 'خفيف الوزن'),
+    ),
+    'العناية الشخصية والصحة والجمال': (
+        ('ماكينة حلاقة', 'مجفف شعر', 'مكواة شعر', 'جهاز مساج', 'فرشاة تنظيف', 'سيروم'),
+        ('احترافي', 'لاسلكي', 'قابل للشحن', 'طبيعي', 'للبشرة الحساسة'),
+    ),
+    'الإلكترونيات والتكنولوجيا': (
+        ('سماعة', 'شاحن', 'كاميرا مراقبة', 'ساعة ذكية', 'باور بانك', 'مكبر صوت'),
+        ('لاسلكية', 'سريع', 'بلوتوث', 'مقاومة للماء', 'بدقة عالية'),
+    ),
+    'الأثاث والأدوات المنزلية': (
+        ('كرسي', 'طاولة', 'رف', 'سلة غسيل', 'ستارة', 'وسادة'),
+        ('خشبي', 'قابل للتعديل', 'مريح', 'عصري', 'قابل للطي'),
+    ),
+    'السيارات والإكسسوارات': (
+        ('شاحن سيارة', 'حامل جوال', 'منفاخ إطارات', 'كاميرا سيارة', 'معطر سيارة'),
+        ('بإضاءة', 'مغناطيسي', 'رقمي', 'محمول', 'سريع'),
+    ),
+    'أدوات الحديقة والخارج': (
+        ('خرطوم', 'مقص تقليم', 'خيمة', 'مصباح شمسي', 'رشاش مياه'),
+        ('مرن', 'يعمل بالطاقة الشمسية', 'متين', 'قابل للتمدد'),
+    ),
+    'الرياضة واللياقة والصحة': (
+        ('حبل قفز', 'دمبل', 'حزام رياضي', 'سجادة يوغا', 'جهاز تمارين'),
+        ('قابل للتعديل', 'مضاد للانزلاق', 'منزلي', 'احترافي'),
+    ),
+}
+
+FEATURE_PHRASES = (
+    'تصميم عصري يناسب جميع الاستخدامات',
+    'مصنوع من مواد عالية الجودة تدوم طويلًا',
+    'سهل الاستخدام والتنظيف',
+    'موفر للطاقة ويقلل الاستهلاك',
+    'خفيف الوزن وسهل الحمل أثناء السفر',
+    'آمن للاستخدام اليومي لجميع أفراد الأسرة',
+    'يأتي مع ضمان الجودة وخدمة ما بعد البيع',
+)
+
+FEATURE_HEADINGS = ('سهولة الاستخدام', 'جودة عالية', 'توفير الطاقة', 'تصميم أنيق', 'أمان تام', 'قوة الأداء')
+
+MATERIALS = ('عالي الجودة', 'بلاستيك', 'ستانلس ستيل', 'خشب', 'قماش', 'ألمنيوم')
+
+def synthetic_product(index, rng):
+    """منتج اصطناعي واحد بنفس حقول uae-products.json (عنوان ووصف عربيان واقعيان)"""
+    category = rng.choice(tuple(CATEGORY_VOCABULARY))
+    nouns, adjectives = CATEGORY_VOCABULARY[category]
+    title = f"{rng.choice(nouns)} {rng.choice(adjectives)}"
+    if rng.random() < 0.5:
+        title += f" {rng.choice(adjectives)}"
+    if rng.random() < 0.3:
+        title += f" موديل {rng.randint(100, 9999)}"
+
+    features = ''.join(
+        f"{number}. **{rng.choice(FEATURE_HEADINGS)}:**&nbsp;&nbsp;- {rng.choice(FEATURE_PHRASES)}."
+        for number in range(1, rng.randint(3, 9))
+    )
+    description = f"**{title}:**استمتع بأفضل تجربة مع {title}. إليك بعض الميزات:{features}اطلب الآن من سوق الإمارات."
+
+    regular_price = rng.randrange(50, 1500, 5)
+    discount = rng.choice((0, 10, 15, 20, 25, 30, 40, 50))
+    sale_price = round(regular_price * (100 - discount) / 100)
+    product_id = str(index + 1)
+    return {
+        'id': product_id,
+        'title': title,
+        'description': description,
+        'category': category,
+        'brand': 'none',
+        'regular_price': regular_price,
+        'sale_price': sale_price,
+        'currency': 'AED',
+        'discount_percentage': discount,
+        'stock_status': 'in stock' if rng.random() < 0.9 else 'out of stock',
+        'condition': 'new',
+        'image_url': f"https://easyorders.fra1.digitaloceanspaces.com/{rng.getrandbits(60)}.png",
+        'seo_title': f"{title} - اشتري أونلاين في الإمارات",
+        'meta_description': f"اشتري {title} بأفضل سعر في الإمارات. {description[:80]}... شحن مجاني ودفع عند الاستلام.",
+        'seo_keywords': ', '.join(title.split()),
+        'url_slug': '-'.join(title.split()),
+        'average_rating': round(rng.uniform(3.5, 5.0), 1),
+        'review_count': rng.randint(0, 500),
+        'has_variants': False,
+        'free_shipping_threshold': 100,
+        'delivery_time': '1-3 أيام عمل',
+        'cod_available': True,
+        'uae_compliant': True,
+        'material': rng.choice(MATERIALS),
+    }
+
+def iter_synthetic_products(count, seed=BENCHMARK_SEED):
+    """توليد count منتجًا حتميًا (نفس البذرة ← نفس الكتالوج)"""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield synthetic_product(index, rng)
+
+def write_synthetic_catalog(path, count, seed=BENCHMARK_SEED):
+    """كتابة الكتالوج الاصطناعي بصيغة NDJSON سطرًا سطرًا (يقرؤه iter_products مباشرة)"""
+    with OutputWriter().open(path) as f:
+        for product in iter_synthetic_products(count, seed):
+            f.write(json.dumps(product, ensure_ascii=False))
+            f.write('\n')
+    return path
+
+def _legacy_page_html(product):
+    """صفحة منتج بدون كتلة سيو الكتالوج كما يعالجها seo_sooq_alemarat_by_files.py"""
+    title = html_escape(product['title'])
+    return (
+        f'<!DOCTYPE html>\n<html lang="ar" dir="rtl">\n<head>\n<meta charset="UTF-8">\n'
+        f'<title>{title}</title>\n</head>\n<body>\n<h1>{title}</h1>\n'
+        f'<img src="{html_escape(product["image_url"])}" alt="{title}">\n'
+        f'<p class="price">{product["sale_price"]} درهم</p>\n'
+        f'<p>{html_escape(product["description"])}</p>\n</body>\n</html>\n'
+    )
+
+def _stage_slug(catalog_path, jobs):
+    from generate_static_pages import iter_products
+    from slug_registry import create_arabic_slug
+    items = 0
+    start = time.perf_counter()
+    for product in iter_products(catalog_path):
+        create_arabic_slug(product['title'], product['id'])
+        items += 1
+    return time.perf_counter() - start, items
+
+def _stage_render(catalog_path, jobs):
+    from generate_static_pages import create_product_page_html, iter_products
+    items = 0
+    start = time.perf_counter()
+    for product in iter_products(catalog_path):
+        create_product_page_html(product)
+        items += 1
+    return time.perf_counter() - start, items
+
+def _stage_related(catalog_path, jobs):
+    from generate_static_pages import iter_products
+    from related_products import compute_related_products
+    start = time.perf_counter()
+    related = compute_related_products(iter_products(catalog_path), cache_path=None)
+    return time.perf_counter() - start, len(related)
+
+def _stage_dedup(catalog_path, jobs):
+    from dedup_products import find_duplicate_clusters
+    from generate_static_pages import iter_products
+    start = time.perf_counter()
+    _, total = find_duplicate_clusters(iter_products(catalog_path))
+    return time.perf_counter() - start, total
+
+def _stage_pages(catalog_path, jobs):
+    from generate_static_pages import generate_all_product_pages, iter_products
+    start = time.perf_counter()
+    generated = generate_all_product_pages(iter_products(catalog_path), jobs=jobs)
+    return time.perf_counter() - start, len(generated)
+
+def _stage_sitemap(catalog_path, jobs):
+    from generate_static_pages import create_sitemap, iter_products
+    from slug_registry import create_arabic_slug
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    pages = ({'filename': f"{create_arabic_slug(product['title'], product['id'])}.html", 'lastmod': now}
+             for product in iter_products(catalog_path))
+    start = time.perf_counter()
+    count = create_sitemap(pages, base_url='https://example.com', output_dir='sitemap')
+    return time.perf_counter() - start, count
+
+def _stage_seo(catalog_path, jobs):
+    from generate_static_pages import iter_products
+    from seo_sooq_alemarat_by_files import process_file
+    folder = Path('legacy-pages')
+    folder.mkdir(exist_ok=True)
+    paths = []
+    for product in iter_products(catalog_path):
+        path = folder / f"{product['id']}.html"
+        path.write_text(_legacy_page_html(product), encoding='utf-8')
+        paths.append(path)
+    writer = OutputWriter()
+    start = time.perf_counter()
+    for path in paths:
+        process_file(path, writer)
+    return time.perf_counter() - start, len(paths)
+
+_STAGE_RUNNERS = {
+    'slug': _stage_slug,
+    'render': _stage_render,
+    'related': _stage_related,
+    'dedup': _stage_dedup,
+    'pages': _stage_pages,
+    'pages-incremental': _stage_pages,
+    'sitemap': _stage_sitemap,
+    'seo': _stage_seo,
+}
+
+def _run_stage(stage, catalog_path, workdir, jobs, repo_dir):
+    """تشغيل مرحلة واحدة داخل عملية جديدة (حتى تقيس أقصى ذاكرة لهذه المرحلة وحدها)"""
+    # مجلد العمل يتغير، فيضاف مسار المستودع حتى تُستورد سكربتات البناء
+    sys.path.insert(0, repo_dir)
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        seconds, items = _STAGE_RUNNERS[stage](catalog_path, jobs)
+    return {
+        'seconds': round(seconds, 4),
+        'items': items,
+        'items_per_sec': round(items / seconds, 1) if seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def run_benchmarks(sizes=DEFAULT_SIZES, stages=STAGES, jobs=1, seed=BENCHMARK_SEED, workdir=None):
+    """تشغيل المراحل على كل حجم وإرجاع {"stage@size": نتيجة}"""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    root = workdir or tempfile.mkdtemp(prefix='sooq-bench-')
+    results = {}
+    context = get_context('spawn')
+    try:
+        for size in sizes:
+            catalog_path = os.path.join(root, f"synthetic-{size}-{seed}.ndjson")
+            if not os.path.exists(catalog_path):
+                print(f"🧪 توليد كتالوج اصطناعي من {size} منتج...")
+                write_synthetic_catalog(catalog_path, size, seed)
+            size_dir = os.path.join(root, f"run-{size}")
+            shutil.rmtree(size_dir, ignore_errors=True)
+            for stage in stages:
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    result = pool.submit(_run_stage, stage, catalog_path, size_dir, jobs, repo_dir).result()
+                results[f"{stage}@{size}"] = result
+                print(f"   ⏱️ {stage}@{size}: {result['seconds']:.3f} ث، "
+                      f"{result['items_per_sec']} عنصر/ث، ذاكرة {result['peak_rss_mb']} MB")
+    finally:
+        if workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+def load_baseline(path=BENCHMARK_BASELINE_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_baseline(results, path=BENCHMARK_BASELINE_PATH, jobs=1, seed=BENCHMARK_SEED):
+    baseline = {
+        'created': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'jobs': jobs,
+        'seed': seed,
+        'results': results,
+    }
+    OutputWriter().write(path, json.dumps(baseline, ensure_ascii=False, indent=2) + '\n')
+
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """مقارنة السرعة والذاكرة بخط الأساس؛ تعيد قائمة المراحل التي تراجعت أكثر من tolerance"""
+    regressions = []
+    print(f"\n📊 المقارنة مع خط الأساس ({baseline.get('created', '?')}، Python {baseline.get('python', '?')}):")
+    for key, result in results.items():
+        old = baseline.get('results', {}).get(key)
+        if not old:
+            print(f"   ➕ {key}: لا توجد قيمة سابقة")
+            continue
+        notes = []
+        if old.get('items_per_sec') and result['items_per_sec']:
+            speed = result['items_per_sec'] / old['items_per_sec']
+            notes.append(f"السرعة ×{speed:.2f}")
+            if speed < 1 - tolerance:
+                regressions.append(f"{key} (السرعة ×{speed:.2f})")
+        if old.get('peak_rss_mb') and result['peak_rss_mb']:
+            memory = result['peak_rss_mb'] / old['peak_rss_mb']
+            notes.append(f"الذاكرة ×{memory:.2f}")
+            if memory > 1 + tolerance:
+                regressions.append(f"{key} (الذاكرة ×{memory:.2f})")
+        print(f"   {'⚠️' if any(r.startswith(key + ' ') for r in regressions) else '✅'} {key}: {'، '.join(notes)}")
+    return regressions
+
+def parse_size(text):
+    """قراءة حجم مثل 1000 أو 10k أو 1m"""
+    text = text.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='قياس أداء سكربتات البناء على كتالوج اصطناعي - سوق الإمارات')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='أحجام الكتالوج مفصولة بفواصل (مثل 1k,10k,100k,1m)')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"المراحل المطلوب قياسها من: {', '.join(STAGES)}")
+    parser.add_argument('--jobs', type=int, default=1, metavar='N', help='عدد العمليات لمرحلة توليد الصفحات')
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED, help='بذرة الكتالوج الاصطناعي')
+    parser.add_argument('--workdir', help='مجلد العمل (يُحتفظ به لإعادة استخدام الكتالوجات المولدة)')
+    parser.add_argument('--baseline', default=BENCHMARK_BASELINE_PATH, help='مسار ملف خط الأساس')
+    parser.add_argument('--save-baseline', action='store_true', help='حفظ النتائج كخط أساس جديد')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='نسبة التراجع المسموحة قبل اعتبارها تراجعًا في الأداء')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='الخروج برمز 1 عند وجود تراجع عن خط الأساس')
+    parser.add_argument('--generate-only', metavar='PATH',
+                        help='كتابة كتالوج اصطناعي بأول حجم في --sizes إلى PATH والخروج')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in _STAGE_RUNNERS]
+    if unknown:
+        print(f"❌ مراحل غير معروفة: {', '.join(unknown)}")
+        return 2
+    if args.generate_only:
+        write_synthetic_catalog(args.generate_only, sizes[0], args.seed)
+        print(f"✅ تم كتابة {sizes[0]} منتج اصطناعي في {args.generate_only}")
+        return 0
+    if 'pages-incremental' in stages and 'pages' not in stages:
+        print("⚠️ pages-incremental بدون pages يقيس بناءً كاملًا")
+
+    print(f"🏁 قياس الأداء: الأحجام {sizes}، المراحل {stages}، jobs={args.jobs}")
+    results = run_benchmarks(sizes, stages, args.jobs, args.seed, args.workdir)
+
+    baseline = load_baseline(args.baseline)
+    regressions = compare_with_baseline(results, baseline, args.tolerance) if baseline else []
+    if baseline is None:
+        print(f"\nℹ️ لا يوجد خط أساس في {args.baseline} (استخدم --save-baseline لحفظه)")
+    if args.save_baseline:
+        save_baseline(results, args.baseline, args.jobs, args.seed)
+        print(f"💾 تم حفظ خط الأساس في {args.baseline}")
+    if regressions:
+        print(f"\n⚠️ تراجع في الأداء: {'، '.join(regressions)}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تقسيم الكتالوج إلى صفحات JSON صغيرة لكل فئة - سوق الإمارات
+كل صفحة تحتوي بطاقات مختصرة (بدون الوصف) بعدد ثابت، واسم الملف مشتق من محتواه فيمكن تخزينه مؤقتًا للأبد
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+
+from build_output import OutputWriter
+from build_service_worker import write_service_worker
+from generate_static_pages import PRODUCTS_PATH, iter_products
+from slug_registry import load_product_urls
+
+CATALOG_SHARDS_FOLDER = 'data/catalog'
+CATALOG_MANIFEST_NAME = 'manifest.json'
+CATALOG_SHARDS_VERSION = 1
+CARDS_PAGE_SIZE = 24
+
+# الفئة الشاملة لكل المنتجات (للصفحة الرئيسية)
+ALL_CATEGORY_KEY = 'all'
+
+# حقول بطاقة المنتج كما تحتاجها صفحات الفئات والرئيسية
+CARD_FIELDS = (
+    'id', 'title', 'category', 'regular_price', 'sale_price', 'currency', 'discount_percentage',
+    'image_url', 'stock_status', 'average_rating', 'review_count',
+)
+
+_SHARD_FILE_PATTERN = re.compile(r'cards-[0-9a-f]+\.json')
+
+def product_card(product, page_path=None):
+    """بطاقة مختصرة للمنتج: الحقول المعروضة في القوائم مع مسار صفحته الثابتة من جدول الروابط"""
+    card = {field: product[field] for field in CARD_FIELDS if field in product}
+    if page_path:
+        card['url'] = page_path
+    return card
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+
+class _CategoryPager:
+    """يجمع بطاقات فئة واحدة ويكتب صفحة كلما امتلأت، فلا يبقى في الذاكرة أكثر من صفحة لكل فئة"""
+
+    def __init__(self, output_folder, writer, page_size):
+        self.output_folder = output_folder
+        self.writer = writer
+        self.page_size = page_size
+        self.cards = []
+        self.count = 0
+        self.pages = []
+
+    def add(self, card):
+        self.cards.append(card)
+        self.count += 1
+        if len(self.cards) >= self.page_size:
+            self.flush()
+
+    def flush(self):
+        if not self.cards:
+            return
+        content = json.dumps(self.cards, ensure_ascii=False, separators=(',', ':'))
+        digest = content_hash(content)
+        filename = f"cards-{digest}.json"
+        self.writer.write(os.path.join(self.output_folder, filename), content)
+        self.pages.append({'file': filename, 'hash': digest, 'count': len(self.cards)})
+        self.cards = []
+
+def build_catalog_shards(products, output_folder=CATALOG_SHARDS_FOLDER, page_size=CARDS_PAGE_SIZE, writer=None):
+    """كتابة صفحات البطاقات لكل فئة وملف manifest.json بعددها وبصمات صفحاتها
+
+    تعيد (عدد المنتجات، عدد الفئات، عدد الصفحات).
+    """
+    writer = writer or OutputWriter()
+    os.makedirs(output_folder, exist_ok=True)
+    pagers = {ALL_CATEGORY_KEY: _CategoryPager(output_folder, writer, page_size)}
+    product_urls = load_product_urls()
+    for product in products:
+        card = product_card(product, product_urls.get(str(product.get('id', ''))))
+        category = product.get('category') or ''
+        if category not in pagers:
+            pagers[category] = _CategoryPager(output_folder, writer, page_size)
+        pagers[ALL_CATEGORY_KEY].add(card)
+        pagers[category].add(card)
+
+    categories = {}
+    for category, pager in pagers.items():
+        pager.flush()
+        categories[category] = {'count': pager.count, 'pages': pager.pages}
+    manifest = {
+        'version': CATALOG_SHARDS_VERSION,
+        'page_size': page_size,
+        'total': pagers[ALL_CATEGORY_KEY].count,
+        'categories': categories,
+    }
+    writer.write(os.path.join(output_folder, CATALOG_MANIFEST_NAME),
+                 json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    # حذف الصفحات التي لم تعد في manifest
+    live = {page['file'] for pager in pagers.values() for page in pager.pages}
+    for name in os.listdir(output_folder):
+        if _SHARD_FILE_PATTERN.fullmatch(name) and name not in live:
+            writer.delete(os.path.join(output_folder, name))
+    return manifest['total'], len(categories) - 1, len(live)
+
+def shard_layout(products, page_size=CARDS_PAGE_SIZE):
+    """تقسيم صفحات البطاقات كما يكتبها build_catalog_shards: {الفئة: [[مواضع منتجات كل صفحة]]}"""
+    layout = {ALL_CATEGORY_KEY: []}
+    for position, product in enumerate(products):
+        for category in (ALL_CATEGORY_KEY, product.get('category') or ''):
+            pages = layout.setdefault(category, [])
+            if not pages or len(pages[-1]) >= page_size:
+                pages.append([])
+            pages[-1].append(position)
+    return layout
+
+def update_catalog_shards(products, positions, layout, product_urls, output_folder=CATALOG_SHARDS_FOLDER,
+                          writer=None):
+    """إعادة كتابة صفحات البطاقات التي تحتوي المنتجات في positions فقط وتحديث manifest.json
+
+    layout من shard_layout ويبقى صالحًا ما دامت الفئات وترتيب المنتجات ثابتة. تعيد عدد الصفحات المتغيرة.
+    """
+    writer = writer or OutputWriter()
+    manifest_path = os.path.join(output_folder, CATALOG_MANIFEST_NAME)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    positions = set(positions)
+    replaced = set()
+    changed = 0
+    for category, pages in layout.items():
+        entries = manifest['categories'][category]['pages']
+        for entry, members in zip(entries, pages):
+            if positions.isdisjoint(members):
+                continue
+            cards = [product_card(products[position], product_urls.get(str(products[position].get('id', ''))))
+                     for position in members]
+            content = json.dumps(cards, ensure_ascii=False, separators=(',', ':'))
+            digest = content_hash(content)
+            if digest == entry['hash']:
+                continue
+            writer.write(os.path.join(output_folder, f"cards-{digest}.json"), content)
+            replaced.add(entry['file'])
+            entry.update(file=f"cards-{digest}.json", hash=digest)
+            changed += 1
+    if changed:
+        writer.write(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2))
+        live = {page['file'] for category in manifest['categories'].values() for page in category['pages']}
+        for name in replaced - live:
+            writer.delete(os.path.join(output_folder, name))
+    return changed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='تقسيم الكتالوج إلى صفحات JSON لكل فئة - سوق الإمارات')
+    parser.add_argument('--products', default=PRODUCTS_PATH, help='مسار ملف المنتجات (JSON أو NDJSON)')
+    parser.add_argument('--output', default=CATALOG_SHARDS_FOLDER, help='مجلد صفحات البطاقات')
+    parser.add_argument('--page-size', type=int, default=CARDS_PAGE_SIZE, help='عدد البطاقات في كل صفحة')
+    args = parser.parse_args(argv)
+    writer = OutputWriter()
+    try:
+        total, categories, pages = build_catalog_shards(iter_products(args.products), args.output,
+                                                        args.page_size, writer)
+    except Exception as e:
+        print(f"❌ حدث خطأ: {e}")
+        return 1
+    print(f"🗂️ تم تقسيم {total} منتج في {categories} فئة إلى {pages} صفحة ({args.output})")
+    # أول صفحات كل فئة في قائمة التخزين المسبق، فتتبع بصماتها الجديدة
+    write_service_worker(writer)
+    print(writer.summary())
+
+if __name__ == "__main__":
+    raise SystemExit(main())
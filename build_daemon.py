@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+خادم بناء مقيم لتحديثات الأسعار والمخزون - سوق الإمارات
+يبقي الكتالوج وبيان البناء والقالب المجمّع في الذاكرة، ويستقبل دفعات تعديل JSON عبر HTTP محلي
+أو Unix socket، ويحدّث صفحات المنتجات المتأثرة وسجلاتها وصفحات الفئات وأجزاء الكتالوج التي تعرضها
+والفيد الإضافي فقط. الدفعات تُلحق بسجل التعديلات، ويُدمج السجل في ملف المنتجات عند /flush وعند الإيقاف
+(وعند البدء إن بقي من تشغيل سابق)، فادمجه قبل تشغيل البناء الكامل
+
+مثال:
+    curl -X POST http://127.0.0.1:8765/patch -d '[{"id": "1", "sale_price": 129, "stock_status": "in stock"}]'
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from build_catalog_shards import shard_layout, update_catalog_shards
+from build_output import OutputWriter
+from build_service_worker import write_service_worker
+from generate_merchant_feed import feed_row, generate_merchant_feeds, write_feed_rows
+from generate_static_pages import (PRODUCT_PAGES_FOLDER, PRODUCTS_PATH, RelatedLinks, category_pages_layout, generate_all_product_pages,
+                                   iter_products, load_build_manifest, load_site_config, render_product_page,
+                                   save_build_manifest, site_base_url, update_category_pages, write_records_index)
+from seo_sooq_alemarat_by_files import SCHEMA_AVAILABILITY
+from slug_registry import load_product_urls, load_slug_aliases
+
+DEFAULT_PORT = 8765
+MAX_PATCH_BODY = 1 << 20
+
+# الحقول المسموح تعديلها عبر الخادم (تغيير العنوان يغير الرابط فيمر عبر البناء الكامل)
+PATCH_FIELDS = ('sale_price', 'regular_price', 'discount_percentage', 'stock_status')
+PRICE_FIELDS = ('sale_price', 'regular_price')
+
+# سجل التعديلات (NDJSON): سطر لكل دفعة مقبولة، يُدمج في ملف المنتجات بدل إعادة كتابته مع كل دفعة
+PATCH_JOURNAL_PATH = 'data/catalog-patches.ndjson'
+
+def validate_patch(patch, known_ids):
+    """رسالة خطأ للتعديل غير الصالح أو None"""
+    if not isinstance(patch, dict):
+        return 'التعديل يجب أن يكون كائن JSON'
+    product_id = str(patch.get('id', ''))
+    if product_id not in known_ids:
+        return f"منتج غير موجود: {product_id or '(بدون id)'}"
+    unknown = [field for field in patch if field != 'id' and field not in PATCH_FIELDS]
+    if unknown:
+        return f"حقول غير مسموحة: {', '.join(unknown)}"
+    if len(patch) == 1:
+        return 'لا توجد حقول للتعديل'
+    for field in PRICE_FIELDS + ('discount_percentage',):
+        value = patch.get(field)
+        if field in patch and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+            return f"{field} يجب أن يكون رقمًا موجبًا"
+    if 'stock_status' in patch and patch['stock_status'] not in SCHEMA_AVAILABILITY:
+        return f"stock_status غير معروف: {patch['stock_status']}"
+    return None
+
+def apply_patch(product, patch):
+    """تطبيق التعديل على المنتج مع إعادة حساب نسبة الخصم عند تغير السعر (إلا إذا أُرسلت صراحةً)"""
+    for field in PATCH_FIELDS:
+        if field in patch:
+            product[field] = patch[field]
+    regular = product.get('regular_price')
+    if 'discount_percentage' not in patch and any(field in patch for field in PRICE_FIELDS) and regular:
+        product['discount_percentage'] = max(0, round((regular - product.get('sale_price', regular)) / regular * 100))
+
+def catalog_json(products, path=PRODUCTS_PATH):
+    """نص ملف المنتجات بنفس تنسيق الملف الحالي (NDJSON، أو مصفوفة بمسافة واحدة و \\/ كما يصدّرها المتجر)"""
+    if path.endswith('.ndjson'):
+        return ''.join(json.dumps(product, ensure_ascii=False) + '\n' for product in products)
+    return json.dumps(products, ensure_ascii=False, indent=1).replace('/', '\\/') + '\n'
+
+class CatalogDaemon:
+    """حالة الخادم المقيمة: الكتالوج مفهرسًا بالمعرف وبيان البناء وصفوف الفيد المعدلة منذ آخر فيد كامل
+
+    التعديلات لا تمس العناوين ولا الفئات ولا ترتيب المنتجات، فتقسيم صفحات الفئات وأجزاء الكتالوج
+    وروابط sitemap ثابتة طوال عمل الخادم، ولا يُعاد من كل دفعة إلا ما يعرض المنتجات المعدلة.
+    """
+
+    def __init__(self, products_path=PRODUCTS_PATH, minify=False, journal_path=PATCH_JOURNAL_PATH):
+        self.products_path = products_path
+        self.journal_path = journal_path
+        self.minify = minify
+        self.lock = threading.Lock()
+        self.products = list(iter_products(products_path))
+        self.positions = {str(product.get('id', '')): index for index, product in enumerate(self.products)}
+        replayed = self._replay_journal()
+        # مزامنة المخرجات مع الكتالوج مرة واحدة عند البدء (تزايدي، فلا يُعاد توليد إلا المتغير)
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+            generated = generate_all_product_pages(self.products, minify=minify)
+            self.related = RelatedLinks(self.products)
+        self.files = {str(file_info['id']): file_info for file_info in generated}
+        self.manifest = load_build_manifest()
+        self.aliases = load_slug_aliases()
+        config = load_site_config()
+        self.base_url = site_base_url(config)
+        self.shipping_fee = config.get('shipping_fee', 0)
+        self.product_urls = load_product_urls()
+        # روابط الصفحات لا تتغير مع الأسعار، فيُبنى جدولها وتقسيم صفحات الفئات والأجزاء مرة واحدة
+        self.page_paths = {product_id: f"{PRODUCT_PAGES_FOLDER}/{file_info['filename']}"
+                           for product_id, file_info in self.files.items()}
+        self.category_layout = category_pages_layout(self.products)
+        self.shard_layout = shard_layout(self.products)
+        self.feed_patches = {}
+        self.batches = 0
+        self.patched = 0
+        self.journaled = 0
+        if replayed:
+            self.compact()
+
+    def _replay_journal(self):
+        """تطبيق دفعات سجل التعديلات الباقية من تشغيل سابق لم يُدمج؛ تعيد عدد الدفعات"""
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                batches = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return 0
+        for patches in batches:
+            for patch in patches:
+                if validate_patch(patch, self.positions) is None:
+                    apply_patch(self.products[self.positions[str(patch['id'])]], patch)
+        return len(batches)
+
+    def apply(self, patches):
+        """تطبيق دفعة تعديلات كاملة أو رفضها كاملة؛ تعيد رد JSON مع زمن كل تعديل"""
+        started = time.perf_counter()
+        if isinstance(patches, dict):
+            patches = patches.get('patches', [patches])
+        if not isinstance(patches, list) or not patches:
+            return {'ok': False, 'errors': [{'index': 0, 'error': 'الدفعة يجب أن تكون قائمة تعديلات'}]}
+        errors = [{'index': index, 'error': error} for index, error in
+                  ((index, validate_patch(patch, self.positions)) for index, patch in enumerate(patches)) if error]
+        if errors:
+            return {'ok': False, 'errors': errors}
+
+        with self.lock:
+            writer = OutputWriter()
+            now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            # السجل هو المصدر حتى الدمج، فيُكتب أولًا؛ إن توقف الخادم بعده تُطبق الدفعة عند البدء التالي
+            with open(self.journal_path, 'a', encoding='utf-8') as journal:
+                journal.write(json.dumps(patches, ensure_ascii=False) + '\n')
+            self.journaled += 1
+            for patch in patches:
+                apply_patch(self.products[self.positions[str(patch['id'])]], patch)
+
+            latencies = {}
+            for product_id in dict.fromkeys(str(patch['id']) for patch in patches):
+                patch_started = time.perf_counter()
+                self._render(product_id, now, writer)
+                latencies[product_id] = round((time.perf_counter() - patch_started) * 1000, 2)
+
+            self._write_indexes(latencies, writer)
+            self.batches += 1
+            self.patched += len(latencies)
+
+        return {
+            'ok': True,
+            'patches': [{'id': str(patch['id']), 'latency_ms': latencies[str(patch['id'])]} for patch in patches],
+            'batch_ms': round((time.perf_counter() - started) * 1000, 2),
+            'files': writer.counts(),
+        }
+
+    def _render(self, product_id, now, writer):
+        """إعادة توليد صفحة المنتج وسجله JSON وصف الفيد الخاص به"""
+        product = self.products[self.positions[product_id]]
+        old_entry = self.manifest['products'].get(product_id)
+        slug = old_entry['slug'] if old_entry else self.files[product_id]['slug']
+        related = self.related.links(product_id, lambda other, title: self.files[other]['slug'])
+        result = render_product_page(product, slug, self.aliases.get(product_id, []), old_entry, now,
+                                     minify=self.minify, writer=writer, related=related)
+        self.manifest['products'][product_id] = result['manifest']
+        self.files[product_id] = result['file']
+        self.feed_patches[product_id] = feed_row(product, self.base_url, self.shipping_fee,
+                                                 self.product_urls.get(product_id))
+
+    def _write_indexes(self, product_ids, writer):
+        """ما يعرض المنتجات المعدلة: جدول السجلات وصفحات الفئات وأجزاء الكتالوج والفيد الإضافي
+
+        sitemap لا يُعاد: الأسعار والمخزون لا تغير روابطه، وتاريخ التعديل يُحدَّث في البناء الكامل التالي.
+        """
+        write_records_index(self.manifest['products'], writer=writer)
+        positions = [self.positions[product_id] for product_id in product_ids]
+        update_category_pages(self.products, positions, self.category_layout, self.page_paths, writer=writer,
+                              base_url=self.base_url)
+        if update_catalog_shards(self.products, positions, self.shard_layout, self.product_urls, writer=writer):
+            # أول صفحات كل فئة في قائمة التخزين المسبق، فتتبع بصماتها الجديدة
+            write_service_worker(writer)
+        # الفيد الإضافي يحمل الصفوف المعدلة منذ آخر فيد كامل، فيلتقط Merchant Center الأسعار فورًا
+        write_feed_rows(self.feed_patches.values(), self.base_url, writer)
+
+    def compact(self, writer=None):
+        """دمج سجل التعديلات: كتابة ملف المنتجات وبيان البناء من الذاكرة ثم حذف السجل"""
+        writer = writer or OutputWriter()
+        writer.write(self.products_path, catalog_json(self.products, self.products_path))
+        save_build_manifest(self.manifest, writer=writer)
+        if os.path.exists(self.journal_path):
+            writer.delete(self.journal_path)
+        self.journaled = 0
+        return writer
+
+    def flush_feeds(self):
+        """دمج سجل التعديلات في ملف المنتجات وإعادة كتابة الفيد الكامل (ويصبح الفيد الإضافي ما تغير منذ
+        الفيد الكامل السابق)"""
+        with self.lock:
+            started = time.perf_counter()
+            writer = self.compact()
+            total, changed, removed = generate_merchant_feeds(self.products, self.base_url, writer)
+            self.feed_patches = {}
+            return {'ok': True, 'products': total, 'changed': changed, 'removed': removed,
+                    'batch_ms': round((time.perf_counter() - started) * 1000, 2), 'files': writer.counts()}
+
+    def status(self):
+        return {'ok': True, 'products': len(self.products), 'batches': self.batches, 'patched': self.patched,
+                'pending_feed_rows': len(self.feed_patches), 'journaled_batches': self.journaled}
+
+class PatchHandler(BaseHTTPRequestHandler):
+    """POST /patch (دفعة تعديلات)، POST /flush (دمج السجل وفيد كامل)، GET /status"""
+
+    # اتصالات دائمة حتى يرسل العميل دفعات متتالية بلا كلفة اتصال جديد
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/status':
+            self._reply(200, self.server.daemon.status())
+        else:
+            self._reply(404, {'ok': False, 'error': 'غير موجود'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_PATCH_BODY:
+            self._reply(413, {'ok': False, 'error': 'الدفعة كبيرة جدًا'})
+            self.close_connection = True
+            return
+        body = self.rfile.read(length)
+        if self.path == '/flush':
+            self._reply(200, self.server.daemon.flush_feeds())
+            return
+        if self.path != '/patch':
+            self._reply(404, {'ok': False, 'error': 'غير موجود'})
+            return
+        try:
+            patches = json.loads(body or b'null')
+        except ValueError as e:
+            self._reply(400, {'ok': False, 'error': f"JSON غير صالح: {e}"})
+            return
+        try:
+            response = self.server.daemon.apply(patches)
+        except Exception as e:
+            self._reply(500, {'ok': False, 'error': str(e)})
+            return
+        self._reply(200 if response['ok'] else 422, response)
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # عناوين Unix socket فارغة
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        pass
+
+if hasattr(socket, 'AF_UNIX'):
+    class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+def make_server(daemon, port=DEFAULT_PORT, socket_path=None):
+    """خادم HTTP على 127.0.0.1 أو على Unix socket عند تمرير socket_path"""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixHTTPServer(socket_path, PatchHandler)
+    else:
+        server = ThreadingHTTPServer(('127.0.0.1', port), PatchHandler)
+        server.daemon_threads = True
+    server.daemon = daemon
+    return server
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='خادم بناء مقيم لتحديثات الأسعار والمخزون - سوق الإمارات')
+    parser.add_argument('--products', default=PRODUCTS_PATH, help='مسار ملف المنتجات')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='منفذ HTTP المحلي')
+    parser.add_argument('--socket', metavar='PATH', help='الاستماع على Unix socket بدل المنفذ')
+    parser.add_argument('--minify', action='store_true', help='تصغير الصفحات المولدة (كما في المولد)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    daemon = CatalogDaemon(args.products, args.minify)
+    server = make_server(daemon, args.port, args.socket)
+    address = args.socket or f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"🚀 الخادم جاهز على {address} ({len(daemon.products)} منتج، {time.perf_counter() - started:.2f}ث)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 تم إيقاف الخادم")
+    finally:
+        server.server_close()
+        if daemon.journaled:
+            with daemon.lock:
+                daemon.compact()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+طبقة كتابة المخرجات المشتركة لسكربتات البناء - سوق الإمارات
+تكتب الملف فقط إذا تغير محتواه، وعبر ملف مؤقت ثم إعادة تسمية ذرية
+"""
+
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+def _current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# صلاحيات الملفات الجديدة كما لو أنشئت بـ open() العادية (mkstemp ينشئها 0600)
+_FILE_MODE = 0o666 & ~_current_umask()
+
+def file_digest(path):
+    """بصمة sha256 لمحتوى ملف موجود"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def same_content(path, data):
+    """هل يطابق الملف الموجود هذه البايتات؟ (مقارنة الحجم أولًا ثم البصمة)"""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+    except OSError:
+        return False
+    return file_digest(path) == hashlib.sha256(data).hexdigest()
+
+def _same_file_content(path, other_path):
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+    except OSError:
+        return False
+    return file_digest(path) == file_digest(other_path)
+
+def _temp_path_for(path):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    os.chmod(temp_path, _FILE_MODE)
+    return fd, temp_path
+
+def write_if_changed(path, content, encoding='utf-8'):
+    """كتابة ذرية لنص أو بايتات فقط إذا اختلف المحتوى؛ تعيد True إذا كُتب الملف"""
+    data = content.encode(encoding) if isinstance(content, str) else content
+    if same_content(path, data):
+        return False
+    fd, temp_path = _temp_path_for(path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return True
+
+def delete_if_exists(path):
+    """حذف ملف إن وجد؛ تعيد True إذا حُذف"""
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+class OutputWriter:
+    """كاتب مخرجات يتجنب إعادة كتابة البايتات المتطابقة ويعد الملفات المكتوبة والمتخطاة والمحذوفة"""
+
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.bytes_written = 0
+
+    def record(self, written, size=0):
+        """تسجيل نتيجة كتابة تمت خارج هذا الكاتب (مثلًا داخل عملية عاملة)"""
+        if written:
+            self.written += 1
+            self.bytes_written += size
+        else:
+            self.skipped += 1
+
+    def write(self, path, content, encoding='utf-8'):
+        """كتابة ملف إذا تغير محتواه؛ تعيد True إذا كُتب"""
+        data = content.encode(encoding) if isinstance(content, str) else content
+        written = write_if_changed(path, data)
+        self.record(written, len(data))
+        return written
+
+    def delete(self, path):
+        """حذف ملف ناتج قديم؛ تعيد True إذا حُذف"""
+        deleted = delete_if_exists(path)
+        if deleted:
+            self.deleted += 1
+        return deleted
+
+    @contextmanager
+    def open(self, path, mode='w', encoding='utf-8'):
+        """فتح ملف للكتابة المتدفقة: يُكتب في ملف مؤقت ثم يستبدل الأصلي ذريًا إن اختلف المحتوى"""
+        fd, temp_path = _temp_path_for(path)
+        try:
+            if 'b' in mode:
+                f = os.fdopen(fd, mode)
+            else:
+                f = os.fdopen(fd, mode, encoding=encoding)
+            with f:
+                yield f
+            if _same_file_content(path, temp_path):
+                os.remove(temp_path)
+                self.record(False)
+            else:
+                os.replace(temp_path, path)
+                self.record(True, os.path.getsize(path))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def counts(self):
+        return {'written': self.written, 'skipped': self.skipped, 'deleted': self.deleted,
+                'bytes_written': self.bytes_written}
+
+    def summary(self):
+        """سطر ملخص للطباعة في نهاية التشغيل"""
+        return f"💾 الملفات: كُتب {self.written}، بدون تغيير {self.skipped}، حُذف {self.deleted}"
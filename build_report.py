@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تقرير البناء المشترك لسكربتات البناء - سوق الإمارات
+يجمع زمن كل مرحلة (فعلي ومعالج) والملفات المكتوبة وأقصى ذاكرة وأبطأ المنتجات في ملف JSON
+"""
+
+import cProfile
+import heapq
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # ويندوز: لا يتوفر قياس أقصى ذاكرة للعملية
+    resource = None
+
+from build_output import OutputWriter
+
+DEFAULT_SLOWEST_COUNT = 10
+
+def peak_rss_mb():
+    """أقصى ذاكرة مقيمة للعملية الحالية بالميغابايت (None إن لم يتوفر القياس)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # لينكس يعيدها بالكيلوبايت وماك بالبايت
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+def stage_clock():
+    """(الزمن الفعلي، زمن المعالج) لحساب مدة مرحلة بالطرح"""
+    return time.perf_counter(), time.process_time()
+
+class BuildReport:
+    """مجمّع قياسات تشغيل واحد: المراحل، أبطأ العناصر، الذاكرة، وعدادات الكاتب"""
+
+    def __init__(self, script, slowest=DEFAULT_SLOWEST_COUNT, trace_memory=False):
+        self.script = script
+        self.slowest_count = slowest
+        self.trace_memory = trace_memory
+        self.started = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.stages = {}
+        self._slowest = []
+        self._start = stage_clock()
+        if trace_memory:
+            tracemalloc.start()
+
+    def add(self, stage, wall, cpu, count=1):
+        """إضافة مدة إلى مرحلة (تُجمع المدد المتكررة مثل مدة كل منتج)"""
+        entry = self.stages.setdefault(stage, {'wall': 0.0, 'cpu': 0.0, 'count': 0})
+        entry['wall'] += wall
+        entry['cpu'] += cpu
+        entry['count'] += count
+
+    def add_since(self, stage, clock):
+        """إضافة المدة منذ قراءة stage_clock()"""
+        self.add(stage, *elapsed(clock))
+
+    @contextmanager
+    def stage(self, name):
+        clock = stage_clock()
+        try:
+            yield
+        finally:
+            self.add_since(name, clock)
+
+    def timed(self, stage, iterable):
+        """تمرير مولد مع احتساب الوقت المستغرق في إنتاج عناصره (مثل قراءة الكتالوج المتدفقة)"""
+        iterator = iter(iterable)
+        while True:
+            clock = stage_clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(stage, *elapsed(clock), count=0)
+                return
+            self.add(stage, *elapsed(clock))
+            yield item
+
+    def note_item(self, item_id, seconds):
+        """تسجيل مدة عنصر واحد مع الاحتفاظ بأبطأ N فقط"""
+        if self.slowest_count <= 0:
+            return
+        entry = (seconds, str(item_id))
+        if len(self._slowest) < self.slowest_count:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def to_dict(self, writer=None, **extra):
+        wall, cpu = elapsed(self._start)
+        memory = {'peak_rss_mb': peak_rss_mb(), 'tracemalloc_peak_mb': None}
+        if self.trace_memory and tracemalloc.is_tracing():
+            memory['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 1)
+        report = {
+            'script': self.script,
+            'started': self.started,
+            'python': sys.version.split()[0],
+            'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(cpu, 4),
+            'stages': {
+                name: {'wall': round(entry['wall'], 4), 'cpu': round(entry['cpu'], 4), 'count': entry['count']}
+                for name, entry in self.stages.items()
+            },
+            'files': writer.counts() if writer is not None else None,
+            'memory': memory,
+            'slowest': [{'id': item_id, 'seconds': round(seconds, 4)}
+                        for seconds, item_id in sorted(self._slowest, reverse=True)],
+        }
+        report.update(extra)
+        return report
+
+    def save(self, path, writer=None, **extra):
+        """كتابة التقرير في path وإرجاعه"""
+        report = self.to_dict(writer, **extra)
+        OutputWriter().write(path, json.dumps(report, ensure_ascii=False, indent=2) + '\n')
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return report
+
+    def summary(self):
+        """سطر ملخص بزمن كل مرحلة للطباعة في نهاية التشغيل"""
+        stages = '، '.join(f"{name} {entry['wall']:.2f}ث" for name, entry in self.stages.items())
+        return f"⏱️ المراحل: {stages or 'لا يوجد'} (الإجمالي {elapsed(self._start)[0]:.2f}ث)"
+
+def elapsed(clock):
+    wall, cpu = stage_clock()
+    return wall - clock[0], cpu - clock[1]
+
+@contextmanager
+def profiled(path=None):
+    """تشغيل الكتلة تحت cProfile وحفظ النتائج في path (لا شيء عند path=None)
+
+    يُقرأ الملف بـ python -m pstats أو أدوات مثل snakeviz.
+    """
+    if not path:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"🔬 تم حفظ ملف cProfile في {path}")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بناء فهرس بحث عربي مقسم من data/uae-products.json - سوق الإمارات
+فهرس مقلوب (كلمة ← منتجات) مقسم حسب أول حرفين من الكلمة، فيحمّل المتصفح الجزء الذي يحتاجه فقط
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+
+from arabic_text import MIN_TOKEN_LENGTH, tokenize
+from build_output import OutputWriter
+from generate_static_pages import PRODUCTS_PATH, iter_products
+
+SEARCH_INDEX_FOLDER = 'data/search-index'
+SEARCH_MANIFEST_NAME = 'manifest.json'
+SEARCH_INDEX_VERSION = 1
+
+# طول بادئة التقسيم (يُكتب في manifest.json فيقرؤه js/search-index.js، ولا يزيد على MIN_TOKEN_LENGTH في arabic_text.py)
+SHARD_PREFIX_LENGTH = 2
+
+# وزن ظهور الكلمة في كل حقل
+FIELD_WEIGHTS = {
+    'title': 4,
+    'seo_keywords': 2,
+    'category': 2,
+    'brand': 2,
+    'description': 1,
+}
+
+_SHARD_FILE_PATTERN = re.compile(r'shard-[0-9a-f]+\.json')
+
+def product_token_scores(product):
+    """وزن كل كلمة في المنتج: مجموع أوزان الحقول التي تظهر فيها"""
+    scores = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = product.get(field)
+        if not value or value == 'none':
+            continue
+        for token in set(tokenize(str(value))):
+            scores[token] = scores.get(token, 0) + weight
+    return scores
+
+def shard_key(token):
+    return token[:SHARD_PREFIX_LENGTH]
+
+class _PostingStore:
+    """قوائم الكلمات مخزنة في sqlite مؤقت حتى تبقى الذاكرة ثابتة مع نمو الكتالوج"""
+
+    def __init__(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute('CREATE TABLE postings (token TEXT, id TEXT, score INTEGER)')
+
+    def add(self, product_id, scores):
+        self.db.executemany('INSERT INTO postings VALUES (?, ?, ?)',
+                            ((token, product_id, score) for token, score in scores.items()))
+
+    def iter_shards(self):
+        """(البادئة، {كلمة: [[id, وزن], ...]}) لكل جزء بترتيب الكلمات"""
+        self.db.execute('CREATE INDEX postings_order ON postings (token, score DESC, id)')
+        rows = self.db.execute('SELECT token, id, score FROM postings ORDER BY token, score DESC, id')
+        prefix, shard = None, {}
+        for token, product_id, score in rows:
+            if shard_key(token) != prefix:
+                if shard:
+                    yield prefix, shard
+                prefix, shard = shard_key(token), {}
+            shard.setdefault(token, []).append([product_id, score])
+        if shard:
+            yield prefix, shard
+
+    def close(self):
+        self.db.close()
+        os.remove(self.db_path)
+
+def _shard_json(shard):
+    return json.dumps(shard, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+def _write_shard(writer, output_folder, shard):
+    """كتابة جزء باسم مشتق من محتواه؛ تعيد اسم الملف"""
+    content = _shard_json(shard)
+    filename = f"shard-{hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]}.json"
+    writer.write(os.path.join(output_folder, filename), content)
+    return filename
+
+def _write_manifest(writer, output_folder, product_count, token_count, shards):
+    manifest = {
+        'version': SEARCH_INDEX_VERSION,
+        'prefix_length': SHARD_PREFIX_LENGTH,
+        'min_token_length': MIN_TOKEN_LENGTH,
+        'products': product_count,
+        'tokens': token_count,
+        'shards': shards,
+    }
+    writer.write(os.path.join(output_folder, SEARCH_MANIFEST_NAME),
+                 json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True))
+
+def build_search_index(products, output_folder=SEARCH_INDEX_FOLDER, writer=None):
+    """كتابة أجزاء الفهرس بأسماء مشتقة من محتواها وملف manifest.json يربط كل بادئة بجزئها
+
+    تعيد (عدد المنتجات، عدد الكلمات، عدد الأجزاء).
+    """
+    writer = writer or OutputWriter()
+    os.makedirs(output_folder, exist_ok=True)
+    store = _PostingStore()
+    product_count = token_count = 0
+    shards = {}
+    try:
+        for product in products:
+            store.add(str(product.get('id', '')), product_token_scores(product))
+            product_count += 1
+        for prefix, shard in store.iter_shards():
+            shards[prefix] = _write_shard(writer, output_folder, shard)
+            token_count += len(shard)
+    finally:
+        store.close()
+
+    _write_manifest(writer, output_folder, product_count, token_count, shards)
+
+    # حذف الأجزاء القديمة التي لم تعد في manifest
+    live = set(shards.values())
+    for name in os.listdir(output_folder):
+        if _SHARD_FILE_PATTERN.fullmatch(name) and name not in live:
+            writer.delete(os.path.join(output_folder, name))
+    return product_count, token_count, len(shards)
+
+class SearchIndexState:
+    """فهرس البحث كاملًا في الذاكرة لعملية طويلة التشغيل (وضع المراقبة)
+
+    تحديث منتج يعيد كتابة أجزاء البادئات التي تمسها كلماته فقط، وتبقى المخرجات مطابقة
+    لما يكتبه build_search_index للكتالوج نفسه.
+    """
+
+    def __init__(self, output_folder=SEARCH_INDEX_FOLDER):
+        self.output_folder = output_folder
+        self.product_scores = {}
+        self.postings = {}
+        self.files = {}
+        self._dirty = set()
+
+    def set_product(self, product_id, product):
+        """إضافة منتج أو تحديثه، أو حذفه عند product=None"""
+        product_id = str(product_id)
+        old = self.product_scores.pop(product_id, {})
+        new = product_token_scores(product) if product is not None else {}
+        if new == old:
+            if product is not None:
+                self.product_scores[product_id] = new
+            return
+        for token in old:
+            postings = self.postings[shard_key(token)]
+            del postings[token][product_id]
+            if not postings[token]:
+                del postings[token]
+        for token, score in new.items():
+            self.postings.setdefault(shard_key(token), {}).setdefault(token, {})[product_id] = score
+        if product is not None:
+            self.product_scores[product_id] = new
+        self._dirty.update(shard_key(token) for token in old.keys() | new.keys())
+
+    def write(self, writer=None, rewrite_all=False):
+        """كتابة الأجزاء المتغيرة منذ آخر كتابة وملف manifest.json؛ تعيد عدد الأجزاء المعاد كتابتها"""
+        writer = writer or OutputWriter()
+        os.makedirs(self.output_folder, exist_ok=True)
+        prefixes = set(self.postings) | set(self.files) if rewrite_all else self._dirty
+        for prefix in prefixes:
+            old_filename = self.files.pop(prefix, None)
+            tokens = self.postings.get(prefix)
+            if tokens:
+                shard = {token: [[product_id, score] for product_id, score in
+                                 sorted(postings.items(), key=lambda item: (-item[1], item[0]))]
+                         for token, postings in tokens.items()}
+                self.files[prefix] = _write_shard(writer, self.output_folder, shard)
+            else:
+                self.postings.pop(prefix, None)
+            if old_filename and old_filename != self.files.get(prefix):
+                writer.delete(os.path.join(self.output_folder, old_filename))
+        token_count = sum(len(tokens) for tokens in self.postings.values())
+        _write_manifest(writer, self.output_folder, len(self.product_scores), token_count, dict(self.files))
+        if rewrite_all:
+            live = set(self.files.values())
+            for name in os.listdir(self.output_folder):
+                if _SHARD_FILE_PATTERN.fullmatch(name) and name not in live:
+                    writer.delete(os.path.join(self.output_folder, name))
+        written = len(prefixes)
+        self._dirty = set()
+        return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='بناء فهرس البحث المقسم - سوق الإمارات')
+    parser.add_argument('--products', default=PRODUCTS_PATH, help='مسار ملف المنتجات (JSON أو NDJSON)')
+    parser.add_argument('--output', default=SEARCH_INDEX_FOLDER, help='مجلد أجزاء الفهرس')
+    args = parser.parse_args(argv)
+    writer = OutputWriter()
+    try:
+        products, tokens, shards = build_search_index(iter_products(args.products), args.output, writer)
+    except Exception as e:
+        print(f"❌ حدث خطأ: {e}")
+        return 1
+    print(f"🔍 تم فهرسة {products} منتج: {tokens} كلمة في {shards} جزء ({args.output})")
+    print(writer.summary())
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+عامل الخدمة (Service Worker) وقائمة التخزين المسبق من مخرجات البناء - سوق الإمارات
+صفحات الواجهة وملفات JS/CSS التي تستخدمها وأول صفحة بطاقات لكل فئة تُخزن مسبقًا بمراجعة (بصمة محتوى)
+لكل ملف، فلا يُعاد تنزيل إلا ما تغيرت مراجعته؛ صفحات HTML تُعرض من الذاكرة فورًا وتُحدّث في الخلفية
+(stale-while-revalidate)، وملفات البيانات التي تحمل الأسعار من الشبكة أولًا والذاكرة عند انقطاعها
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+
+from build_output import OutputWriter, file_digest
+
+SERVICE_WORKER_PATH = 'sw.js'
+# نفس القائمة مضمنة في sw.js (تغيرها يغير بايتات العامل فيحدّثه المتصفح)، والملف المنفصل للفحص والأدوات
+PRECACHE_MANIFEST_PATH = 'precache-manifest.json'
+PRECACHE_VERSION = 1
+REVISION_LENGTH = 10
+
+# صفحات الواجهة المخزنة مسبقًا (مع ملفات JS/CSS المحلية التي تشير إليها)
+SHELL_PAGES = (
+    'index.html', 'category.html', 'product.html', 'cart.html', 'checkout.html', '404.html',
+    'en/index.html', 'en/category.html', 'manifest.json',
+)
+
+# أجزاء الكتالوج (build_catalog_shards.py): أول صفحات بطاقات كل فئة من الملف الرئيسي
+# (الملف الرئيسي نفسه يتغير مع الأسعار فيُطلب من الشبكة أولًا ولا يُخزن مسبقًا)
+CATALOG_MANIFEST_PATH = 'data/catalog/manifest.json'
+CATALOG_PRECACHE_PAGES = 1
+
+# أصول صفحات المنتجات المشتركة (generate_static_pages.py) وأسماؤها تحمل بصمة محتواها
+SHARED_ASSET_PATTERNS = (('assets/css', re.compile(r'product\.[0-9a-f]+\.css')),
+                         ('assets/js', re.compile(r'product\.[0-9a-f]+\.js')))
+
+# الملفات التي يحمل اسمها بصمة محتواها: الرابط نفسه مراجعة، فلا حاجة لحساب بصمة
+_HASHED_NAME_PATTERN = re.compile(r'(?:\.|(?:cards|shard)-)[0-9a-f]{8,}\.(?:css|js|json)$')
+_LOCAL_REFERENCE_PATTERN = re.compile(r'(?:src|href)="([^"#?:]+\.(?:js|css))"')
+
+SERVICE_WORKER_JS = '''// Service worker generated by build_service_worker.py - do not edit by hand
+'use strict';
+
+const PRECACHE_MANIFEST = __PRECACHE_MANIFEST__;
+
+const PRECACHE = 'sooq-precache-v' + PRECACHE_MANIFEST.version;
+const PAGES = 'sooq-pages-v1';
+const IMMUTABLE = 'sooq-immutable-v1';
+const DATA = 'sooq-data-v1';
+const CURRENT_CACHES = [PRECACHE, PAGES, IMMUTABLE, DATA];
+const MAX_PAGES = 200;
+const MAX_IMMUTABLE = 400;
+
+const SCOPE = new URL(self.registration.scope);
+// Revisioned entries are stored under url?__rev=revision, so an unchanged entry is never fetched again
+const precacheKeys = new Map(PRECACHE_MANIFEST.entries.map(entry => [
+  new URL(entry.url, SCOPE).href,
+  new URL(entry.url + (entry.revision ? '?__rev=' + entry.revision : ''), SCOPE).href
+]));
+
+const HASHED_NAME = /(?:\\.|\\/(?:cards|shard)-)[0-9a-f]{8,}\\.(?:css|js|json)$/;
+const PAGE_PATHS = ['data/pruducts-pages/', 'en/products/', 'categories/'];
+// Price-bearing data: network first so a price patch is visible on the next load, cache only when offline
+const DATA_PATHS = ['data/uae-products.json', 'data/catalog/manifest.json', 'data/products/index.json',
+                    'data/product-urls.json', 'data/search-index/manifest.json'];
+
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(PRECACHE);
+    await Promise.all([...precacheKeys].map(async ([url, key]) => {
+      if (await cache.match(key)) { return; }
+      const response = await fetch(url, { cache: key === url ? 'default' : 'reload' });
+      if (!response.ok) { throw new Error('precache failed: ' + url); }
+      await cache.put(key, response);
+    }));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    const names = await caches.keys();
+    await Promise.all(names.filter(name => name.startsWith('sooq-') && !CURRENT_CACHES.includes(name))
+      .map(name => caches.delete(name)));
+    // Drop precached entries whose revision is no longer in the manifest
+    const cache = await caches.open(PRECACHE);
+    const live = new Set(precacheKeys.values());
+    const requests = await cache.keys();
+    await Promise.all(requests.filter(request => !live.has(request.url)).map(request => cache.delete(request)));
+    await self.clients.claim();
+  })());
+});
+
+async function trimCache(name, maxEntries) {
+  const cache = await caches.open(name);
+  const requests = await cache.keys();
+  await Promise.all(requests.slice(0, Math.max(requests.length - maxEntries, 0)).map(request => cache.delete(request)));
+}
+
+async function fromPrecache(request, key) {
+  const cached = await caches.match(key, { cacheName: PRECACHE });
+  return cached || fetch(request);
+}
+
+async function cacheFirst(request) {
+  const cache = await caches.open(IMMUTABLE);
+  const cached = await cache.match(request);
+  if (cached) { return cached; }
+  const response = await fetch(request);
+  if (response.ok) {
+    await cache.put(request, response.clone());
+    trimCache(IMMUTABLE, MAX_IMMUTABLE);
+  }
+  return response;
+}
+
+async function networkFirst(request) {
+  const cache = await caches.open(DATA);
+  try {
+    const response = await fetch(request);
+    if (response.ok) {
+      await cache.put(request, response.clone());
+    }
+    return response;
+  } catch (error) {
+    const cached = await cache.match(request, { ignoreSearch: true });
+    if (cached) { return cached; }
+    throw error;
+  }
+}
+
+async function staleWhileRevalidate(event, request) {
+  const cache = await caches.open(PAGES);
+  const cached = await cache.match(request, { ignoreSearch: true });
+  const network = fetch(request).then(async response => {
+    if (response.ok) {
+      await cache.put(request, response.clone());
+      await trimCache(PAGES, MAX_PAGES);
+    }
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => undefined));
+    return cached;
+  }
+  try {
+    return await network;
+  } catch (error) {
+    // Offline and never visited: fall back to the precached home page for navigations
+    const fallback = request.mode === 'navigate' && precacheKeys.get(new URL('index.html', SCOPE).href);
+    if (fallback) { return caches.match(fallback, { cacheName: PRECACHE }); }
+    throw error;
+  }
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  // no-store requests (e.g. the admin editor) always go to the network
+  if (request.method !== 'GET' || request.cache === 'no-store') { return; }
+  const url = new URL(request.url);
+  if (url.origin !== SCOPE.origin || !url.href.startsWith(SCOPE.href)) { return; }
+
+  let path = url.origin + url.pathname;
+  if (path.endsWith('/')) { path += 'index.html'; }
+  const key = precacheKeys.get(path);
+  if (key) {
+    event.respondWith(fromPrecache(request, key));
+    return;
+  }
+  const relative = url.pathname.slice(SCOPE.pathname.length);
+  if (HASHED_NAME.test(relative)) {
+    event.respondWith(cacheFirst(request));
+  } else if (DATA_PATHS.includes(relative)) {
+    event.respondWith(networkFirst(request));
+  } else if (request.mode === 'navigate' || PAGE_PATHS.some(prefix => relative.startsWith(prefix))) {
+    event.respondWith(staleWhileRevalidate(event, request));
+  }
+});
+'''
+
+def shell_references(page_path, root='.'):
+    """ملفات JS/CSS المحلية التي تشير إليها صفحة واجهة (مسارات نسبةً إلى جذر الموقع)"""
+    if not page_path.endswith('.html'):
+        return []
+    with open(os.path.join(root, page_path), 'r', encoding='utf-8') as f:
+        html = f.read()
+    folder = os.path.dirname(page_path)
+    references = []
+    for link in _LOCAL_REFERENCE_PATTERN.findall(html):
+        path = os.path.normpath(os.path.join(folder, link)).replace(os.sep, '/')
+        if not path.startswith('../') and os.path.isfile(os.path.join(root, path)):
+            references.append(path)
+    return references
+
+def catalog_entries(root='.', pages=CATALOG_PRECACHE_PAGES):
+    """أول pages صفحات بطاقات لكل فئة (أسماؤها ببصمة محتواها من الملف الرئيسي لأجزاء الكتالوج)"""
+    manifest_path = os.path.join(root, CATALOG_MANIFEST_PATH)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return []
+    folder = os.path.dirname(CATALOG_MANIFEST_PATH)
+    entries = []
+    for category in manifest.get('categories', {}).values():
+        entries.extend(f"{folder}/{page['file']}" for page in category.get('pages', [])[:pages])
+    return entries
+
+def shared_asset_entries(root='.'):
+    """أصول صفحات المنتجات المشتركة الحالية (assets/css/product.{hash}.css و assets/js/product.{hash}.js)"""
+    entries = []
+    for folder, pattern in SHARED_ASSET_PATTERNS:
+        try:
+            names = sorted(os.listdir(os.path.join(root, folder)))
+        except FileNotFoundError:
+            continue
+        entries.extend(f"{folder}/{name}" for name in names if pattern.fullmatch(name))
+    return entries
+
+def entry_revision(path, root='.'):
+    """مراجعة ملف في القائمة: None إذا كان اسمه يحمل بصمته، وإلا أول REVISION_LENGTH من بصمة محتواه"""
+    if _HASHED_NAME_PATTERN.search(path):
+        return None
+    return file_digest(os.path.join(root, path))[:REVISION_LENGTH]
+
+def build_precache_manifest(root='.'):
+    """قائمة التخزين المسبق: {'version', 'revision', 'entries': [{'url', 'revision'}]} بترتيب ثابت"""
+    paths = []
+    for page in SHELL_PAGES:
+        if os.path.isfile(os.path.join(root, page)):
+            paths.append(page)
+            paths.extend(shell_references(page, root))
+    paths.extend(shared_asset_entries(root))
+    paths.extend(catalog_entries(root))
+    entries = [{'url': path, 'revision': entry_revision(path, root)} for path in dict.fromkeys(paths)]
+    payload = json.dumps(entries, ensure_ascii=False, separators=(',', ':'))
+    return {
+        'version': PRECACHE_VERSION,
+        'revision': hashlib.sha256(payload.encode('utf-8')).hexdigest()[:REVISION_LENGTH],
+        'entries': entries,
+    }
+
+def write_service_worker(writer=None, root='.'):
+    """كتابة precache-manifest.json و sw.js (لا يتغير sw.js إلا إذا تغيرت مراجعة ملف في القائمة)"""
+    writer = writer or OutputWriter()
+    manifest = build_precache_manifest(root)
+    writer.write(os.path.join(root, PRECACHE_MANIFEST_PATH), json.dumps(manifest, ensure_ascii=False, indent=2) + '\n')
+    script = SERVICE_WORKER_JS.replace('__PRECACHE_MANIFEST__', json.dumps(manifest, ensure_ascii=False))
+    writer.write(os.path.join(root, SERVICE_WORKER_PATH), script)
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='عامل الخدمة وقائمة التخزين المسبق - سوق الإمارات')
+    parser.add_argument('--root', default='.', help='جذر الموقع')
+    args = parser.parse_args(argv)
+    writer = OutputWriter()
+    manifest = write_service_worker(writer, args.root)
+    print(f"📴 قائمة التخزين المسبق: {len(manifest['entries'])} ملف (المراجعة {manifest['revision']})")
+    print(writer.summary())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+اكتشاف المنتجات المكررة تقريبًا قبل توليد الصفحات - سوق الإمارات
+بصمات MinHash لمقاطع النص العربي الموحد (العنوان وبداية الوصف) مع اسم ملف الصورة، ثم LSH
+(تقسيم البصمة إلى شرائح) فلا يُقارن إلا المنتجات التي تتطابق في شريحة واحدة على الأقل
+"""
+
+import argparse
+import json
+import operator
+import os
+import random
+import zlib
+from array import array
+from itertools import islice
+from urllib.parse import urlsplit
+
+try:
+    import numpy
+except ImportError:  # بدون numpy (requirements.txt): نفس البصمات بحساب Python عادي (~2.5 مرة أبطأ)
+    numpy = None
+
+from arabic_text import tokenize
+from build_output import OutputWriter
+
+# تقرير المجموعات المكررة وصفحات التحويل التي كتبها وضع الدمج
+DUPLICATES_REPORT_PATH = 'data/duplicates-report.json'
+
+# 64 دالة MinHash في 8 شرائح × 8 صفوف: زوج بتشابه 0.8 يتطابق في شريحة واحدة على الأقل باحتمال ~94%
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 8
+DUPLICATE_THRESHOLD = 0.8
+MINHASH_SEED = 1
+
+# أحرف الوصف الداخلة في البصمة (بداية الوصف تكفي، وتوحيد الأوصاف الطويلة كاملة يبطئ الحساب)
+MAX_DESCRIPTION_CHARS = 800
+
+# أقصى عدد من المجموعات المختلفة يُقارن بها المنتج في شريحة واحدة (أحدثها في الكتالوج): شرائح العناوين
+# الشائعة تجمع آلاف المنتجات غير المكررة، ومقارنتها كلها تجعل الحساب تربيعيًا
+MAX_BUCKET_CANDIDATES = 16
+
+# عدد المنتجات التي تُحسب بصماتها معًا (عملية مصفوفات واحدة لكل دفعة مع numpy)
+SIGNATURE_BATCH_SIZE = 256
+
+# دوال التجزئة (a*x + b) mod p بعدد أولي 2^31 - 1: حاصل الضرب أقل من 2^62 فيتسع في uint64 (numpy)،
+# والبصمة 32 بت لكل دالة (256 بايت للمنتج)
+_MERSENNE_PRIME = (1 << 31) - 1
+
+def _permutations():
+    rng = random.Random(MINHASH_SEED)
+    return [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+_PERMUTATIONS = _permutations()
+if numpy is not None:
+    _A = numpy.array([a for a, _ in _PERMUTATIONS], dtype=numpy.uint64)
+    _B = numpy.array([b for _, b in _PERMUTATIONS], dtype=numpy.uint64)
+
+def image_key(image_url):
+    """اسم ملف الصورة بدون النطاق والاستعلام (نفس الصورة على CDN مختلف تعطي نفس المفتاح)"""
+    path = urlsplit(image_url or '').path
+    return os.path.basename(path).lower()
+
+def product_shingles(product):
+    """مقاطع المنتج: أزواج الكلمات المتتالية من العنوان وبداية الوصف بعد التوحيد، واسم ملف الصورة"""
+    tokens = tokenize(product.get('title', ''))
+    tokens += tokenize((product.get('description') or '')[:MAX_DESCRIPTION_CHARS])
+    shingles = {f"{first} {second}" for first, second in zip(tokens, tokens[1:])}
+    if len(tokens) == 1:
+        shingles.add(tokens[0])
+    key = image_key(product.get('image_url'))
+    if key:
+        shingles.add(f"image:{key}")
+    return shingles
+
+def _shingle_hashes(shingles):
+    return [zlib.crc32(shingle.encode('utf-8')) % _MERSENNE_PRIME for shingle in shingles]
+
+def minhash_signature(shingles):
+    """بصمة MinHash (array من NUM_PERMUTATIONS قيمة): أصغر قيمة لكل دالة تجزئة على مقاطع المنتج
+
+    تعيد None إن لم توجد مقاطع.
+    """
+    return minhash_signatures([shingles])[0]
+
+def minhash_signatures(shingle_sets):
+    """بصمات دفعة من المنتجات؛ مع numpy تُحسب الدفعة كلها بعملية مصفوفات واحدة"""
+    hashes = [_shingle_hashes(shingles) for shingles in shingle_sets]
+    if numpy is None:
+        return [array('I', (min([(a * x + b) % _MERSENNE_PRIME for x in values]) for a, b in _PERMUTATIONS))
+                if values else None for values in hashes]
+    sizes = [len(values) for values in hashes if values]
+    if not sizes:
+        return [None] * len(hashes)
+    values = numpy.fromiter((x for row in hashes for x in row), dtype=numpy.uint64, count=sum(sizes))
+    # أصغر قيمة لكل دالة داخل مقاطع كل منتج: reduceat على بدايات صفوف المنتجات
+    starts = numpy.concatenate(([0], numpy.cumsum(sizes[:-1])))
+    minimums = iter(numpy.minimum.reduceat((numpy.outer(values, _A) + _B) % numpy.uint64(_MERSENNE_PRIME),
+                                           starts, axis=0).tolist())
+    return [array('I', next(minimums)) if row else None for row in hashes]
+
+def signature_similarity(first, second):
+    """تقدير تشابه جاكارد: نسبة الدوال التي تتفق فيها البصمتان"""
+    return sum(map(operator.eq, first, second)) / NUM_PERMUTATIONS
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            # الأسبق في الكتالوج يبقى جذر المجموعة
+            if second < first:
+                first, second = second, first
+            self.parent[second] = first
+
+def find_duplicate_clusters(products, threshold=DUPLICATE_THRESHOLD):
+    """(المجموعات، عدد المنتجات): مجموعات المكررات تقريبًا بترتيب الكتالوج [{'keep': id, 'duplicates': [...], ...}]
+
+    كل شريحة LSH تحفظ ممثلًا واحدًا لكل مجموعة دخلتها، والمنتج يُقارن بممثلي آخر MAX_BUCKET_CANDIDATES
+    مجموعة في كل شريحة يتطابق فيها معها (لا بأولها فقط)، فلا يفوت مكرر لعضو متأخر في الشريحة.
+    المنتج المُبقى هو الأسبق في الكتالوج.
+    """
+    ids = []
+    signatures = []
+    buckets = {}
+    groups = _DisjointSet()
+    scores = {}
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    products = iter(products)
+    while True:
+        batch = list(islice(products, SIGNATURE_BATCH_SIZE))
+        if not batch:
+            break
+        ids.extend(str(product.get('id', '')) for product in batch)
+        signatures.extend(minhash_signatures([product_shingles(product) for product in batch]))
+        for position in range(len(signatures) - len(batch), len(signatures)):
+            signature = signatures[position]
+            if signature is None:
+                continue
+            compared = set()
+            keys = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+            for key in keys:
+                for other in buckets.get(key, ())[-MAX_BUCKET_CANDIDATES:]:
+                    if other in compared or groups.find(other) == groups.find(position):
+                        continue
+                    compared.add(other)
+                    similarity = signature_similarity(signature, signatures[other])
+                    if similarity >= threshold:
+                        groups.union(other, position)
+                        scores[position] = min(scores.get(position, 1.0), similarity)
+            # المنتج يمثل مجموعته فقط في الشرائح التي ليس فيها عضو منها
+            root = groups.find(position)
+            for key in keys:
+                members = buckets.setdefault(key, [])
+                if not any(groups.find(other) == root for other in members[-MAX_BUCKET_CANDIDATES:]):
+                    members.append(position)
+
+    clusters = {}
+    for position in groups.parent:
+        root = groups.find(position)
+        if root != position:
+            clusters.setdefault(root, []).append(position)
+    return [
+        {
+            'keep': ids[root],
+            'duplicates': [ids[position] for position in sorted(members)],
+            'similarity': round(min(scores.get(position, 1.0) for position in members), 3),
+        }
+        for root, members in sorted(clusters.items())
+    ], len(ids)
+
+def duplicate_map(clusters):
+    """{معرف المنتج المكرر: معرف المنتج المُبقى}"""
+    return {duplicate: cluster['keep'] for cluster in clusters for duplicate in cluster['duplicates']}
+
+def load_duplicates_report(path=DUPLICATES_REPORT_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_duplicates_report(clusters, total, path=DUPLICATES_REPORT_PATH, writer=None, redirects=None,
+                           threshold=DUPLICATE_THRESHOLD):
+    """كتابة تقرير المجموعات (وصفحات التحويل في وضع الدمج) مع العتبة التي استُخدمت فعلًا، وإرجاعه"""
+    report = {
+        'products': total,
+        'clusters': len(clusters),
+        'duplicates': sum(len(cluster['duplicates']) for cluster in clusters),
+        'threshold': threshold,
+        'groups': clusters,
+    }
+    if redirects is not None:
+        report['redirects'] = redirects
+    (writer or OutputWriter()).write(path, json.dumps(report, ensure_ascii=False, indent=2) + '\n')
+    return report
+
+def print_duplicates_summary(clusters, total, products_by_id=None, limit=10):
+    duplicates = sum(len(cluster['duplicates']) for cluster in clusters)
+    print(f"🧬 المنتجات المكررة تقريبًا: {duplicates} منتج في {len(clusters)} مجموعة من أصل {total}")
+    for cluster in clusters[:limit if products_by_id else 0]:
+        title = products_by_id.get(cluster['keep'], {}).get('title', '')
+        print(f"   {cluster['keep']} ({title[:40]}) ← {', '.join(cluster['duplicates'])} [{cluster['similarity']}]")
+
+def main(argv=None):
+    from generate_static_pages import PRODUCTS_PATH, iter_products
+
+    parser = argparse.ArgumentParser(description='اكتشاف المنتجات المكررة تقريبًا - سوق الإمارات')
+    parser.add_argument('--products', default=PRODUCTS_PATH, help='مسار ملف المنتجات (JSON أو NDJSON)')
+    parser.add_argument('--output', default=DUPLICATES_REPORT_PATH, help='مسار تقرير المجموعات المكررة')
+    parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD,
+                        help='أدنى تشابه (جاكارد تقديري) لاعتبار المنتجين مكررين')
+    args = parser.parse_args(argv)
+    products = list(iter_products(args.products))
+    clusters, _ = find_duplicate_clusters(products, args.threshold)
+    save_duplicates_report(clusters, len(products), args.output, threshold=args.threshold)
+    print_duplicates_summary(clusters, len(products), {str(product.get('id', '')): product for product in products})
+    print(f"📄 التقرير في {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+مولد فيد جوجل مرشنت سنتر (XML و CSV) من data/uae-products.json - سوق الإمارات
+يقرأ المنتجات تدريجيًا ويكتب الفيد الكامل وفيدًا إضافيًا بالمنتجات التي تغيرت فقط
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from xml.sax.saxutils import escape as xml_escape
+
+from build_output import OutputWriter
+from generate_static_pages import PRODUCTS_PATH, iter_products, load_site_config, site_base_url
+from slug_registry import load_product_urls
+
+FEED_XML_PATH = 'google-merchant-feed.xml'
+FEED_CSV_PATH = 'google-merchant-feed.csv'
+SUPPLEMENTAL_XML_PATH = 'google-merchant-feed-supplemental.xml'
+SUPPLEMENTAL_CSV_PATH = 'google-merchant-feed-supplemental.csv'
+
+# بصمة كل صف في آخر بناء لاكتشاف المنتجات التي تغير صفها
+FEED_STATE_PATH = 'data/merchant-feed-state.ndjson'
+
+FEED_TITLE = 'سوق الإمارات للهدايا'
+FEED_DESCRIPTION = 'تسوق أفضل المنتجات في الإمارات مع شحن مجاني ودفع عند الاستلام'
+
+FEED_COLUMNS = [
+    'id', 'title', 'description', 'link', 'image_link', 'availability', 'price', 'sale_price',
+    'brand', 'condition', 'google_product_category', 'product_type', 'identifier_exists',
+    'shipping', 'free_shipping_threshold', 'custom_label_0', 'custom_label_1',
+]
+
+# فئات الكتالوج ← فئات جوجل
+GOOGLE_CATEGORY_MAP = {
+    'الأجهزة المنزلية والكهربائية': 'Electronics',
+    'الإلكترونيات والتكنولوجيا': 'Electronics',
+    'العناية الشخصية والصحة والجمال': 'Health & Beauty',
+    'الأحذية والملابس والإكسسوارات': 'Apparel & Accessories',
+    'الأثاث والأدوات المنزلية': 'Home & Garden',
+    'أدوات الحديقة والخارج': 'Home & Garden',
+    'أدوات الطبخ والمطبخ': 'Home & Garden',
+    'الأدوات والصيانة': 'Hardware',
+    'السيارات والإكسسوارات': 'Vehicles & Parts',
+    'الرياضة واللياقة والصحة': 'Sporting Goods',
+    'الألعاب والترفيه': 'Toys & Games',
+    'الكتب والقرطاسية': 'Office Supplies',
+}
+DEFAULT_GOOGLE_CATEGORY = 'Home & Garden'
+
+MAX_DESCRIPTION_LENGTH = 5000
+
+def clean_description(text):
+    """تنظيف الوصف من رموز التنسيق (** و &nbsp;) ودمج المسافات"""
+    text = (text or '').replace('&nbsp;', ' ').replace('\ufeff', '').replace('**', '')
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text[:MAX_DESCRIPTION_LENGTH]
+
+def _money(amount, currency):
+    return f"{amount} {currency}"
+
+def feed_row(product, base_url, shipping_fee=0, page_path=None):
+    """صف الفيد لمنتج واحد من حقول الكتالوج
+
+    page_path هو مسار الصفحة الثابتة من جدول الروابط المشترك، وبدونه يُستخدم product.html?id=.
+    """
+    currency = product.get('currency', 'AED')
+    regular_price = product.get('regular_price', 0)
+    sale_price = product.get('sale_price', 0)
+    on_sale = bool(sale_price) and regular_price > sale_price
+    threshold = product.get('free_shipping_threshold')
+    effective_price = sale_price if on_sale else regular_price
+    free_shipping = threshold is None or effective_price >= threshold
+    brand = product.get('brand', '')
+    category = product.get('category', '')
+    return {
+        'id': str(product.get('id', '')),
+        'title': product.get('title', '').strip(),
+        'description': clean_description(product.get('description', '')) or product.get('title', ''),
+        'link': f"{base_url}/{page_path}" if page_path else f"{base_url}/product.html?id={product.get('id', '')}",
+        'image_link': product.get('image_url', ''),
+        'availability': product.get('stock_status', 'in stock'),
+        'price': _money(regular_price or sale_price, currency),
+        'sale_price': _money(sale_price, currency) if on_sale else '',
+        'brand': brand if brand and brand != 'none' else 'Generic',
+        'condition': product.get('condition', 'new'),
+        'google_product_category': GOOGLE_CATEGORY_MAP.get(category, DEFAULT_GOOGLE_CATEGORY),
+        'product_type': category,
+        'identifier_exists': 'no',
+        'shipping': f"AE:::{_money(0 if free_shipping else shipping_fee, currency)}",
+        'free_shipping_threshold': f"AE:{_money(threshold, currency)}" if threshold is not None else '',
+        'custom_label_0': 'UAE Store',
+        'custom_label_1': 'On Sale' if on_sale else '',
+    }
+
+def row_digest(row):
+    """بصمة صف الفيد لمقارنته بالبناء السابق"""
+    payload = json.dumps(row, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+class _FeedWriter:
+    """كتابة فيد XML و CSV متوازيين صفًا بصف عبر OutputWriter"""
+
+    def __init__(self, writer, xml_path, csv_path, base_url):
+        self._xml_context = writer.open(xml_path)
+        self._csv_context = writer.open(csv_path)
+        self.xml = self._xml_context.__enter__()
+        self.csv_file = self._csv_context.__enter__()
+        self.csv = csv.writer(self.csv_file, lineterminator='\n')
+        self.count = 0
+        self.xml.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                       '<rss xmlns:g="http://base.google.com/ns/1.0" version="2.0">\n'
+                       '  <channel>\n'
+                       f'    <title>{xml_escape(FEED_TITLE)}</title>\n'
+                       f'    <link>{xml_escape(base_url)}/</link>\n'
+                       f'    <description>{xml_escape(FEED_DESCRIPTION)}</description>\n')
+        self.csv.writerow(FEED_COLUMNS)
+
+    def add(self, row):
+        self.csv.writerow([row[column] for column in FEED_COLUMNS])
+        lines = ['    <item>']
+        for column in FEED_COLUMNS:
+            value = row[column]
+            if not value:
+                continue
+            if column == 'shipping':
+                country, _, _, price = value.split(':', 3)
+                lines.append(f'      <g:shipping>\n        <g:country>{country}</g:country>\n'
+                             f'        <g:service>Standard</g:service>\n'
+                             f'        <g:price>{xml_escape(price)}</g:price>\n      </g:shipping>')
+            elif column == 'free_shipping_threshold':
+                country, price = value.split(':', 1)
+                lines.append(f'      <g:free_shipping_threshold>\n        <g:country>{country}</g:country>\n'
+                             f'        <g:price_threshold>{xml_escape(price)}</g:price_threshold>\n'
+                             f'      </g:free_shipping_threshold>')
+            else:
+                lines.append(f'      <g:{column}>{xml_escape(value)}</g:{column}>')
+        lines.append('    </item>\n')
+        self.xml.write('\n'.join(lines))
+        self.count += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.xml.write('  </channel>\n</rss>\n')
+        self._xml_context.__exit__(exc_type, exc, tb)
+        self._csv_context.__exit__(exc_type, exc, tb)
+
+def write_feed_rows(rows, base_url, writer=None, paths=(SUPPLEMENTAL_XML_PATH, SUPPLEMENTAL_CSV_PATH)):
+    """كتابة صفوف جاهزة في فيد XML و CSV (مثل الفيد الإضافي بالصفوف المعدلة)؛ تعيد عدد الصفوف"""
+    with _FeedWriter(writer or OutputWriter(), *paths, base_url) as feed:
+        for row in rows:
+            feed.add(row)
+    return feed.count
+
+class _RowStateIndex:
+    """بصمات صفوف البناء السابق مفهرسة في sqlite مؤقت حتى تبقى الذاكرة ثابتة مع نمو الكتالوج"""
+
+    def __init__(self, state_path):
+        fd, self.db_path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute('CREATE TABLE rows (id TEXT PRIMARY KEY, digest TEXT, seen INTEGER DEFAULT 0)')
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                self.db.executemany(
+                    'INSERT OR REPLACE INTO rows (id, digest) VALUES (?, ?)',
+                    ((record['id'], record['digest']) for record in map(json.loads, f) if record)
+                )
+            self.available = True
+        except (OSError, ValueError, KeyError):
+            self.db.execute('DELETE FROM rows')
+            self.available = False
+
+    def changed(self, product_id, digest):
+        row = self.db.execute('SELECT digest FROM rows WHERE id = ?', (product_id,)).fetchone()
+        if row is not None:
+            self.db.execute('UPDATE rows SET seen = 1 WHERE id = ?', (product_id,))
+        return row is None or row[0] != digest
+
+    def removed_count(self):
+        return self.db.execute('SELECT COUNT(*) FROM rows WHERE seen = 0').fetchone()[0]
+
+    def close(self):
+        self.db.close()
+        os.remove(self.db_path)
+
+def generate_merchant_feeds(products, base_url=None, writer=None, state_path=FEED_STATE_PATH,
+                            feed_paths=(FEED_XML_PATH, FEED_CSV_PATH),
+                            supplemental_paths=(SUPPLEMENTAL_XML_PATH, SUPPLEMENTAL_CSV_PATH)):
+    """كتابة الفيد الكامل والفيد الإضافي (الصفوف المتغيرة منذ آخر بناء) في تمريرة واحدة متدفقة
+
+    تعيد (عدد المنتجات، عدد الصفوف المتغيرة، عدد المنتجات المحذوفة).
+    """
+    writer = writer or OutputWriter()
+    config = load_site_config()
+    if base_url is None:
+        base_url = site_base_url(config)
+    shipping_fee = config.get('shipping_fee', 0)
+    product_urls = load_product_urls()
+    index = _RowStateIndex(state_path)
+    changed = 0
+    try:
+        with _FeedWriter(writer, *feed_paths, base_url) as feed, \
+                _FeedWriter(writer, *supplemental_paths, base_url) as supplemental, \
+                writer.open(state_path) as state:
+            for product in products:
+                row = feed_row(product, base_url, shipping_fee, product_urls.get(str(product.get('id', ''))))
+                digest = row_digest(row)
+                feed.add(row)
+                if index.changed(row['id'], digest):
+                    supplemental.add(row)
+                    changed += 1
+                state.write(json.dumps({'id': row['id'], 'digest': digest}))
+                state.write('\n')
+        removed = index.removed_count() if index.available else 0
+    finally:
+        index.close()
+    return feed.count, changed, removed
+
+def main(argv=None):
+    """تشغيل مولد الفيد (يعيد 1 عند الفشل حتى يفشل خط النشر)"""
+    parser = argparse.ArgumentParser(description='مولد فيد جوجل مرشنت سنتر - سوق الإمارات')
+    parser.add_argument('--products', default=PRODUCTS_PATH, help='مسار ملف المنتجات (JSON أو NDJSON)')
+    args = parser.parse_args(argv)
+    writer = OutputWriter()
+    try:
+        total, changed, removed = generate_merchant_feeds(iter_products(args.products), writer=writer)
+    except Exception as e:
+        print(f"❌ حدث خطأ: {e}")
+        return 1
+    print(f"🛒 تم إنشاء الفيد لـ {total} منتج ({FEED_XML_PATH}, {FEED_CSV_PATH})")
+    print(f"🔄 الفيد الإضافي: {changed} منتج تغير، {removed} منتج حُذف منذ آخر بناء")
+    print(writer.summary())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
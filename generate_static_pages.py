@@ -5,402 +5,539 @@
 يقوم بإنشاء صفحة HTML منفصلة لكل منتج مع SEO وتصميم 3D
 """
 
+import argparse
+import gzip
+import hashlib
+import io
 import json
+import multiprocessing
 import re
 import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from collections import deque
+from glob import glob
+from html import escape as html_escape
+from itertools import islice
 from urllib.parse import quote
+from xml.sax.saxutils import escape as xml_escape
 
-def create_arabic_slug(title, product_id):
-    """إنشاء رابط عربي للمنتج"""
-    slug = title.strip()
-    
-    # تنظيف الرموز الخاصة مع الحفاظ على العربية
-    slug = re.sub(r'[^\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\u0590-\u05FF\w\s-]', '', slug)
-    slug = re.sub(r'\s+', '-', slug)
-    slug = re.sub(r'-+', '-', slug)
-    slug = slug.strip('-')
-    
-    return f"{slug}-{product_id}"
+from build_output import OutputWriter, delete_if_exists, write_if_changed
+from build_report import BuildReport, DEFAULT_SLOWEST_COUNT, elapsed, profiled, stage_clock
+from build_service_worker import write_service_worker
+from dedup_products import (DUPLICATE_THRESHOLD, DUPLICATES_REPORT_PATH, duplicate_map, find_duplicate_clusters,
+                            load_duplicates_report, print_duplicates_summary, save_duplicates_report)
+from precompress import discard_variants, minify_css, minify_html, minify_js, precompress_paths
+from probe_images import IMAGE_STATUS_PATH, dead_image_urls, load_image_status
+from related_products import RELATED_PRODUCTS_PATH, compute_related_products
+from seo_sooq_alemarat_by_files import catalog_seo_block
+from slug_registry import (PRODUCT_URLS_PATH, SLUG_REGISTRY_PATH, SlugRegistry, create_arabic_slug,
+                           load_product_urls, redirect_stub_html)
+from validate_site import VALIDATION_REPORT_PATH, validate_site
 
-def create_product_page_html(product):
-    """إنشاء صفحة HTML كاملة للمنتج"""
-    
-    # حساب الخصم
-    discount_percentage = 0
-    if product.get('regular_price', 0) > product.get('sale_price', 0):
-        regular = float(product.get('regular_price', 0))
-        sale = float(product.get('sale_price', 0))
-        discount_percentage = round(((regular - sale) / regular) * 100) if regular > 0 else 0
-    
-    # تنسيق السعر
-    sale_price = product.get('sale_price', 0)
-    regular_price = product.get('regular_price', 0)
-    currency = product.get('currency', 'AED')
-    
-    # شارة الخصم
-    discount_badge = f'<span class="discount-badge">خصم {discount_percentage}%</span>' if discount_percentage > 0 else ''
-    
-    # عرض السعر الأصلي
-    original_price_display = f'<span class="old-price">{regular_price} {currency}</span>' if regular_price > sale_price else ''
-    
-    # وصف المنتج
-    description = product.get('description', '').replace('•', '\n•')
-    description_short = description[:150] + '...' if len(description) > 150 else description
-    
-    # رسالة واتساب
-    whatsapp_message = quote(f'السلام عليكم ورحمة الله وبركاته\n\nأريد الاستفسار عن:\n{product.get("title", "")}\n\nالسعر: {sale_price} {currency}\nالفئة: {product.get("category", "")}\n\nأرجو التواصل معي لتأكيد الطلب وتفاصيل التوصيل.\n\nشكراً لكم')
-    whatsapp_message_simple = quote(f'أريد الاستفسار عن {product.get("title", "")} - {sale_price} {currency}')
-    
-    # تشفير العنوان للرابط
-    title_encoded = quote(product.get('title', '')[:20])
-    
-    template = f'''<!DOCTYPE html>
+# ملف بيان البناء: بصمة كل منتج وبصمة القالب لإعادة التوليد التزايدي
+BUILD_MANIFEST_PATH = 'data/build-manifest.ndjson'
+
+# ملف المنتجات وقائمة الصفحات المولدة في وضع التدفق
+PRODUCTS_PATH = 'data/uae-products.json'
+PAGES_LIST_NDJSON_PATH = 'data/generated-pages-list.ndjson'
+
+# تقرير البناء (JSON): زمن كل مرحلة والملفات المكتوبة والذاكرة وأبطأ المنتجات
+BUILD_REPORT_PATH = 'data/build-report.json'
+
+# مجلد صفحات المنتجات نسبةً إلى جذر الموقع
+PRODUCT_PAGES_FOLDER = 'data/pruducts-pages'
+
+# سجلات JSON لكل منتج ({id}.{hash}.json) وجدول المعرف ← البصمة لصفحة product.html والسلة
+PRODUCT_RECORDS_FOLDER = 'data/products'
+PRODUCT_RECORDS_INDEX_NAME = 'index.json'
+RECORD_HASH_LENGTH = 10
+
+# إعدادات الموقع وحدود بروتوكول sitemap لكل ملف
+SITE_CONFIG_PATH = 'config/site.json'
+DEFAULT_BASE_URL = 'https://sherow1982.github.io/sooq-alemarat'
+SITEMAP_MAX_URLS = 50000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+
+# مجلد الأصول المشتركة وطول بصمة المحتوى في أسماء ملفاتها
+ASSETS_FOLDER = 'assets'
+ASSET_HASH_LENGTH = 10
+
+# مسار جذر الموقع نسبةً إلى مجلد صفحات المنتجات data/pruducts-pages
+PRODUCT_PAGE_ASSET_PREFIX = '../../'
+
+# لغات صفحات المنتجات (LOCALES): الأساسية في مجلد الصفحات أعلاه وكل لغة إضافية في مجلدها بنفس أسماء الملفات
+PRIMARY_LOCALE = 'ar'
+DEFAULT_LOCALES = ('ar', 'en')
+
+# صفحات الفئات الثابتة المرقمة: categories/{slug}/index.html ثم page-2.html ...
+CATEGORY_PAGES_FOLDER = 'categories'
+CATEGORY_PAGE_SIZE = 24
+CATEGORY_PAGE_ASSET_PREFIX = '../../'
+
+# بديل الصور المفقودة من الموقع نفسه: للصور المؤكد فقدها وقت البناء (برابط كامل لأنه يظهر في السكيما
+# والخلاصات)، ولـ onerror في القالب، فلا تعتمد الصفحات على خدمة صور خارجية
+PLACEHOLDER_IMAGE_PATH = 'assets/img/placeholder.svg'
+
+# روابط الفئات التي لها صفحة هبوط في جذر الموقع (كما في js/category-routing.js)
+CATEGORY_SLUGS = {
+    'الأجهزة المنزلية والكهربائية': 'home-appliances-electrical',
+    'الإلكترونيات والتكنولوجيا': 'electronics-technology',
+    'العناية الشخصية والصحة والجمال': 'personal-care-health-beauty',
+    'الأحذية والملابس والإكسسوارات': 'shoes-clothing-accessories',
+    'الرياضة واللياقة والصحة': 'sports-fitness-health',
+    'الأثاث والأدوات المنزلية': 'furniture-home-tools',
+    'الأدوات والصيانة': 'tools-maintenance',
+    'منتجات متنوعة': 'miscellaneous-products',
+}
+
+# عدد المنتجات في كل دفعة تُرسل إلى عملية عاملة عند استخدام --jobs
+PAGE_CHUNK_SIZE = 32
+
+# منتج ثابت يُستخدم لحساب بصمة القالب (أي تعديل في القالب يغير البصمة)
+_TEMPLATE_SAMPLE_PRODUCT = {
+    'id': '0',
+    'title': 'منتج تجريبي',
+    'description': 'وصف • تجريبي',
+    'category': 'فئة',
+    'brand': 'none',
+    'regular_price': 200,
+    'sale_price': 150,
+    'currency': 'AED',
+    'image_url': 'https://example.com/image.png',
+}
+
+# الأنماط والسكربت المشتركة لكل صفحات المنتجات (تُكتب مرة واحدة كملفات ببصمة المحتوى)
+PRODUCT_PAGE_CSS = '''* { margin: 0; padding: 0; box-sizing: border-box; }
+body { 
+    font-family: 'Cairo', 'Segoe UI', Tahoma, Arial, sans-serif; 
+    direction: rtl; 
+    background: #f8f9fa; 
+    color: #333;
+    line-height: 1.6;
+}
+
+.container { 
+    max-width: 1200px; 
+    margin: 0 auto; 
+    background: white; 
+    border-radius: 15px; 
+    padding: 30px; 
+    margin-top: 20px;
+    box-shadow: 0 4px 20px rgba(0,0,0,0.1); 
+}
+
+.header {
+    background: linear-gradient(135deg, #DAA520 0%, #FFD700 100%);
+    color: white;
+    padding: 1.5rem 0;
+    margin: -30px -30px 30px -30px;
+    border-radius: 15px 15px 0 0;
+    text-align: center;
+}
+
+.header h1 {
+    font-size: 1.8rem;
+    font-weight: 800;
+    margin-bottom: 0.5rem;
+}
+
+.breadcrumb {
+    background: #f8f9fa;
+    padding: 15px;
+    margin-bottom: 25px;
+    border-radius: 10px;
+    font-size: 0.9em;
+    border: 2px solid #DAA520;
+}
+
+.breadcrumb a { color: #DAA520; text-decoration: none; font-weight: 600; }
+.breadcrumb a:hover { text-decoration: underline; }
+
+.product-header { 
+    display: grid; 
+    grid-template-columns: 1fr 1fr; 
+    gap: 40px; 
+    margin-bottom: 40px; 
+}
+
+.product-image { text-align: center; }
+.product-image img { 
+    width: 100%; 
+    max-width: 450px; 
+    border-radius: 15px; 
+    box-shadow: 0 8px 25px rgba(0,0,0,0.15);
+    transition: transform 0.3s ease;
+}
+
+.product-image img:hover {
+    transform: scale(1.05);
+}
+
+.product-info h1 { 
+    font-size: 2.4em; 
+    color: #2c3e50; 
+    margin-bottom: 20px; 
+    font-weight: bold;
+    line-height: 1.3;
+}
+
+.product-meta {
+    display: flex;
+    gap: 15px;
+    margin-bottom: 25px;
+    flex-wrap: wrap;
+}
+
+.category { 
+    background: linear-gradient(135deg, #4F46E5, #7C3AED); 
+    color: white; 
+    padding: 8px 20px; 
+    border-radius: 25px; 
+    font-size: 0.95em;
+    font-weight: 600; 
+}
+
+.brand { 
+    background: #e9ecef; 
+    padding: 8px 20px; 
+    border-radius: 25px; 
+    font-size: 0.95em;
+    font-weight: 600; 
+}
+
+.uae-badge {
+    background: linear-gradient(45deg, #ff0000, #00ff00, #000000);
+    color: white;
+    padding: 8px 15px;
+    border-radius: 25px;
+    font-size: 0.9em;
+    font-weight: bold;
+}
+
+.price-section { 
+    background: linear-gradient(135deg, #f0fff4 0%, #dcfce7 100%);
+    padding: 25px; 
+    border-radius: 15px; 
+    margin: 25px 0;
+    border: 3px solid #10B981;
+    text-align: center;
+}
+
+.price { 
+    font-size: 2.8em; 
+    font-weight: 900; 
+    color: #059669;
+    margin-bottom: 10px; 
+}
+
+.old-price { 
+    font-size: 1.4em; 
+    color: #6c757d; 
+    text-decoration: line-through; 
+    margin-left: 15px; 
+}
+
+.discount-badge { 
+    background: #dc3545; 
+    color: white; 
+    padding: 8px 15px; 
+    border-radius: 8px; 
+    font-size: 0.9em;
+    font-weight: 700; 
+    margin-left: 15px;
+    display: inline-block;
+    margin-bottom: 10px; 
+}
+
+.shipping-info { 
+    background: #cff4fc; 
+    border: 2px solid #0dcaf0;
+    padding: 20px; 
+    border-radius: 15px; 
+    margin: 25px 0; 
+}
+
+.shipping-info h4 {
+    color: #055160;
+    margin-bottom: 15px;
+    font-size: 1.3em;
+}
+
+.shipping-info p {
+    margin-bottom: 8px;
+    color: #087990;
+    font-weight: 500;
+}
+
+.action-buttons {
+    display: grid;
+    grid-template-columns: 1fr 1fr;
+    gap: 20px;
+    margin-top: 30px;
+}
+
+.whatsapp-btn {
+    background: linear-gradient(135deg, #25D366 0%, #128C7E 100%);
+    color: white; 
+    border: none; 
+    padding: 18px 25px; 
+    font-size: 1.3em;
+    font-weight: 700; 
+    border-radius: 12px; 
+    cursor: pointer;
+    text-decoration: none;
+    text-align: center;
+    transition: all 0.3s ease;
+    box-shadow: 0 6px 20px rgba(37, 211, 102, 0.3);
+}
+
+.whatsapp-btn:hover {
+    transform: translateY(-3px);
+    box-shadow: 0 10px 30px rgba(37, 211, 102, 0.4);
+    color: white;
+}
+
+.back-btn {
+    background: linear-gradient(135deg, #DAA520 0%, #FFD700 100%);
+    color: white; 
+    border: none; 
+    padding: 18px 25px; 
+    font-size: 1.3em;
+    font-weight: 700; 
+    border-radius: 12px; 
+    cursor: pointer;
+    text-decoration: none;
+    text-align: center;
+    transition: all 0.3s ease;
+    box-shadow: 0 6px 20px rgba(218, 165, 32, 0.3);
+}
+
+.back-btn:hover {
+    transform: translateY(-3px);
+    box-shadow: 0 10px 30px rgba(218, 165, 32, 0.4);
+    color: white;
+}
+
+.description { 
+    margin-top: 40px; 
+    line-height: 1.9;
+    font-size: 1.15em;
+    background: #f8f9fa;
+    padding: 25px;
+    border-radius: 15px;
+    border-right: 5px solid #DAA520;
+}
+
+.description h3 {
+    color: #2c3e50;
+    margin-bottom: 20px;
+    font-size: 1.6em;
+    display: flex;
+    align-items: center;
+    gap: 10px;
+}
+
+.features {
+    background: #f0f9ff;
+    padding: 25px;
+    border-radius: 15px;
+    margin-top: 30px;
+    border: 2px solid #0ea5e9;
+}
+
+.features h3 {
+    color: #0369a1;
+    margin-bottom: 20px;
+    font-size: 1.4em;
+}
+
+.features ul {
+    list-style: none;
+    padding: 0;
+}
+
+.features li {
+    padding: 12px 0;
+    border-bottom: 1px solid #e0f2fe;
+    position: relative;
+    padding-right: 35px;
+    font-size: 1.1em;
+}
+
+.features li::before {
+    content: '✅';
+    position: absolute;
+    right: 0;
+    font-size: 1.2em;
+}
+
+.whatsapp-float {
+    position: fixed;
+    bottom: 25px;
+    left: 25px;
+    z-index: 1000;
+    background: linear-gradient(135deg, #25D366 0%, #128C7E 100%);
+    color: white;
+    width: 70px;
+    height: 70px;
+    border-radius: 50%;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-size: 28px;
+    text-decoration: none;
+    box-shadow: 0 8px 25px rgba(37, 211, 102, 0.4);
+    transition: all 0.3s ease;
+    animation: pulse-whatsapp 2s infinite;
+}
+
+.whatsapp-float:hover {
+    transform: scale(1.1) translateY(-5px);
+    color: white;
+    box-shadow: 0 12px 35px rgba(37, 211, 102, 0.5);
+}
+
+.related-products {
+    margin-top: 30px;
+}
+
+.related-products h3 {
+    color: #2c3e50;
+    margin-bottom: 20px;
+    font-size: 1.4em;
+}
+
+.related-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fill, minmax(160px, 1fr));
+    gap: 15px;
+}
+
+.related-card {
+    display: block;
+    background: white;
+    border-radius: 12px;
+    overflow: hidden;
+    text-decoration: none;
+    color: #2c3e50;
+    box-shadow: 0 4px 15px rgba(0, 0, 0, 0.08);
+    transition: transform 0.3s ease;
+}
+
+.related-card:hover {
+    transform: translateY(-4px);
+}
+
+.related-card img {
+    width: 100%;
+    height: 140px;
+    object-fit: cover;
+}
+
+.related-card span {
+    display: block;
+    padding: 10px;
+    font-size: 0.95em;
+    line-height: 1.5;
+}
+
+/* English pages (dir="ltr") */
+[dir="ltr"] body {
+    font-family: 'Inter', 'Segoe UI', Tahoma, Arial, sans-serif;
+    direction: ltr;
+}
+
+[dir="ltr"] .old-price,
+[dir="ltr"] .discount-badge {
+    margin-left: 0;
+    margin-right: 15px;
+}
+
+[dir="ltr"] .description {
+    border-right: none;
+    border-left: 5px solid #DAA520;
+}
+
+[dir="ltr"] .features li {
+    padding-right: 0;
+    padding-left: 35px;
+}
+
+[dir="ltr"] .features li::before {
+    right: auto;
+    left: 0;
+}
+
+[dir="ltr"] .whatsapp-float {
+    left: auto;
+    right: 25px;
+}
+
+@keyframes pulse-whatsapp {
+    0%, 100% { transform: scale(1); }
+    50% { transform: scale(1.05); }
+}
+
+@media (max-width: 768px) { 
+    .product-header { 
+        grid-template-columns: 1fr; 
+        gap: 25px;
+    } 
+
+    .action-buttons {
+        grid-template-columns: 1fr;
+    }
+
+    .product-info h1 { font-size: 1.9em; }
+    .price { font-size: 2.2em; }
+    .container { padding: 20px; margin: 10px; }
+}
+'''
+
+PRODUCT_PAGE_JS = '''// Add smooth animations on page load
+document.addEventListener('DOMContentLoaded', function() {
+    const elements = document.querySelectorAll('.product-header, .description, .features');
+    elements.forEach((el, index) => {
+        el.style.opacity = '0';
+        el.style.transform = 'translateY(30px)';
+        setTimeout(() => {
+            el.style.transition = 'all 0.6s ease';
+            el.style.opacity = '1';
+            el.style.transform = 'translateY(0)';
+        }, index * 200);
+    });
+
+    // Add click tracking for analytics
+    document.querySelectorAll('a[href*="wa.me"]').forEach(btn => {
+        btn.addEventListener('click', function() {
+            const title = document.querySelector('.product-info h1');
+            console.log('WhatsApp inquiry sent for product: ' + (title ? title.textContent : ''));
+        });
+    });
+});
+
+// Register the site's service worker (sw.js); this file lives in assets/js/, two levels below the site root
+if ('serviceWorker' in navigator && !['localhost', '127.0.0.1'].includes(window.location.hostname)) {
+    const siteRoot = new URL('../../', document.currentScript.src);
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register(new URL('sw.js', siteRoot).href, { scope: siteRoot.pathname })
+            .catch(error => console.warn('Service worker registration failed:', error));
+    });
+}
+'''
+
+# قالب صفحة المنتج: {{name}} خانة تملأ لكل منتج، وcss_href/js_href ثوابت تدمج عند التجميع
+PRODUCT_PAGE_TEMPLATE = '''<!DOCTYPE html>
 <html lang="ar" dir="rtl">
 <head>
     <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{product.get('title', '')} - سوق الإمارات الإلكتروني</title>
-    <meta name="description" content="اشتري {product.get('title', '')} بأفضل سعر في الإمارات. {description_short}">
-    <meta name="keywords" content="{product.get('title', '')}, {product.get('category', '')}, تسوق, الإمارات, دبي, أبوظبي">
-    
-    <!-- Open Graph Tags -->
-    <meta property="og:title" content="{product.get('title', '')}">
-    <meta property="og:description" content="{description_short}">
-    <meta property="og:image" content="{product.get('image_url', '')}">
-    <meta property="og:type" content="product">
-    <meta property="product:price:amount" content="{sale_price}">
-    <meta property="product:price:currency" content="{currency}">
-    
-    <!-- JSON-LD Schema -->
-    <script type="application/ld+json">
-    {{
-        "@context": "https://schema.org/",
-        "@type": "Product",
-        "name": "{product.get('title', '')}",
-        "description": "{description_short}",
-        "image": "{product.get('image_url', '')}",
-        "brand": "{product.get('brand', 'none')}",
-        "category": "{product.get('category', '')}",
-        "offers": {{
-            "@type": "Offer",
-            "price": "{sale_price}",
-            "priceCurrency": "{currency}",
-            "availability": "https://schema.org/InStock"
-        }}
-    }}
-    </script>
-    
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ 
-            font-family: 'Cairo', 'Segoe UI', Tahoma, Arial, sans-serif; 
-            direction: rtl; 
-            background: #f8f9fa; 
-            color: #333;
-            line-height: 1.6;
-        }}
-        
-        .container {{ 
-            max-width: 1200px; 
-            margin: 0 auto; 
-            background: white; 
-            border-radius: 15px; 
-            padding: 30px; 
-            margin-top: 20px;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1); 
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, #DAA520 0%, #FFD700 100%);
-            color: white;
-            padding: 1.5rem 0;
-            margin: -30px -30px 30px -30px;
-            border-radius: 15px 15px 0 0;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            font-size: 1.8rem;
-            font-weight: 800;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .breadcrumb {{
-            background: #f8f9fa;
-            padding: 15px;
-            margin-bottom: 25px;
-            border-radius: 10px;
-            font-size: 0.9em;
-            border: 2px solid #DAA520;
-        }}
-        
-        .breadcrumb a {{ color: #DAA520; text-decoration: none; font-weight: 600; }}
-        .breadcrumb a:hover {{ text-decoration: underline; }}
-        
-        .product-header {{ 
-            display: grid; 
-            grid-template-columns: 1fr 1fr; 
-            gap: 40px; 
-            margin-bottom: 40px; 
-        }}
-        
-        .product-image {{ text-align: center; }}
-        .product-image img {{ 
-            width: 100%; 
-            max-width: 450px; 
-            border-radius: 15px; 
-            box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-            transition: transform 0.3s ease;
-        }}
-        
-        .product-image img:hover {{
-            transform: scale(1.05);
-        }}
-        
-        .product-info h1 {{ 
-            font-size: 2.4em; 
-            color: #2c3e50; 
-            margin-bottom: 20px; 
-            font-weight: bold;
-            line-height: 1.3;
-        }}
-        
-        .product-meta {{
-            display: flex;
-            gap: 15px;
-            margin-bottom: 25px;
-            flex-wrap: wrap;
-        }}
-        
-        .category {{ 
-            background: linear-gradient(135deg, #4F46E5, #7C3AED); 
-            color: white; 
-            padding: 8px 20px; 
-            border-radius: 25px; 
-            font-size: 0.95em;
-            font-weight: 600; 
-        }}
-        
-        .brand {{ 
-            background: #e9ecef; 
-            padding: 8px 20px; 
-            border-radius: 25px; 
-            font-size: 0.95em;
-            font-weight: 600; 
-        }}
-        
-        .uae-badge {{
-            background: linear-gradient(45deg, #ff0000, #00ff00, #000000);
-            color: white;
-            padding: 8px 15px;
-            border-radius: 25px;
-            font-size: 0.9em;
-            font-weight: bold;
-        }}
-        
-        .price-section {{ 
-            background: linear-gradient(135deg, #f0fff4 0%, #dcfce7 100%);
-            padding: 25px; 
-            border-radius: 15px; 
-            margin: 25px 0;
-            border: 3px solid #10B981;
-            text-align: center;
-        }}
-        
-        .price {{ 
-            font-size: 2.8em; 
-            font-weight: 900; 
-            color: #059669;
-            margin-bottom: 10px; 
-        }}
-        
-        .old-price {{ 
-            font-size: 1.4em; 
-            color: #6c757d; 
-            text-decoration: line-through; 
-            margin-left: 15px; 
-        }}
-        
-        .discount-badge {{ 
-            background: #dc3545; 
-            color: white; 
-            padding: 8px 15px; 
-            border-radius: 8px; 
-            font-size: 0.9em;
-            font-weight: 700; 
-            margin-left: 15px;
-            display: inline-block;
-            margin-bottom: 10px; 
-        }}
-        
-        .shipping-info {{ 
-            background: #cff4fc; 
-            border: 2px solid #0dcaf0;
-            padding: 20px; 
-            border-radius: 15px; 
-            margin: 25px 0; 
-        }}
-        
-        .shipping-info h4 {{
-            color: #055160;
-            margin-bottom: 15px;
-            font-size: 1.3em;
-        }}
-        
-        .shipping-info p {{
-            margin-bottom: 8px;
-            color: #087990;
-            font-weight: 500;
-        }}
-        
-        .action-buttons {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 20px;
-            margin-top: 30px;
-        }}
-        
-        .whatsapp-btn {{
-            background: linear-gradient(135deg, #25D366 0%, #128C7E 100%);
-            color: white; 
-            border: none; 
-            padding: 18px 25px; 
-            font-size: 1.3em;
-            font-weight: 700; 
-            border-radius: 12px; 
-            cursor: pointer;
-            text-decoration: none;
-            text-align: center;
-            transition: all 0.3s ease;
-            box-shadow: 0 6px 20px rgba(37, 211, 102, 0.3);
-        }}
-        
-        .whatsapp-btn:hover {{
-            transform: translateY(-3px);
-            box-shadow: 0 10px 30px rgba(37, 211, 102, 0.4);
-            color: white;
-        }}
-        
-        .back-btn {{
-            background: linear-gradient(135deg, #DAA520 0%, #FFD700 100%);
-            color: white; 
-            border: none; 
-            padding: 18px 25px; 
-            font-size: 1.3em;
-            font-weight: 700; 
-            border-radius: 12px; 
-            cursor: pointer;
-            text-decoration: none;
-            text-align: center;
-            transition: all 0.3s ease;
-            box-shadow: 0 6px 20px rgba(218, 165, 32, 0.3);
-        }}
-        
-        .back-btn:hover {{
-            transform: translateY(-3px);
-            box-shadow: 0 10px 30px rgba(218, 165, 32, 0.4);
-            color: white;
-        }}
-        
-        .description {{ 
-            margin-top: 40px; 
-            line-height: 1.9;
-            font-size: 1.15em;
-            background: #f8f9fa;
-            padding: 25px;
-            border-radius: 15px;
-            border-right: 5px solid #DAA520;
-        }}
-        
-        .description h3 {{
-            color: #2c3e50;
-            margin-bottom: 20px;
-            font-size: 1.6em;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-        
-        .features {{
-            background: #f0f9ff;
-            padding: 25px;
-            border-radius: 15px;
-            margin-top: 30px;
-            border: 2px solid #0ea5e9;
-        }}
-        
-        .features h3 {{
-            color: #0369a1;
-            margin-bottom: 20px;
-            font-size: 1.4em;
-        }}
-        
-        .features ul {{
-            list-style: none;
-            padding: 0;
-        }}
-        
-        .features li {{
-            padding: 12px 0;
-            border-bottom: 1px solid #e0f2fe;
-            position: relative;
-            padding-right: 35px;
-            font-size: 1.1em;
-        }}
-        
-        .features li::before {{
-            content: '✅';
-            position: absolute;
-            right: 0;
-            font-size: 1.2em;
-        }}
-        
-        .whatsapp-float {{
-            position: fixed;
-            bottom: 25px;
-            left: 25px;
-            z-index: 1000;
-            background: linear-gradient(135deg, #25D366 0%, #128C7E 100%);
-            color: white;
-            width: 70px;
-            height: 70px;
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 28px;
-            text-decoration: none;
-            box-shadow: 0 8px 25px rgba(37, 211, 102, 0.4);
-            transition: all 0.3s ease;
-            animation: pulse-whatsapp 2s infinite;
-        }}
-        
-        .whatsapp-float:hover {{
-            transform: scale(1.1) translateY(-5px);
-            color: white;
-            box-shadow: 0 12px 35px rgba(37, 211, 102, 0.5);
-        }}
-        
-        @keyframes pulse-whatsapp {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.05); }}
-        }}
-        
-        @media (max-width: 768px) {{ 
-            .product-header {{ 
-                grid-template-columns: 1fr; 
-                gap: 25px;
-            }} 
-            
-            .action-buttons {{
-                grid-template-columns: 1fr;
-            }}
-            
-            .product-info h1 {{ font-size: 1.9em; }}
-            .price {{ font-size: 2.2em; }}
-            .container {{ padding: 20px; margin: 10px; }}
-        }}
-    </style>
+{{seo_block}}
+    
+    <link rel="stylesheet" href="{{css_href}}">
 </head>
 <body>
     <!-- Header -->
@@ -413,32 +550,32 @@ def create_product_page_html(product):
         <!-- Breadcrumb -->
         <nav class="breadcrumb">
             <a href="../../index.html">🏠 الرئيسية</a> / 
-            <a href="../../index.html#categories">{product.get('category', 'منتجات عامة')}</a> / 
-            <span>{product.get('title', 'منتج')}</span>
+            <a href="../../index.html#categories">{{category_or_default}}</a> / 
+            <span>{{title_or_default}}</span>
         </nav>
         
         <!-- Product Header -->
         <div class="product-header">
             <div class="product-image">
-                <img src="{product.get('image_url', '')}" 
-                     alt="{product.get('title', '')}" 
+                <img src="{{image_url}}" 
+                     alt="{{title}}" 
                      loading="lazy"
-                     onerror="this.src='https://via.placeholder.com/400x300/DAA520/FFFFFF?text={title_encoded}'">
+                     onerror="this.onerror=null;this.src='{{placeholder_src}}'">
             </div>
             
             <div class="product-info">
-                <h1>{product.get('title', '')}</h1>
+                <h1>{{title}}</h1>
                 
                 <div class="product-meta">
-                    <span class="brand">🏷️ {product.get('brand', 'غير محدد')}</span>
-                    <span class="category">📂 {product.get('category', 'منتجات عامة')}</span>
+                    <span class="brand">🏷️ {{brand_or_default}}</span>
+                    <span class="category">📂 {{category_or_default}}</span>
                     <span class="uae-badge">🇦🇪 منتج إماراتي 100%</span>
                 </div>
                 
                 <div class="price-section">
-                    {discount_badge}
-                    {original_price_display}
-                    <div class="price">{sale_price} درهم إماراتي</div>
+                    {{discount_badge}}
+                    {{original_price_display}}
+                    <div class="price">{{sale_price}} درهم إماراتي</div>
                 </div>
                 
                 <div class="shipping-info">
@@ -453,7 +590,7 @@ def create_product_page_html(product):
                     <a href="../../index.html" class="back-btn">
                         🏠 العودة للرئيسية
                     </a>
-                    <a href="https://wa.me/201110760081?text={whatsapp_message}" 
+                    <a href="https://wa.me/201110760081?text={{whatsapp_message}}" 
                        class="whatsapp-btn" target="_blank" rel="noopener">
                         📱 اطلب عبر واتساب
                     </a>
@@ -464,7 +601,7 @@ def create_product_page_html(product):
         <!-- Product Description -->
         <div class="description">
             <h3>📋 وصف المنتج التفصيلي</h3>
-            <div style="white-space: pre-line;">{description}</div>
+            <div style="white-space: pre-line;">{{description}}</div>
         </div>
         
         <!-- Product Features -->
@@ -479,160 +616,1758 @@ def create_product_page_html(product):
                 <li>منتج إماراتي أصلي 100%</li>
             </ul>
         </div>
+{{related_section}}
     </div>
     
     <!-- WhatsApp Float Button -->
-    <a href="https://wa.me/201110760081?text={whatsapp_message_simple}" 
+    <a href="https://wa.me/201110760081?text={{whatsapp_message_simple}}" 
        class="whatsapp-float" target="_blank" rel="noopener" title="تواصل معنا عبر واتساب">
         📱
     </a>
     
-    <script>
-        // Add smooth animations on page load
-        document.addEventListener('DOMContentLoaded', function() {{
-            const elements = document.querySelectorAll('.product-header, .description, .features');
-            elements.forEach((el, index) => {{
-                el.style.opacity = '0';
-                el.style.transform = 'translateY(30px)';
-                setTimeout(() => {{
-                    el.style.transition = 'all 0.6s ease';
-                    el.style.opacity = '1';
-                    el.style.transform = 'translateY(0)';
-                }}, index * 200);
-            }});
+    <script src="{{js_href}}" defer></script>
+</body>
+</html>'''
+
+# نفس القالب بالإنجليزية لصفحات en/products (العنوان والوصف من الكتالوج كما هما)
+PRODUCT_PAGE_TEMPLATE_EN = '''<!DOCTYPE html>
+<html lang="en" dir="ltr">
+<head>
+    <meta charset="UTF-8">
+{{seo_block}}
+    
+    <link rel="stylesheet" href="{{css_href}}">
+</head>
+<body>
+    <!-- Header -->
+    <div class="header">
+        <h1>🛍️ Emirates Souq Gifts</h1>
+        <p>The best products at unbeatable prices</p>
+    </div>
+    
+    <div class="container">
+        <!-- Breadcrumb -->
+        <nav class="breadcrumb">
+            <a href="../index.html">🏠 Home</a> / 
+            <a href="../index.html#categories">{{category_or_default}}</a> / 
+            <span>{{title_or_default}}</span>
+        </nav>
+        
+        <!-- Product Header -->
+        <div class="product-header">
+            <div class="product-image">
+                <img src="{{image_url}}" 
+                     alt="{{title}}" 
+                     loading="lazy"
+                     onerror="this.onerror=null;this.src='{{placeholder_src}}'">
+            </div>
             
-            // Add click tracking for analytics
-            document.querySelectorAll('a[href*="wa.me"]').forEach(btn => {{
-                btn.addEventListener('click', function() {{
-                    console.log('WhatsApp inquiry sent for product: {product.get("title", "")}');
-                }});
-            }});
-        }});
-    </script>
+            <div class="product-info">
+                <h1>{{title}}</h1>
+                
+                <div class="product-meta">
+                    <span class="brand">🏷️ {{brand_or_default}}</span>
+                    <span class="category">📂 {{category_or_default}}</span>
+                    <span class="uae-badge">🇦🇪 100% UAE product</span>
+                </div>
+                
+                <div class="price-section">
+                    {{discount_badge}}
+                    {{original_price_display}}
+                    <div class="price">{{sale_price}} AED</div>
+                </div>
+                
+                <div class="shipping-info">
+                    <h4>🚚 Shipping &amp; Delivery</h4>
+                    <p>✅ Same-day delivery in Dubai and Abu Dhabi</p>
+                    <p>✅ Free shipping on orders over 100 AED</p>
+                    <p>✅ Cash on delivery across all emirates</p>
+                    <p>✅ 24/7 customer service</p>
+                </div>
+                
+                <div class="action-buttons">
+                    <a href="../index.html" class="back-btn">
+                        🏠 Back to Home
+                    </a>
+                    <a href="https://wa.me/201110760081?text={{whatsapp_message}}" 
+                       class="whatsapp-btn" target="_blank" rel="noopener">
+                        📱 Order via WhatsApp
+                    </a>
+                </div>
+            </div>
+        </div>
+        
+        <!-- Product Description -->
+        <div class="description">
+            <h3>📋 Product Description</h3>
+            <div style="white-space: pre-line;">{{description}}</div>
+        </div>
+        
+        <!-- Product Features -->
+        <div class="features">
+            <h3>⭐ Product Features</h3>
+            <ul>
+                <li>High quality and excellent specifications</li>
+                <li>Round-the-clock customer service</li>
+                <li>Meets UAE quality standards</li>
+                <li>Free technical support</li>
+                <li>Fast and safe delivery</li>
+                <li>100% genuine UAE product</li>
+            </ul>
+        </div>
+{{related_section}}
+    </div>
+    
+    <!-- WhatsApp Float Button -->
+    <a href="https://wa.me/201110760081?text={{whatsapp_message_simple}}" 
+       class="whatsapp-float" target="_blank" rel="noopener" title="Contact us on WhatsApp">
+        📱
+    </a>
+    
+    <script src="{{js_href}}" defer></script>
 </body>
 </html>'''
+
+# لغات صفحات المنتجات: مجلد كل لغة وقالبها ونصوص القيم المحسوبة فيها (الخصم ورسائل واتساب والقيم الافتراضية)
+LOCALES = {
+    'ar': {
+        'hreflang': 'ar-AE',
+        'og_locale': 'ar_AE',
+        'folder': PRODUCT_PAGES_FOLDER,
+        'template': PRODUCT_PAGE_TEMPLATE,
+        'discount': 'خصم {percentage}%',
+        'title_default': 'منتج',
+        'category_default': 'منتجات عامة',
+        'brand_default': 'غير محدد',
+        'whatsapp': ('السلام عليكم ورحمة الله وبركاته\n\nأريد الاستفسار عن:\n{title}\n\nالسعر: {price} {currency}\n'
+                     'الفئة: {category}\n\nأرجو التواصل معي لتأكيد الطلب وتفاصيل التوصيل.\n\nشكراً لكم'),
+        'whatsapp_simple': 'أريد الاستفسار عن {title} - {price} {currency}',
+        'related_heading': '🔗 منتجات ذات صلة',
+    },
+    'en': {
+        'hreflang': 'en-AE',
+        'og_locale': 'en_AE',
+        'folder': 'en/products',
+        'template': PRODUCT_PAGE_TEMPLATE_EN,
+        'discount': '{percentage}% OFF',
+        'title_default': 'Product',
+        'category_default': 'General products',
+        'brand_default': 'Not specified',
+        'whatsapp': ("Hello, I'm interested in:\n{title}\n\nPrice: {price} {currency}\nCategory: {category}\n\n"
+                     "Please contact me to confirm the order and delivery details.\n\nThank you"),
+        'whatsapp_simple': "Hello, I'm interested in: {title} (Price: {price} {currency})",
+        'related_heading': '🔗 Related products',
+    },
+}
+
+# صفحة قائمة فئة مرقمة: البطاقات مولدة مسبقًا فيصل المحتوى في أول استجابة HTML بدون JavaScript
+CATEGORY_PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="ar" dir="rtl">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{page_title}} | سوق الإمارات</title>
+    <meta name="description" content="{{description}}">
+    <link rel="canonical" href="{{canonical}}">
+{{pagination_links}}    <link href="https://fonts.googleapis.com/css2?family=Cairo:wght@400;600;700;800&display=swap" rel="stylesheet">
+    <link rel="stylesheet" href="{{css_href}}">
+    <meta property="og:title" content="{{page_title}} - سوق الإمارات">
+    <meta property="og:description" content="{{description}}">
+    <meta property="og:type" content="website">
+    <meta property="og:url" content="{{canonical}}">
+</head>
+<body>
+    <header class="header">
+        <div class="container">
+            <div class="header-content">
+                <a href="{{root}}" class="logo"><span>سوق الإمارات</span></a>
+                <nav><ul class="nav-list">
+                    <li><a href="{{root}}">🏠 الرئيسية</a></li>
+                    <li><a href="{{root}}cart.html">🛒 السلة</a></li>
+                </ul></nav>
+            </div>
+        </div>
+    </header>
+
+    <main>
+        <div class="container">
+            <div class="breadcrumb">
+                <a href="{{root}}">🏠 الرئيسية</a><span>←</span>{{breadcrumb}}
+            </div>
+
+            <section class="section">
+                <h1 class="category-title">{{heading}}</h1>
+                <p class="category-count">{{range_text}}</p>
+
+                <div class="products-grid" id="category-products" data-prerendered="true">
+{{cards}}
+                </div>
+
+{{pagination}}
+            </section>
+        </div>
+    </main>
+
+    <a href="https://wa.me/201110760081" class="whatsapp-float" target="_blank" rel="noopener" title="تواصل عبر واتساب">📱</a>
+</body>
+</html>
+'''
+
+CATEGORY_CARD_TEMPLATE = '''                    <div class="product-card" data-product-id="{id}">
+                        {discount}<a class="product-image" href="{href}">
+                            <img src="{image}" alt="{title}" loading="lazy">
+                        </a>
+                        <div class="product-info">
+                            <div class="product-category">{category}</div>
+                            <h3 class="product-title"><a href="{href}">{display_title}</a></h3>
+                            <div class="product-price">
+                                <span class="current-price">{price} {currency}</span>{original_price}
+                            </div>
+                            <div class="product-actions">
+                                <a href="{whatsapp}" class="btn whatsapp-btn" target="_blank" rel="noopener">📱 واتساب</a>
+                                <a href="{href}" class="btn view-details">👁 عرض التفاصيل</a>
+                            </div>
+                        </div>
+                    </div>'''
+
+_SLOT_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+_SITEMAP_SHARD_PATTERN = re.compile(r'sitemap-(?:[a-z]+-)?\d+\.xml(\.gz|\.br)?')
+_CATEGORY_PAGE_PATTERN = re.compile(r'(index|page-\d+)\.html(\.gz|\.br)?')
+
+def asset_filename(prefix, content, extension):
+    """اسم ملف أصل مشترك يحتوي بصمة المحتوى (مثل product.1a2b3c4d5e.css)"""
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:ASSET_HASH_LENGTH]
+    return f"{prefix}.{digest}.{extension}"
+
+def shared_asset_contents(minify=False):
+    """محتوى ملفات CSS/JS المشتركة (مصغّرة عند الطلب)"""
+    if minify:
+        return {'css': minify_css(PRODUCT_PAGE_CSS) + '\n', 'js': minify_js(PRODUCT_PAGE_JS) + '\n'}
+    return {'css': PRODUCT_PAGE_CSS, 'js': PRODUCT_PAGE_JS}
+
+def shared_asset_paths(assets_folder=ASSETS_FOLDER, minify=False):
+    """مسارات ملفات CSS/JS المشتركة لصفحات المنتجات"""
+    contents = shared_asset_contents(minify)
+    return {
+        'css': os.path.join(assets_folder, 'css', asset_filename('product', contents['css'], 'css')),
+        'js': os.path.join(assets_folder, 'js', asset_filename('product', contents['js'], 'js')),
+    }
+
+def write_shared_assets(assets_folder=ASSETS_FOLDER, writer=None, minify=False):
+    """كتابة ملفات CSS/JS المشتركة وحذف النسخ القديمة ذات البصمات السابقة"""
+    writer = writer or OutputWriter()
+    paths = shared_asset_paths(assets_folder, minify)
+    contents = shared_asset_contents(minify)
+    for kind, path in paths.items():
+        folder = os.path.dirname(path)
+        writer.write(path, contents[kind])
+        for name in os.listdir(folder):
+            if re.fullmatch(rf'product\.[0-9a-f]{{{ASSET_HASH_LENGTH}}}\.{kind}', name) and name != os.path.basename(path):
+                writer.delete(os.path.join(folder, name))
+    return paths
+
+def compile_template(source, **constants):
+    """تجميع القالب مرة واحدة: دمج الثوابت في الأجزاء الثابتة وإرجاع (الأجزاء، أسماء الخانات)"""
+    pieces = _SLOT_PATTERN.split(source)
+    parts = [pieces[0]]
+    slots = []
+    for index in range(1, len(pieces), 2):
+        name, literal = pieces[index], pieces[index + 1]
+        if name in constants:
+            parts[-1] += str(constants[name]) + literal
+        else:
+            slots.append(name)
+            parts.append(literal)
+    return tuple(parts), tuple(slots)
+
+def render_template(compiled, values):
+    """ملء خانات قالب مجمّع بقيم منتج واحد"""
+    parts, slots = compiled
+    output = [parts[0]]
+    for name, literal in zip(slots, parts[1:]):
+        output.append(str(values[name]))
+        output.append(literal)
+    return ''.join(output)
+
+@lru_cache(maxsize=None)
+def _compiled_product_template(minify=False, locale=PRIMARY_LOCALE):
+    """قالب صفحة المنتج المجمّع (للغة locale) مع روابط الأصول المشتركة نسبةً إلى مجلد الصفحات"""
+    paths = shared_asset_paths(minify=minify)
+    return compile_template(
+        LOCALES[locale]['template'],
+        css_href=PRODUCT_PAGE_ASSET_PREFIX + paths['css'].replace(os.sep, '/'),
+        js_href=PRODUCT_PAGE_ASSET_PREFIX + paths['js'].replace(os.sep, '/'),
+        placeholder_src=PRODUCT_PAGE_ASSET_PREFIX + PLACEHOLDER_IMAGE_PATH,
+    )
+
+def related_section_html(related, heading=LOCALES[PRIMARY_LOCALE]['related_heading']):
+    """قسم المنتجات ذات الصلة: related قائمة (اسم ملف الصفحة، العنوان، الصورة) في نفس المجلد"""
+    if not related:
+        return ''
+    cards = ''.join(
+        f'''
+                <a class="related-card" href="{html_escape(filename)}">
+                    <img src="{html_escape(image_url)}" alt="{html_escape(title)}" loading="lazy">
+                    <span>{html_escape(title)}</span>
+                </a>'''
+        for filename, title, image_url in related
+    )
+    return f'''        
+        <!-- Related Products -->
+        <div class="related-products">
+            <h3>{heading}</h3>
+            <div class="related-grid">{cards}
+            </div>
+        </div>'''
+
+def normalize_locales(locales):
+    """اللغات المطلوبة بدون تكرار، والأساسية أولًا دائمًا (صفحاتها مرجع بيان البناء وسجل الروابط)"""
+    unknown = [locale for locale in locales if locale not in LOCALES]
+    if unknown:
+        raise ValueError(f"لغات غير معروفة: {', '.join(unknown)} (المتاح: {', '.join(LOCALES)})")
+    return (PRIMARY_LOCALE,) + tuple(dict.fromkeys(locale for locale in locales if locale != PRIMARY_LOCALE))
+
+def locale_folders(output_folder, locales):
+    """[(اللغة، مجلد صفحاتها)]: الأساسية في output_folder وكل لغة إضافية في مجلدها"""
+    return [(locale, output_folder if locale == PRIMARY_LOCALE else LOCALES[locale]['folder'])
+            for locale in locales]
+
+def page_alternates(filename, locales):
+    """أزواج (hreflang، الرابط) لنسخ الصفحة بكل اللغات مع x-default للأساسية؛ لا شيء للغة واحدة"""
+    if len(locales) < 2:
+        return ()
+    return tuple((LOCALES[locale]['hreflang'], product_page_url(filename, locale)) for locale in locales) + (
+        ('x-default', product_page_url(filename)),)
+
+def localized_product(product, locale):
+    """المنتج بمحتوى لغة locale (title_{locale} و description_{locale} في الكتالوج) أو None إن لم يُترجم
+
+    نسخة اللغة غير المترجمة تُنشر بمحتوى اللغة الأساسية، فتشير canonical إلى الصفحة الأساسية بلا hreflang.
+    """
+    if locale == PRIMARY_LOCALE:
+        return product
+    title = product.get(f"title_{locale}")
+    description = product.get(f"description_{locale}")
+    if not (title and description):
+        return None
+    return dict(product, title=title, description=description)
+
+def product_page_values(product, related=()):
+    """قيم صفحة المنتج المستقلة عن اللغة (الخصم والأسعار والوصف وبطاقات ذات الصلة)
+
+    تُحسب مرة واحدة لكل منتج وتشترك فيها قوالب كل اللغات.
+    """
+    # حساب الخصم
+    discount_percentage = 0
+    if product.get('regular_price', 0) > product.get('sale_price', 0):
+        regular = float(product.get('regular_price', 0))
+        sale = float(product.get('sale_price', 0))
+        discount_percentage = round(((regular - sale) / regular) * 100) if regular > 0 else 0
     
-    return template
+    # تنسيق السعر
+    sale_price = product.get('sale_price', 0)
+    regular_price = product.get('regular_price', 0)
+    currency = product.get('currency', 'AED')
+    
+    # وصف المنتج
+    description = product.get('description', '').replace('•', '\n•')
+    description_short = description[:150] + '...' if len(description) > 150 else description
+    
+    return {
+        'title': product.get('title', ''),
+        'category': product.get('category', ''),
+        'brand': product.get('brand', 'none'),
+        'image_url': product.get('image_url', ''),
+        'description': description,
+        'description_short': description_short,
+        'sale_price': sale_price,
+        'currency': currency,
+        'discount_percentage': discount_percentage,
+        # عرض السعر الأصلي
+        'original_price_display': (f'<span class="old-price">{regular_price} {currency}</span>'
+                                   if regular_price > sale_price else ''),
+        'related': related,
+    }
+
+def create_product_page_html(product, page_url=None, minify=False, related=(), locale=PRIMARY_LOCALE,
+                             alternates=(), shared=None):
+    """إنشاء صفحة HTML كاملة للمنتج مع كتلة الميتا والسكيما المبنية من بيانات الكتالوج
 
-def generate_all_product_pages(products_data, output_folder='data/pruducts-pages'):
-    """توليد جميع صفحات المنتجات"""
+    related: روابط المنتجات ذات الصلة (اسم الملف، العنوان، الصورة) تُعرض أسفل الصفحة.
+    عند minify=True تُصغّر الصفحة وتشير إلى نسخ CSS/JS المصغّرة.
+    locale: لغة القالب (من LOCALES) و alternates روابط نسخ الصفحة بلغات أخرى (page_alternates).
+    shared: قيم product_page_values المحسوبة مسبقًا حتى لا تُعاد لكل لغة.
+    """
     
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
+    texts = LOCALES[locale]
+    if page_url is None:
+        slug = create_arabic_slug(product.get('title', ''), product.get('id', ''))
+        page_url = product_page_url(f"{slug}.html", locale)
+    if shared is None:
+        shared = product_page_values(product, related)
     
-    generated_files = []
+    title = shared['title']
+    sale_price = shared['sale_price']
+    currency = shared['currency']
     
-    for product in products_data:
+    # شارة الخصم
+    discount_percentage = shared['discount_percentage']
+    discount_badge = (f'<span class="discount-badge">{texts["discount"].format(percentage=discount_percentage)}</span>'
+                      if discount_percentage > 0 else '')
+    
+    # رسالة واتساب
+    whatsapp_message = quote(texts['whatsapp'].format(title=title, price=sale_price, currency=currency,
+                                                      category=shared['category']))
+    whatsapp_message_simple = quote(texts['whatsapp_simple'].format(title=title, price=sale_price, currency=currency))
+    
+    # الميتا وOpen Graph وTwitter وJSON-LD من الحقول المنظمة مباشرة (بدون تمريرة سيو ثانية)
+    seo_block = catalog_seo_block(product, page_url, shared['description_short'], texts['og_locale'], alternates)
+    
+    values = {
+        'seo_block': seo_block,
+        'title': title,
+        'title_or_default': product.get('title', texts['title_default']),
+        'category': shared['category'],
+        'category_or_default': product.get('category', texts['category_default']),
+        'brand': shared['brand'],
+        'brand_or_default': product.get('brand', texts['brand_default']),
+        'image_url': shared['image_url'],
+        'description': shared['description'],
+        'description_short': shared['description_short'],
+        'sale_price': sale_price,
+        'currency': currency,
+        'discount_badge': discount_badge,
+        'original_price_display': shared['original_price_display'],
+        'whatsapp_message': whatsapp_message,
+        'whatsapp_message_simple': whatsapp_message_simple,
+        'related_section': related_section_html(shared['related'], texts['related_heading']),
+    }
+    
+    html = render_template(_compiled_product_template(minify, locale), values)
+    return minify_html(html) if minify else html
+
+def localized_pages_html(product, filename, locales, minify=False, related=(), shared=None):
+    """HTML صفحة المنتج بكل لغة في locales (بترتيبها)، وروابط hreflang بين اللغات المترجمة فقط
+
+    نسخة اللغة غير المترجمة (localized_product) تحمل canonical الصفحة الأساسية ولا روابط hreflang.
+    """
+    contents = [localized_product(product, locale) for locale in locales]
+    alternates = page_alternates(filename, [locale for locale, content in zip(locales, contents) if content is not None])
+    if shared is None:
+        shared = product_page_values(product, related)
+    pages = []
+    for locale, content in zip(locales, contents):
+        if content is None:
+            pages.append(create_product_page_html(product, product_page_url(filename), minify, related, locale,
+                                                  shared=shared))
+        else:
+            pages.append(create_product_page_html(content, product_page_url(filename, locale), minify, related,
+                                                  locale, alternates, shared if content is product else None))
+    return pages
+
+def translated_locales(product, locales):
+    """اللغات التي للمنتج محتوى بها (الأساسية دائمًا)؛ وحدها تظهر في hreflang وفي sitemap لغتها"""
+    return tuple(locale for locale in locales if localized_product(product, locale) is not None)
+
+def product_hash(product):
+    """بصمة سجل المنتج لاكتشاف التغييرات بين عمليات البناء"""
+    payload = json.dumps(product, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def page_hash(product, related=()):
+    """بصمة مدخلات صفحة المنتج: سجله وروابط المنتجات ذات الصلة المعروضة فيها"""
+    if not related:
+        return product_hash(product)
+    return product_hash({'product': product, 'related': [list(link) for link in related]})
+
+class RelatedLinks:
+    """روابط المنتجات ذات الصلة لكل صفحة: (اسم الملف، العنوان، الصورة)
+
+    يحتفظ بالعنوان والفئة والصورة فقط لكل منتج (بدون الوصف)، فتبقى ذاكرته أصغر من الكتالوج المحمّل.
+    """
+
+    def __init__(self, products, related_path=RELATED_PRODUCTS_PATH, writer=None):
+        self.summaries = {}
+        for product in products:
+            product_id = str(product.get('id', ''))
+            self.summaries[product_id] = {
+                'id': product_id,
+                'title': product.get('title', ''),
+                'category': product.get('category', ''),
+                'image_url': product.get('image_url', ''),
+            }
+        self.related = compute_related_products(self.summaries.values(), related_path, writer=writer)
+
+    def links(self, product_id, resolve_slug):
+        """روابط منتج واحد؛ resolve_slug(المعرف، العنوان) يعيد رابط صفحة المنتج"""
+        links = []
+        for other in self.related.get(str(product_id), ()):
+            summary = self.summaries.get(other)
+            if summary is not None:
+                links.append((f"{resolve_slug(other, summary['title'])}.html", summary['title'],
+                              summary['image_url']))
+        return links
+
+def product_record_json(product, filename):
+    """سجل JSON المنتج كما تقرؤه product.html والسلة، مع مسار صفحته الثابتة"""
+    record = dict(product, page=f"{PRODUCT_PAGES_FOLDER}/{filename}")
+    return json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+def product_record_filename(product_id, content):
+    """اسم ملف السجل: المعرف ثم بصمة المحتوى، فيمكن تخزينه مؤقتًا للأبد"""
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:RECORD_HASH_LENGTH]
+    return f"{re.sub(r'[^0-9A-Za-z_-]', '_', str(product_id))}.{digest}.json"
+
+def record_hash(record_filename):
+    """بصمة السجل من اسم ملفه (كما تُكتب في جدول المعرف ← البصمة)"""
+    return record_filename.rsplit('.', 2)[-2]
+
+def template_fingerprint(minify=False, locales=(PRIMARY_LOCALE,)):
+    """بصمة قالب صفحة المنتج (تتغير مع أي تعديل في create_product_page_html أو خيار التصغير أو اللغات)"""
+    if len(locales) < 2:
+        html = create_product_page_html(_TEMPLATE_SAMPLE_PRODUCT, minify=minify)
+        return hashlib.sha256(html.encode('utf-8')).hexdigest()
+    digest = hashlib.sha256()
+    for html in localized_pages_html(_TEMPLATE_SAMPLE_PRODUCT, 'sample.html', locales, minify):
+        digest.update(html.encode('utf-8'))
+    return digest.hexdigest()
+
+def _read_manifest_lines(manifest_path):
+    """قراءة بيان البناء سطرًا بسطر: (بصمة القالب، مولد سجلات المنتجات)"""
+    f = open(manifest_path, 'r', encoding='utf-8')
+    try:
+        header = json.loads(f.readline() or '{}')
+    except ValueError:
+        f.close()
+        raise
+
+    def entries():
+        with f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    return header.get('template'), entries()
+
+def load_build_manifest(manifest_path=BUILD_MANIFEST_PATH):
+    """تحميل بيان البناء السابق (NDJSON) أو بيان فارغ إن لم يوجد"""
+    try:
+        template, entries = _read_manifest_lines(manifest_path)
+        products = {}
+        for entry in entries:
+            products[str(entry.pop('id'))] = entry
+    except (OSError, ValueError, KeyError):
+        return {'template': None, 'products': {}}
+    return {'template': template, 'products': products}
+
+def save_build_manifest(manifest, manifest_path=BUILD_MANIFEST_PATH, writer=None):
+    """حفظ بيان البناء بصيغة NDJSON: سطر للقالب ثم سطر لكل منتج"""
+    with _ManifestWriter(manifest_path, manifest['template'], writer) as manifest_writer:
+        for product_id, entry in manifest['products'].items():
+            manifest_writer.add(product_id, entry)
+
+class _ManifestWriter:
+    """كتابة بيان البناء تدريجيًا عبر OutputWriter (ملف مؤقت ثم استبدال ذري إن تغير المحتوى)"""
+
+    def __init__(self, manifest_path, template, writer=None):
+        self._context = (writer or OutputWriter()).open(manifest_path)
+        self.file = self._context.__enter__()
+        self._write({'template': template})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False, sort_keys=True))
+        self.file.write('\n')
+
+    def add(self, product_id, entry):
+        self._write({'id': str(product_id), **entry})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._context.__exit__(exc_type, exc, tb)
+
+class _ManifestIndex:
+    """فهرس على القرص (sqlite) لبيان البناء السابق حتى لا يُحمَّل كاملًا في الذاكرة في وضع التدفق"""
+
+    def __init__(self, manifest_path):
+        self.template = None
+        fd, self.db_path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute('CREATE TABLE previous (id TEXT PRIMARY KEY, entry TEXT, seen INTEGER DEFAULT 0)')
+        self.db.execute('CREATE TABLE live (filename TEXT PRIMARY KEY)')
         try:
-            # إنشاء slug عربي
-            slug = create_arabic_slug(product.get('title', ''), product.get('id', ''))
-            filename = f"{slug}.html"
+            self.template, entries = _read_manifest_lines(manifest_path)
+            self.db.executemany(
+                'INSERT OR REPLACE INTO previous (id, entry) VALUES (?, ?)',
+                ((str(entry.pop('id')), json.dumps(entry, ensure_ascii=False)) for entry in entries)
+            )
+        except (OSError, ValueError, KeyError):
+            self.template = None
+            self.db.execute('DELETE FROM previous')
+
+    def get(self, product_id):
+        """سجل المنتج في البناء السابق مع تعليمه كمنتج ما زال موجودًا"""
+        row = self.db.execute('SELECT entry FROM previous WHERE id = ?', (product_id,)).fetchone()
+        if row is None:
+            return None
+        self.db.execute('UPDATE previous SET seen = 1 WHERE id = ?', (product_id,))
+        return json.loads(row[0])
+
+    def mark_live(self, filename):
+        self.db.execute('INSERT OR IGNORE INTO live (filename) VALUES (?)', (filename,))
+
+    def removed_filenames(self):
+        """أسماء ملفات المنتجات التي اختفت من الكتالوج"""
+        rows = self.db.execute(
+            'SELECT entry FROM previous WHERE seen = 0'
+        )
+        for (entry,) in rows:
+            filename = json.loads(entry).get('filename')
+            if filename and not self.db.execute(
+                    'SELECT 1 FROM live WHERE filename = ?', (filename,)).fetchone():
+                yield filename
+
+    def entries(self):
+        """(المعرف، السجل) لكل منتج في البيان السابق"""
+        for product_id, entry in self.db.execute('SELECT id, entry FROM previous').fetchall():
+            yield product_id, json.loads(entry)
+
+    def removed_records(self):
+        """أسماء سجلات JSON للمنتجات التي اختفت من الكتالوج"""
+        for (entry,) in self.db.execute('SELECT entry FROM previous WHERE seen = 0'):
+            record = json.loads(entry).get('record')
+            if record:
+                yield record
+
+    def close(self):
+        self.db.close()
+        os.remove(self.db_path)
+
+class _JsonMapWriter:
+    """كتابة جدول JSON (معرف المنتج ← قيمة) تدريجيًا عبر OutputWriter"""
+
+    def __init__(self, path, writer=None):
+        self._context = (writer or OutputWriter()).open(path)
+        self.file = self._context.__enter__()
+        self.file.write('{')
+        self._separator = '\n'
+
+    def add(self, product_id, value):
+        self.file.write(f"{self._separator}{json.dumps(str(product_id))}:{json.dumps(value, ensure_ascii=False)}")
+        self._separator = ',\n'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.file.write('\n}\n')
+        return self._context.__exit__(exc_type, exc, tb)
+
+def _build_product_page(task):
+    """توليد صفحة منتج واحد بكل اللغات (تعمل داخل العملية الرئيسية أو في عملية عاملة)
+
+    قيم المنتج المحسوبة تُحسب مرة واحدة وتشترك فيها قوالب اللغات، وكل لغة تُكتب بنفس اسم الملف في مجلدها.
+    تعيد (معرف المنتج، النتيجة، رسالة الخطأ) حتى تُطبع الأخطاء بالترتيب في العملية الرئيسية.
+    """
+    (product, slug, aliases, output_folder, records_folder, old_entry, rebuild_all, now, minify, related,
+     locales) = task
+    start = stage_clock()
+    try:
+        # الرابط محسوم مسبقًا من سجل الروابط في العملية الرئيسية
+        filename = f"{slug}.html"
+        file_path = os.path.join(output_folder, filename)
+        folders = locale_folders(output_folder, locales)
+        translated = translated_locales(product, locales)
+        digest = page_hash(product, related)
+        
+        unchanged = (
+            not rebuild_all
+            and old_entry is not None
+            and old_entry.get('hash') == digest
+            and old_entry.get('filename') == filename
+            and all(os.path.exists(os.path.join(folder, filename)) for _, folder in folders)
+            and old_entry.get('record') is not None
+            and os.path.exists(os.path.join(records_folder, old_entry['record']))
+        )
+        
+        deleted = 0
+        written = False
+        locale_written = [False] * (len(folders) - 1)
+        stubs_written = 0
+        record_written = False
+        record_deleted = 0
+        bytes_written = 0
+        timings = {}
+        if unchanged:
+            updated = old_entry.get('updated', now)
+            record = old_entry['record']
+        else:
+            # سجل JSON للمنتج (اسمه يتغير مع محتواه) ومحتوى HTML لكل لغة من نفس القيم المحسوبة
+            clock = stage_clock()
+            record_json = product_record_json(product, filename)
+            record = product_record_filename(product.get('id', ''), record_json)
+            record_content = record_json.encode('utf-8')
+            html_contents = [html.encode('utf-8')
+                             for html in localized_pages_html(product, filename, locales, minify, related)]
+            timings['render'] = elapsed(clock)
+            
+            clock = stage_clock()
+            record_written = write_if_changed(os.path.join(records_folder, record), record_content)
+            if record_written:
+                bytes_written += len(record_content)
+            if old_entry and old_entry.get('record') not in (None, record):
+                record_deleted = int(delete_if_exists(os.path.join(records_folder, old_entry['record'])))
             
-            # إنشاء محتوى HTML
-            html_content = create_product_page_html(product)
+            # حفظ الملفات (لا يُعاد كتابة المحتوى المطابق)
+            for position, ((locale, folder), html_content) in enumerate(zip(folders, html_contents)):
+                page_path = os.path.join(folder, filename)
+                page_written = write_if_changed(page_path, html_content)
+                if page_written:
+                    bytes_written += len(html_content)
+                    discard_variants(page_path)
+                if position == 0:
+                    written = page_written
+                else:
+                    locale_written[position - 1] = page_written
             
-            # حفظ الملف
-            file_path = os.path.join(output_folder, filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            # وقت التحديث يتغير فقط عندما يتغير محتوى الصفحة فعلًا
+            updated = now if written or any(locale_written) or not old_entry else old_entry.get('updated', now)
             
-            generated_files.append({
+            # الروابط القديمة تصبح صفحات تحويل خفيفة إلى الرابط الحالي في مجلد اللغة الأساسية فقط
+            # (الروابط القديمة نُشرت بها وحدها)، وتحويلات اللغات الأخرى من بناءات سابقة تُحذف
+            old_filename = old_entry.get('filename') if old_entry else None
+            for locale, folder in folders:
+                stub_html = redirect_stub_html(filename, product_page_url(filename, locale))
+                for alias in aliases:
+                    stub_path = os.path.join(folder, f"{alias}.html")
+                    if locale != PRIMARY_LOCALE:
+                        if delete_if_exists(stub_path):
+                            discard_variants(stub_path)
+                            deleted += 1
+                        continue
+                    if write_if_changed(stub_path, stub_html):
+                        discard_variants(stub_path)
+                        stubs_written += 1
+                        bytes_written += len(stub_html.encode('utf-8'))
+                
+                # حذف الصفحة القديمة إذا تغير اسم الملف ولم يُحوَّل رابطها
+                if old_filename not in (None, filename) and old_filename[:-len('.html')] not in aliases:
+                    old_path = os.path.join(folder, old_filename)
+                    if delete_if_exists(old_path):
+                        discard_variants(old_path)
+                        deleted += 1
+            timings['write'] = elapsed(clock)
+        
+        result = {
+            'rendered': not unchanged,
+            'written': written,
+            'locale_written': locale_written,
+            'deleted': deleted,
+            'stubs_written': stubs_written,
+            'record_written': record_written,
+            'record_deleted': record_deleted,
+            'bytes_written': bytes_written,
+            'timings': timings,
+            'seconds': elapsed(start)[0],
+            'manifest': {
+                'hash': digest,
+                'slug': slug,
+                'filename': filename,
+                'record': record,
+                'updated': updated
+            },
+            'file': {
                 'id': product.get('id'),
                 'title': product.get('title', ''),
                 'slug': slug,
                 'filename': filename,
-                'path': file_path
-            })
-            
-        except Exception as e:
-            print(f"❌ خطأ في إنشاء صفحة المنتج {product.get('id', 'unknown')}: {e}")
+                'path': file_path,
+                'lastmod': updated
+            }
+        }
+        if len(translated) > 1:
+            result['file']['locales'] = list(translated[1:])
+        return product.get('id'), result, None
+        
+    except Exception as e:
+        return product.get('id', 'unknown'), None, str(e)
+
+def _page_tasks(products_data, output_folder, records_folder, lookup_previous, registry, rebuild_all, now, minify,
+                report=None, related_links=None, locales=DEFAULT_LOCALES):
+    """مهام _build_product_page: الرابط يُحسم هنا من سجل الروابط (مرحلة slug في التقرير)
+
+    مع related_links تُحسم أيضًا روابط المنتجات ذات الصلة؛ النتائج تُحفظ فلا يُسأل السجل عن المنتج مرتين.
+    """
+    resolved = {}
+    
+    def resolve(product_id, title):
+        product_id = str(product_id)
+        if product_id not in resolved:
+            resolved[product_id] = registry.resolve(product_id, title)
+        return resolved[product_id]
+    
+    for product in products_data:
+        clock = stage_clock()
+        if related_links is None:
+            slug, aliases = registry.resolve(product.get('id', ''), product.get('title', ''))
+            related = ()
+        else:
+            slug, aliases = resolve(product.get('id', ''), product.get('title', ''))
+            related = related_links.links(product.get('id', ''), lambda other, title: resolve(other, title)[0])
+        if report is not None:
+            report.add('slug', *elapsed(clock))
+        yield (product, slug, aliases, output_folder, records_folder, lookup_previous(str(product.get('id', ''))),
+               rebuild_all, now, minify, related, locales)
+
+def render_product_page(product, slug, aliases, old_entry, now, output_folder=PRODUCT_PAGES_FOLDER,
+                        records_folder=PRODUCT_RECORDS_FOLDER, minify=False, writer=None, related=(),
+                        locales=DEFAULT_LOCALES):
+    """توليد صفحة منتج واحد (بكل اللغات) وسجله برابط محسوم مسبقًا (لتحديث منتجات بعينها دون تمرير الكتالوج كاملًا)
+
+    related: روابط المنتجات ذات الصلة كما يعيدها RelatedLinks.links.
+    تعيد نتيجة _build_product_page (مدخل البيان وسجل الصفحة) وتضيف عداداتها إلى writer.
+    """
+    task = (product, slug, aliases, output_folder, records_folder, old_entry, False, now, minify, related,
+            normalize_locales(locales))
+    product_id, result, error = _build_product_page(task)
+    if error is not None:
+        raise RuntimeError(f"خطأ في إنشاء صفحة المنتج {product_id}: {error}")
+    if writer is not None:
+        _record_page_result(writer, result)
+    return result
+
+def write_records_index(manifest_products, records_folder=PRODUCT_RECORDS_FOLDER, writer=None):
+    """كتابة جدول المعرف ← بصمة السجل من مدخلات بيان البناء"""
+    with _JsonMapWriter(os.path.join(records_folder, PRODUCT_RECORDS_INDEX_NAME), writer) as records_index:
+        for product_id, entry in manifest_products.items():
+            records_index.add(product_id, record_hash(entry['record']))
+
+def _iter_page_results(products_data, output_folder, records_folder, lookup_previous, registry, rebuild_all, now,
+                       jobs, minify=False, report=None, related_links=None, locales=DEFAULT_LOCALES):
+    """مرحلة التوليد: تمرير المنتجات إلى _build_product_page وإرجاع (المعرف، النتيجة، المنتج) بترتيب الكتالوج"""
+    tasks = _page_tasks(products_data, output_folder, records_folder, lookup_previous, registry, rebuild_all, now,
+                        minify, report, related_links, locales)
+    # النتائج بنفس ترتيب المهام، فيُستعاد منتج كل نتيجة دون إرساله عائدًا من العملية العاملة
+    pending = deque()
+    tasks = (pending.append(task[0]) or task for task in tasks)
+    with _page_results(tasks, jobs) as results:
+        for product_id, result, error in results:
+            product = pending.popleft()
+            if error is not None:
+                print(f"❌ خطأ في إنشاء صفحة المنتج {product_id}: {error}")
+                continue
+            yield product_id, result, product
+
+def generate_all_product_pages(products_data, output_folder=PRODUCT_PAGES_FOLDER,
+                               manifest_path=BUILD_MANIFEST_PATH, force=False, jobs=1, writer=None,
+                               minify=False, records_folder=PRODUCT_RECORDS_FOLDER,
+                               registry_path=SLUG_REGISTRY_PATH, urls_path=PRODUCT_URLS_PATH, report=None,
+                               related_path=RELATED_PRODUCTS_PATH, locales=DEFAULT_LOCALES):
+    """توليد صفحات المنتجات وسجلات JSON الجديدة أو المعدلة فقط وحذف ملفات المنتجات المحذوفة
+
+    روابط الصفحات تؤخذ من سجل الروابط (registry_path)، ويُكتب جدول المعرف ← الرابط في urls_path.
+    كل منتج يُولد بكل لغات locales في نفس المرور (الأساسية في output_folder والبقية في مجلداتها).
+    المنتجات ذات الصلة تُحسب قبل التوليد (الكتل المتغيرة فقط، بذاكرة related_path)؛ None يعطلها.
+    عند تمرير report (BuildReport) تُسجل أزمنة مراحل slug و render و write وأبطأ المنتجات.
+
+    عند تمرير manifest_path=None أو force=True يعاد توليد كل الصفحات.
+    عند jobs > 1 يوزَّع الكتالوج على عدة عمليات وتعاد النتائج بنفس ترتيب المنتجات.
+    """
+    
+    locales = normalize_locales(locales)
+    folders = [folder for _, folder in locale_folders(output_folder, locales)]
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+    os.makedirs(records_folder, exist_ok=True)
+    
+    writer = writer or OutputWriter()
+    write_shared_assets(writer=writer, minify=minify)
+    fingerprint = template_fingerprint(minify, locales)
+    previous = load_build_manifest(manifest_path) if manifest_path else {'template': None, 'products': {}}
+    previous_products = previous['products']
+    rebuild_all = force or previous['template'] != fingerprint
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    
+    manifest_products = {}
+    generated_files = []
+    rendered = 0
+    deleted = 0
+    
+    related_links = None
+    if related_path:
+        products_data = list(products_data)
+        clock = stage_clock()
+        related_links = RelatedLinks(products_data, related_path, writer)
+        if report is not None:
+            report.add_since('related', clock)
+    
+    registry = SlugRegistry(registry_path, previous_products.items(), output_folder)
+    records_index_path = os.path.join(records_folder, PRODUCT_RECORDS_INDEX_NAME)
+    try:
+        with _JsonMapWriter(records_index_path, writer) as records_index, \
+                _JsonMapWriter(urls_path, writer) as urls_table:
+            results = _iter_page_results(products_data, output_folder, records_folder, previous_products.get,
+                                         registry, rebuild_all, now, jobs, minify, report, related_links, locales)
+            for product_id, result, product in results:
+                manifest_products[str(product_id)] = result['manifest']
+                records_index.add(product_id, record_hash(result['manifest']['record']))
+                urls_table.add(product_id, f"{PRODUCT_PAGES_FOLDER}/{result['manifest']['filename']}")
+                generated_files.append(result['file'])
+                _record_page_result(writer, result, report)
+                rendered += result['rendered']
+                deleted += result['deleted']
+        _finish_slug_registry(registry, registry_path, folders, writer)
+    finally:
+        registry.close()
+    
+    # حذف صفحات (بكل اللغات) وسجلات المنتجات التي لم تعد موجودة في الكتالوج
+    live_filenames = {entry['filename'] for entry in manifest_products.values()}
+    for product_id, old_entry in previous_products.items():
+        if product_id in manifest_products:
+            continue
+        filename = old_entry.get('filename')
+        if filename and filename not in live_filenames:
+            deleted += sum(_delete_page(writer, folder, filename) for folder in folders)
+        if old_entry.get('record'):
+            _delete_page(writer, records_folder, old_entry['record'])
+    
+    if manifest_path:
+        save_build_manifest({'template': fingerprint, 'products': manifest_products}, manifest_path, writer)
+    
+    print(f"🔁 تمت إعادة توليد {rendered} صفحة، {len(generated_files) - rendered} بدون تغيير، حذف {deleted} صفحة")
     
     return generated_files
 
-def create_sitemap(generated_files, base_url='https://sherow1982.github.io/sooq-alemarat'):
-    """إنشاء sitemap.xml لمحركات البحث"""
-    
-    sitemap_content = f'''<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-    <!-- الصفحة الرئيسية -->
-    <url>
-        <loc>{base_url}/</loc>
-        <changefreq>daily</changefreq>
-        <priority>1.0</priority>
-    </url>
-    
-    <!-- النسخة الإنجليزية -->
-    <url>
-        <loc>{base_url}/en/</loc>
-        <changefreq>weekly</changefreq>
-        <priority>0.8</priority>
-    </url>'''
-    
-    # إضافة صفحات المنتجات
-    for file_info in generated_files:
-        sitemap_content += f'''
-    <url>
-        <loc>{base_url}/data/pruducts-pages/{file_info['filename']}</loc>
-        <changefreq>monthly</changefreq>
-        <priority>0.7</priority>
-    </url>'''
-    
-    sitemap_content += f'''
-    
-    <!-- الصفحات القانونية -->
-    <url>
-        <loc>{base_url}/legal/terms.html</loc>
-        <changefreq>yearly</changefreq>
-        <priority>0.3</priority>
-    </url>
-    <url>
-        <loc>{base_url}/legal/privacy.html</loc>
-        <changefreq>yearly</changefreq>
-        <priority>0.3</priority>
-    </url>
-</urlset>'''
-    
-    with open('sitemap.xml', 'w', encoding='utf-8') as f:
-        f.write(sitemap_content)
-    
-    print(f"✅ تم إنشاء sitemap.xml مع {len(generated_files) + 4} رابط")
-
-def main():
-    """تشغيل المولد الرئيسي"""
+def stream_product_pages(products_data, output_folder=PRODUCT_PAGES_FOLDER,
+                         manifest_path=BUILD_MANIFEST_PATH, force=False, jobs=1, writer=None,
+                         minify=False, records_folder=PRODUCT_RECORDS_FOLDER,
+                         registry_path=SLUG_REGISTRY_PATH, urls_path=PRODUCT_URLS_PATH, report=None,
+                         category_pages=None, related_links=None, locales=DEFAULT_LOCALES):
+    """نسخة متدفقة من generate_all_product_pages بذاكرة ثابتة
+
+    تستقبل أي مولد للمنتجات وتعيد مولدًا لسجلات الصفحات، وتكتب بيان البناء سطرًا بسطر
+    أثناء المرور. البيان السابق يُفهرس على القرص بدل تحميله في الذاكرة.
+    عند تمرير category_pages (CategoryPagesWriter) يُضاف إليه كل منتج مع رابط صفحته في نفس المرور،
+    وعند تمرير related_links (RelatedLinks من مرور أول على الكتالوج) تُعرض المنتجات ذات الصلة.
+    """
+    locales = normalize_locales(locales)
+    folders = [folder for _, folder in locale_folders(output_folder, locales)]
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+    os.makedirs(records_folder, exist_ok=True)
+    writer = writer or OutputWriter()
+    write_shared_assets(writer=writer, minify=minify)
+    fingerprint = template_fingerprint(minify, locales)
+    index = _ManifestIndex(manifest_path)
+    registry = SlugRegistry(registry_path, index.entries(), output_folder)
+    rebuild_all = force or index.template != fingerprint
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    rendered = 0
+    total = 0
+    deleted = 0
+    
     try:
-        # تحميل بيانات المنتجات
-        with open('data/uae-products.json', 'r', encoding='utf-8') as f:
-            products = json.load(f)
+        records_index_path = os.path.join(records_folder, PRODUCT_RECORDS_INDEX_NAME)
+        with _ManifestWriter(manifest_path, fingerprint, writer) as manifest_writer, \
+                _JsonMapWriter(records_index_path, writer) as records_index, \
+                _JsonMapWriter(urls_path, writer) as urls_table:
+            results = _iter_page_results(products_data, output_folder, records_folder, index.get, registry,
+                                         rebuild_all, now, jobs, minify, report, related_links, locales)
+            for product_id, result, product in results:
+                manifest_writer.add(product_id, result['manifest'])
+                records_index.add(product_id, record_hash(result['manifest']['record']))
+                urls_table.add(product_id, f"{PRODUCT_PAGES_FOLDER}/{result['manifest']['filename']}")
+                if category_pages is not None:
+                    category_pages.add(product, f"{PRODUCT_PAGES_FOLDER}/{result['manifest']['filename']}")
+                index.mark_live(result['manifest']['filename'])
+                _record_page_result(writer, result, report)
+                rendered += result['rendered']
+                deleted += result['deleted']
+                total += 1
+                yield result['file']
+        
+        for filename in index.removed_filenames():
+            deleted += sum(_delete_page(writer, folder, filename) for folder in folders)
+        for record in index.removed_records():
+            _delete_page(writer, records_folder, record)
+        _finish_slug_registry(registry, registry_path, folders, writer)
+    finally:
+        registry.close()
+        index.close()
+    
+    print(f"🔁 تمت إعادة توليد {rendered} صفحة، {total - rendered} بدون تغيير، حذف {deleted} صفحة")
+
+@contextmanager
+def _page_results(tasks, jobs):
+    """نتائج توليد الصفحات بالترتيب، على التوالي أو عبر مجموعة عمليات"""
+    if jobs <= 1:
+        yield map(_build_product_page, tasks)
+        return
+    with multiprocessing.Pool(processes=jobs) as pool:
+        yield _pooled_results(pool, tasks, jobs)
+
+def _pooled_results(pool, tasks, jobs):
+    """توزيع المهام على العمليات في نوافذ محدودة حتى لا يُستهلك مولد المنتجات كاملًا مقدمًا"""
+    window = jobs * PAGE_CHUNK_SIZE * 4
+    while True:
+        batch = list(islice(tasks, window))
+        if not batch:
+            return
+        # imap يحافظ على ترتيب الكتالوج، وchunksize يقسم المنتجات إلى دفعات لكل عملية
+        yield from pool.imap(_build_product_page, batch, chunksize=PAGE_CHUNK_SIZE)
+
+def _delete_page(writer, output_folder, filename):
+    """حذف صفحة (أو سجل) منتج لم يعد موجودًا مع نسخه المضغوطة"""
+    path = os.path.join(output_folder, filename)
+    discard_variants(path)
+    return writer.delete(path)
+
+def _finish_slug_registry(registry, registry_path, folders, writer):
+    """حذف صفحات التحويل للمنتجات المحذوفة (من مجلدات كل اللغات) وطباعة التصادمات ثم حفظ سجل الروابط"""
+    for product_id, slug, aliases in registry.removed():
+        for name in [slug] + aliases:
+            for folder in folders:
+                _delete_page(writer, folder, f"{name}.html")
+    for product_id, candidate, owner in registry.collisions:
+        print(f"⚠️ تصادم روابط: المنتج {product_id} يريد {candidate} المحجوز للمنتج {owner}")
+    registry.save(registry_path, writer)
+
+def _record_page_result(writer, result, report=None):
+    """نقل نتيجة كتابة صفحة (قد تكون من عملية عاملة) إلى عدادات الكاتب والتقرير"""
+    writer.record(result['written'])
+    for written in result['locale_written']:
+        writer.record(written)
+    writer.written += result['stubs_written']
+    writer.deleted += result['deleted']
+    writer.record(result['record_written'])
+    writer.deleted += result['record_deleted']
+    writer.bytes_written += result['bytes_written']
+    if report is not None:
+        for stage, (wall, cpu) in result['timings'].items():
+            report.add(stage, wall, cpu)
+        report.note_item(result['file']['id'], result['seconds'])
+
+def load_site_config(config_path=SITE_CONFIG_PATH):
+    """تحميل إعدادات الموقع من config/site.json"""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def product_page_url(filename, locale=PRIMARY_LOCALE):
+    """الرابط الكامل لصفحة منتج منشورة (بلغة locale)"""
+    return f"{_configured_base_url()}/{LOCALES[locale]['folder']}/{filename}"
+
+@lru_cache(maxsize=None)
+def _configured_base_url():
+    return site_base_url()
+
+def site_base_url(config=None):
+    """الرابط الأساسي للموقع المنشور (base_url ثم site_url من الإعدادات)"""
+    if config is None:
+        config = load_site_config()
+    return (config.get('base_url') or config.get('site_url') or DEFAULT_BASE_URL).rstrip('/')
+
+class SitemapWriter:
+    """كاتب sitemap متدفق يقسم الروابط إلى ملفات sitemap-N.xml(.gz) ويكتب ملف فهرس يشير إليها
+
+    يبدأ ملف جديد عند بلوغ حد البروتوكول (50,000 رابط أو 50 ميجابايت غير مضغوطة).
+    الكاتب بدون فهرس (index_name=None) يكتب أجزاءه فقط ({shard_prefix}-N.xml)، ويضمها كاتب الفهرس
+    بـ include حتى تظهر sitemap كل لغة في نفس الفهرس.
+    """
+
+    _HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    _FOOTER = '</urlset>\n'
+
+    def __init__(self, base_url, output_dir='.', index_name='sitemap.xml', gzip_output=False,
+                 max_urls=SITEMAP_MAX_URLS, max_bytes=SITEMAP_MAX_BYTES, writer=None, shard_prefix='sitemap'):
+        self.base_url = base_url.rstrip('/')
+        self.writer = writer or OutputWriter()
+        self.output_dir = output_dir
+        self.index_name = index_name
+        self.gzip_output = gzip_output
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.shard_prefix = shard_prefix
+        self.shards = []
+        self.shard_lastmods = []
+        self.included = []
+        self.url_count = 0
+        self._file = None
+        self._context = None
+        self._shard_urls = 0
+        self._shard_bytes = 0
+        self._footer_bytes = len(self._FOOTER.encode('utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._file is not None:
+            self._file.close()
+            self._context.__exit__(exc_type, exc, tb)
+
+    def _open_shard(self):
+        name = f"{self.shard_prefix}-{len(self.shards) + 1}.xml" + ('.gz' if self.gzip_output else '')
+        path = os.path.join(self.output_dir, name)
+        if self.gzip_output:
+            self._context = self.writer.open(path, 'wb')
+            # بدون اسم ملف أو وقت في ترويسة gzip حتى يبقى الناتج متطابقًا بين التشغيلات
+            compressed = gzip.GzipFile(filename='', mode='wb', fileobj=self._context.__enter__(), mtime=0)
+            self._file = io.TextIOWrapper(compressed, encoding='utf-8')
+        else:
+            self._context = self.writer.open(path)
+            self._file = self._context.__enter__()
+        self.shards.append(name)
+        self.shard_lastmods.append(None)
+        self._shard_urls = 0
+        self._shard_bytes = 0
+        self._write(self._HEADER)
+
+    def _close_shard(self):
+        self._write(self._FOOTER)
+        self._file.close()
+        self._context.__exit__(None, None, None)
+        self._file = None
+        self._context = None
+
+    def _write(self, text):
+        self._file.write(text)
+        self._shard_bytes += len(text.encode('utf-8'))
+
+    def add(self, loc, lastmod=None, changefreq=None, priority=None):
+        """إضافة رابط؛ loc مسار نسبي لجذر الموقع أو رابط كامل"""
+        if not loc.startswith(('http://', 'https://')):
+            loc = f"{self.base_url}/{loc.lstrip('/')}"
+        entry = f"    <url>\n        <loc>{xml_escape(loc)}</loc>\n"
+        if lastmod:
+            entry += f"        <lastmod>{lastmod}</lastmod>\n"
+        if changefreq:
+            entry += f"        <changefreq>{changefreq}</changefreq>\n"
+        if priority is not None:
+            entry += f"        <priority>{priority}</priority>\n"
+        entry += "    </url>\n"
         
-        print(f"📂 تم تحميل {len(products)} منتج من ملف البيانات")
+        entry_bytes = len(entry.encode('utf-8'))
+        if self._file is not None and (
+                self._shard_urls >= self.max_urls
+                or self._shard_bytes + entry_bytes + self._footer_bytes > self.max_bytes):
+            self._close_shard()
+        if self._file is None:
+            self._open_shard()
+        self._write(entry)
+        self._shard_urls += 1
+        self.url_count += 1
+        if lastmod and (self.shard_lastmods[-1] is None or lastmod > self.shard_lastmods[-1]):
+            self.shard_lastmods[-1] = lastmod
+
+    def include(self, other):
+        """ضم أجزاء كاتب آخر (مغلق، بدون فهرس) إلى فهرس هذا الكاتب"""
+        self.included.extend(zip(other.shards, other.shard_lastmods))
+        self.url_count += other.url_count
+
+    def close(self):
+        """إغلاق الملف الحالي وكتابة ملف الفهرس وحذف الأجزاء القديمة الزائدة"""
+        # الفهرس يشير إلى جزء واحد على الأقل؛ كاتب بلا فهرس (يضمه فهرس آخر) لا يكتب جزءًا فارغًا
+        if self._file is None and not self.shards and self.index_name is not None:
+            self._open_shard()
+        if self._file is not None:
+            self._close_shard()
+        if self.index_name is None:
+            return self.shards
         
-        # توليد صفحات المنتجات
-        generated = generate_all_product_pages(products)
+        # lastmod لكل جزء = أحدث lastmod بداخله، حتى لا يتغير الفهرس بدون تغيير حقيقي
+        entries = list(zip(self.shards, self.shard_lastmods)) + self.included
+        with self.writer.open(os.path.join(self.output_dir, self.index_name)) as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for name, lastmod in entries:
+                f.write(f"    <sitemap>\n        <loc>{xml_escape(self.base_url + '/' + name)}</loc>\n")
+                if lastmod:
+                    f.write(f"        <lastmod>{lastmod}</lastmod>\n")
+                f.write("    </sitemap>\n")
+            f.write('</sitemapindex>\n')
         
-        print(f"✅ تم إنشاء {len(generated)} صفحة منتج بنجاح")
+        # الأجزاء الحالية (مع المضمومة) ونسخها المضغوطة مسبقًا (.gz/.br) تبقى، وما عداها من تشغيلات سابقة يُحذف
+        current = {name for name, _ in entries}
+        current.update(f"{name}{suffix}" for name, _ in entries for suffix in ('.gz', '.br'))
+        for name in os.listdir(self.output_dir or '.'):
+            if _SITEMAP_SHARD_PATTERN.fullmatch(name) and name not in current:
+                self.writer.delete(os.path.join(self.output_dir, name))
+        return self.shards
+
+def create_sitemap(generated_files, base_url=None, output_dir='.', gzip_output=False, writer=None,
+                   category_pages=(), locales=DEFAULT_LOCALES):
+    """إنشاء sitemap.xml (فهرس) وملفات sitemap-N.xml لمحركات البحث
+
+    تقبل أي مولد لسجلات الصفحات وتكتب الروابط تدريجيًا دون تجميعها في الذاكرة،
+    ويؤخذ lastmod لكل منتج من وقت آخر تحديث له في بيان البناء.
+    category_pages: روابط صفحات الفئات المرقمة، تُقرأ بعد انتهاء صفحات المنتجات.
+    صفحات كل لغة إضافية في locales المترجمة (file_info['locales']) تُكتب في نفس المرور إلى
+    sitemap-{اللغة}-N.xml ويضمها الفهرس.
+    """
+    
+    if base_url is None:
+        base_url = site_base_url()
+    
+    count = 0
+    with SitemapWriter(base_url, output_dir=output_dir, gzip_output=gzip_output, writer=writer) as sitemap:
+        # sitemap لكل لغة إضافية تُملأ في نفس المرور على سجلات الصفحات
+        locale_sitemaps = [
+            (locale, LOCALES[locale]['folder'], SitemapWriter(base_url, output_dir=output_dir, index_name=None,
+                                                      gzip_output=gzip_output, writer=writer,
+                                                      shard_prefix=f"sitemap-{locale}"))
+            for locale in normalize_locales(locales)[1:]
+        ]
         
-        # إحصائيات
-        categories = {}
-        for product in products:
-            cat = product.get('category', 'غير محدد')
-            categories[cat] = categories.get(cat, 0) + 1
+        # الصفحة الرئيسية والنسخة الإنجليزية
+        sitemap.add('/', changefreq='daily', priority='1.0')
+        sitemap.add('en/', changefreq='weekly', priority='0.8')
         
-        print("\n📊 إحصائيات الفئات:")
-        for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
-            print(f"   {cat}: {count} منتج")
+        # إضافة صفحات المنتجات
+        for file_info in generated_files:
+            sitemap.add(f"{PRODUCT_PAGES_FOLDER}/{file_info['filename']}",
+                        lastmod=file_info.get('lastmod'), changefreq='monthly', priority='0.7')
+            # نسخ اللغات غير المترجمة تشير canonical إلى الصفحة الأساسية، فلا تُدرج
+            for locale, folder, locale_sitemap in locale_sitemaps:
+                if locale in file_info.get('locales', ()):
+                    locale_sitemap.add(f"{folder}/{file_info['filename']}",
+                                       lastmod=file_info.get('lastmod'), changefreq='monthly', priority='0.7')
+            count += 1
         
-        # حفظ قائمة الملفات المولدة
-        with open('data/generated-pages-list.json', 'w', encoding='utf-8') as f:
-            json.dump(generated, f, ensure_ascii=False, indent=2)
+        # صفحات الفئات المرقمة (الأولى أهم من بقية الصفحات)
+        for loc in category_pages:
+            sitemap.add(loc, changefreq='daily', priority='0.8' if loc.endswith('/') else '0.5')
         
-        # إنشاء sitemap
-        create_sitemap(generated)
+        # الصفحات القانونية
+        sitemap.add('legal/terms.html', changefreq='yearly', priority='0.3')
+        sitemap.add('legal/privacy.html', changefreq='yearly', priority='0.3')
         
-        print(f"\n🎉 تم الانتهاء بنجاح! جميع صفحات المنتجات جاهزة في مجلد data/pruducts-pages/")
-        print("📄 تم إنشاء sitemap.xml لمحركات البحث")
+        for _, _, locale_sitemap in locale_sitemaps:
+            locale_sitemap.close()
+            if locale_sitemap.url_count:
+                sitemap.include(locale_sitemap)
+    
+    print(f"✅ تم إنشاء sitemap.xml مع {sitemap.url_count} رابط في {len(sitemap.shards) + len(sitemap.included)} ملف")
+    return count
+
+def category_slug(category):
+    """رابط صفحات الفئة: اسم صفحة الهبوط المعروفة أو اسم الفئة العربي منظفًا"""
+    if category in CATEGORY_SLUGS:
+        return CATEGORY_SLUGS[category]
+    slug = re.sub(r'[^\u0600-\u06FF\u0750-\u077F\w\s-]', '', category.strip())
+    return re.sub(r'[\s-]+', '-', slug).strip('-') or 'غير-محدد'
+
+def category_page_url(slug, number, output_folder=CATEGORY_PAGES_FOLDER):
+    """رابط صفحة الفئة رقم number نسبةً إلى جذر الموقع (الأولى هي المجلد نفسه)"""
+    return f"{output_folder}/{slug}/" if number == 1 else f"{output_folder}/{slug}/page-{number}.html"
+
+def render_category_card(product, page_path=None, root=CATEGORY_PAGE_ASSET_PREFIX):
+    """بطاقة منتج HTML لصفحة الفئة بنفس أصناف بطاقات js/category-handler.js مع روابط حقيقية"""
+    product_id = str(product.get('id', ''))
+    title = product.get('title') or 'منتج غير محدد'
+    price = product.get('sale_price') or product.get('regular_price') or 0
+    regular = product.get('regular_price') or 0
+    currency = product.get('currency', 'AED')
+    discount = product.get('discount_percentage') or 0
+    href = root + (page_path or f"product.html?id={quote(product_id)}")
+    whatsapp = quote(f"مرحبا، أريد الاستفسار عن: {title} (السعر: {price} درهم)")
+    return CATEGORY_CARD_TEMPLATE.format(
+        id=html_escape(product_id),
+        href=html_escape(href),
+        image=html_escape(product.get('image_url') or ''),
+        title=html_escape(title),
+        display_title=html_escape(title[:60] + '...' if len(title) > 60 else title),
+        category=html_escape(product.get('category') or 'عام'),
+        price=price,
+        currency=html_escape(currency),
+        discount=f'<div class="discount-badge">-{round(discount)}%</div>\n                        ' if discount > 0 else '',
+        original_price=f'\n                                <span class="original-price">{regular} {html_escape(currency)}</span>'
+                       if product.get('sale_price') and regular > price else '',
+        whatsapp=f"https://wa.me/201110760081?text={whatsapp}",
+    )
+
+@lru_cache(maxsize=None)
+def _compiled_category_template():
+    return compile_template(CATEGORY_PAGE_TEMPLATE, root=CATEGORY_PAGE_ASSET_PREFIX,
+                            css_href=CATEGORY_PAGE_ASSET_PREFIX + 'css/improved-theme.css')
+
+class CategoryPagesWriter:
+    """صفحات قوائم الفئات المرقمة في مرور واحد على الكتالوج مع عدّ منتجات كل فئة
+
+    لا يبقى في الذاكرة إلا صفحة واحدة لكل فئة: الصفحة الممتلئة تُكتب عند وصول أول بطاقة بعدها
+    (فيُعرف حينها أن لها صفحة تالية)، والصفحة الأخيرة لكل فئة عند close().
+    """
+
+    def __init__(self, output_folder=CATEGORY_PAGES_FOLDER, page_size=CATEGORY_PAGE_SIZE, base_url=None,
+                 writer=None):
+        self.output_folder = output_folder
+        self.page_size = page_size
+        self.base_url = (base_url or _configured_base_url()).rstrip('/')
+        self.writer = writer or OutputWriter()
+        self.counts = {}
+        self.pages = []
+        self._cards = {}
+        self._numbers = {}
+        self._files = {}
+        self._closed = False
+
+    def add(self, product, page_path=None):
+        """إضافة منتج إلى صفحة فئته؛ page_path مسار صفحته الثابتة نسبةً إلى جذر الموقع"""
+        category = product.get('category', 'غير محدد')
+        self.counts[category] = self.counts.get(category, 0) + 1
+        cards = self._cards.setdefault(category, [])
+        if len(cards) >= self.page_size:
+            self._write_page(category, cards, has_next=True)
+            cards.clear()
+        cards.append(render_category_card(product, page_path))
+
+    def _write_page(self, category, cards, has_next):
+        number = self._numbers.get(category, 0) + 1
+        self._numbers[category] = number
+        self.write_page(category, number, cards, has_next)
+
+    def write_page(self, category, number, cards, has_next):
+        """كتابة صفحة واحدة برقمها (لإعادة كتابة صفحات بعينها دون تمرير الكتالوج كاملًا)"""
+        slug = category_slug(category or 'غير محدد')
+        name = html_escape(category or 'غير محدد')
+        first = (number - 1) * self.page_size + 1
+        
+        links = []
+        pagination = ['                <nav class="pagination" aria-label="صفحات الفئة">']
+        if number > 1:
+            previous = './' if number == 2 else f"page-{number - 1}.html"
+            links.append(f'    <link rel="prev" href="{self.base_url}/{category_page_url(slug, number - 1, self.output_folder)}">\n')
+            pagination.append(f'                    <a href="{previous}" rel="prev" class="btn">→ السابق</a>')
+        pagination.append(f'                    <span class="current-page">صفحة {number}</span>')
+        if has_next:
+            links.append(f'    <link rel="next" href="{self.base_url}/{category_page_url(slug, number + 1, self.output_folder)}">\n')
+            pagination.append(f'                    <a href="page-{number + 1}.html" rel="next" class="btn">التالي ←</a>')
+        pagination.append('                </nav>')
+        
+        page_title = name if number == 1 else f"{name} - صفحة {number}"
+        url = category_page_url(slug, number, self.output_folder)
+        values = {
+            'page_title': page_title,
+            'heading': name,
+            'description': f"تسوق {name} في الإمارات بأفضل الأسعار مع الشحن المجاني والدفع عند الاستلام"
+                           + (f" - صفحة {number}" if number > 1 else ''),
+            'canonical': f"{self.base_url}/{url}",
+            'pagination_links': ''.join(links),
+            'breadcrumb': f"<span>{name}</span>" if number == 1 else
+                          f'<a href="./">{name}</a><span>←</span><span>صفحة {number}</span>',
+            'range_text': f"المنتجات {first} - {first + len(cards) - 1}",
+            'cards': '\n'.join(cards),
+            'pagination': '\n'.join(pagination),
+        }
+        
+        filename = 'index.html' if number == 1 else f"page-{number}.html"
+        folder = os.path.join(self.output_folder, slug)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, filename)
+        if self.writer.write(path, render_template(_compiled_category_template(), values)):
+            discard_variants(path)
+        self._files.setdefault(slug, set()).add(filename)
+        self.pages.append(url)
+
+    def close(self):
+        """كتابة الصفحة الأخيرة لكل فئة وحذف صفحات الفئات الزائدة من تشغيلات سابقة؛ تعيد عدد الصفحات"""
+        if self._closed:
+            return len(self.pages)
+        self._closed = True
+        for category, cards in self._cards.items():
+            if cards:
+                self._write_page(category, cards, has_next=False)
+        self._cards = {}
+        
+        if os.path.isdir(self.output_folder):
+            for slug in os.listdir(self.output_folder):
+                folder = os.path.join(self.output_folder, slug)
+                if not os.path.isdir(folder):
+                    continue
+                live = self._files.get(slug, set())
+                for name in os.listdir(folder):
+                    match = _CATEGORY_PAGE_PATTERN.fullmatch(name)
+                    if match and f"{match.group(1)}.html" not in live:
+                        self.writer.delete(os.path.join(folder, name))
+                if not os.listdir(folder):
+                    os.rmdir(folder)
+        return len(self.pages)
+
+    def sitemap_urls(self):
+        """روابط صفحات الفئات لـ create_sitemap؛ مولد يُغلق الكاتب أولًا فيصلح بعد مرور المنتجات المتدفق"""
+        self.close()
+        yield from self.pages
+
+def write_category_pages(products, generated_files, writer=None, output_folder=CATEGORY_PAGES_FOLDER,
+                         page_size=CATEGORY_PAGE_SIZE, base_url=None):
+    """صفحات الفئات لكتالوج في الذاكرة، بروابط المنتجات من سجلات الصفحات المولدة؛ تعيد الكاتب بعد إغلاقه"""
+    paths = {str(file_info['id']): f"{PRODUCT_PAGES_FOLDER}/{file_info['filename']}" for file_info in generated_files}
+    listings = CategoryPagesWriter(output_folder, page_size, base_url, writer)
+    for product in products:
+        listings.add(product, paths.get(str(product.get('id', ''))))
+    listings.close()
+    return listings
+
+def category_pages_layout(products, page_size=CATEGORY_PAGE_SIZE):
+    """تقسيم صفحات الفئات كما يكتبها CategoryPagesWriter: {الفئة: [[مواضع منتجات كل صفحة]]}"""
+    layout = {}
+    for position, product in enumerate(products):
+        pages = layout.setdefault(product.get('category', 'غير محدد'), [])
+        if not pages or len(pages[-1]) >= page_size:
+            pages.append([])
+        pages[-1].append(position)
+    return layout
+
+def update_category_pages(products, positions, layout, paths, writer=None, output_folder=CATEGORY_PAGES_FOLDER,
+                          page_size=CATEGORY_PAGE_SIZE, base_url=None):
+    """إعادة كتابة صفحات الفئات التي تعرض المنتجات في positions فقط؛ تعيد عدد الصفحات المعاد توليدها
+
+    layout من category_pages_layout ويبقى صالحًا ما دامت الفئات وترتيب المنتجات ثابتة (تعديل الأسعار
+    والمخزون)؛ paths: {المعرف: مسار صفحة المنتج}. لا تُحذف صفحات هنا، فالتقسيم لم يتغير.
+    """
+    listings = CategoryPagesWriter(output_folder, page_size, base_url, writer)
+    positions = set(positions)
+    for category, pages in layout.items():
+        for number, members in enumerate(pages, 1):
+            if positions.isdisjoint(members):
+                continue
+            cards = [render_category_card(products[position], paths.get(str(products[position].get('id', ''))))
+                     for position in members]
+            listings.write_page(category, number, cards, has_next=number < len(pages))
+    return len(listings.pages)
+
+def iter_products(path=PRODUCTS_PATH, chunk_size=1 << 16):
+    """قراءة المنتجات تدريجيًا من مصفوفة JSON أو من ملف NDJSON دون تحميل الملف كاملًا"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        buffer = f.read(chunk_size)
+        start = len(buffer) - len(buffer.lstrip())
+        
+        # NDJSON: منتج في كل سطر
+        if buffer[start:start + 1] != '[':
+            f.seek(0)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
         
+        # مصفوفة JSON: فك العناصر واحدًا تلو الآخر من مخزن مؤقت يُعاد ملؤه عند الحاجة
+        pos = start + 1
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if buffer[pos:pos + 1] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                end = None
+            if end is None or (end == len(buffer) and not eof):
+                more = f.read(chunk_size)
+                if not more:
+                    if eof:
+                        raise ValueError(f"ملف المنتجات غير مكتمل: {path}")
+                    eof = True
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            yield item
+            pos = end
+
+def _write_pages_list(generated_files, list_path=PAGES_LIST_NDJSON_PATH, writer=None):
+    """مرحلة عابرة تكتب قائمة الصفحات المولدة بصيغة NDJSON أثناء مرورها"""
+    with (writer or OutputWriter()).open(list_path) as f:
+        for file_info in generated_files:
+            f.write(json.dumps(file_info, ensure_ascii=False))
+            f.write('\n')
+            yield file_info
+
+class DuplicateStage:
+    """مرحلة المكررات قبل توليد الصفحات: mode = 'report' (تقرير فقط) أو 'merge' (حذف المكررات من البناء)
+
+    في وضع الدمج تصبح صفحات المكررات المنشورة (رابطها الحالي والقديمة من سجل الروابط) صفحات تحويل
+    إلى صفحة المنتج المُبقى، وتُحفظ أسماؤها في التقرير حتى تبقى في البناءات التالية وتُحذف عندما
+    يعود المنتج مستقلًا.
+    """
+
+    def __init__(self, products, mode='report', report_path=DUPLICATES_REPORT_PATH,
+                 registry_path=SLUG_REGISTRY_PATH, threshold=DUPLICATE_THRESHOLD):
+        self.mode = mode
+        self.report_path = report_path
+        self.threshold = threshold
+        self.clusters, self.total = find_duplicate_clusters(products, threshold)
+        self.duplicates = duplicate_map(self.clusters) if mode == 'merge' else {}
+        print_duplicates_summary(self.clusters, self.total)
+        # أسماء صفحات المكررات تُقرأ قبل التوليد لأن سجل الروابط يحذف المنتجات الغائبة عنه
+        self.names = self._registered_names(registry_path) if self.duplicates else {}
+
+    def _registered_names(self, registry_path):
+        names = {}
+        try:
+            with open(registry_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if str(entry['id']) in self.duplicates:
+                        names.update((name, str(entry['id'])) for name in [entry['slug']] + entry.get('aliases', []))
+        except FileNotFoundError:
+            pass
+        return names
+
+    def filter(self, products):
+        """المنتجات بدون المكررات (في وضع الدمج)، مع الحفاظ على ترتيب الكتالوج"""
+        for product in products:
+            if str(product.get('id', '')) not in self.duplicates:
+                yield product
+
+    def finish(self, writer=None, output_folder=PRODUCT_PAGES_FOLDER, urls_path=PRODUCT_URLS_PATH,
+               locales=DEFAULT_LOCALES):
+        """بعد التوليد: كتابة صفحات التحويل (في وضع الدمج، بكل اللغات) وحذف القديمة منها ثم حفظ التقرير"""
+        writer = writer or OutputWriter()
+        if self.mode != 'merge':
+            save_duplicates_report(self.clusters, self.total, self.report_path, writer, threshold=self.threshold)
+            return
+        urls = load_product_urls(urls_path)
+        live = {path.rsplit('/', 1)[-1] for path in urls.values()}
+        previous = load_duplicates_report(self.report_path).get('redirects', {})
+        names = {name: product_id for name, product_id in previous.items() if product_id in self.duplicates}
+        names.update(self.names)
+        folders = locale_folders(output_folder, normalize_locales(locales))
+        redirects = {}
+        for name, product_id in sorted(names.items()):
+            target = urls.get(self.duplicates[product_id])
+            if not target or f"{name}.html" in live:
+                continue
+            filename = target.rsplit('/', 1)[-1]
+            for locale, folder in folders:
+                path = os.path.join(folder, f"{name}.html")
+                if writer.write(path, redirect_stub_html(filename, product_page_url(filename, locale))):
+                    discard_variants(path)
+            redirects[name] = product_id
+        for name in previous:
+            if name not in redirects and f"{name}.html" not in live:
+                for _, folder in folders:
+                    _delete_page(writer, folder, f"{name}.html")
+        save_duplicates_report(self.clusters, self.total, self.report_path, writer, redirects, self.threshold)
+        print(f"🔀 دُمج {len(self.duplicates)} منتج مكرر، و {len(redirects)} صفحة تحويل إلى المنتجات المُبقاة")
+
+def replace_dead_images(products, dead_urls, base_url=None):
+    """المنتجات مع استبدال الصور المؤكد فقدها (من ذاكرة probe_images.py) بالصورة البديلة المحلية"""
+    placeholder = f"{(base_url or _configured_base_url()).rstrip('/')}/{PLACEHOLDER_IMAGE_PATH}"
+    for product in products:
+        if product.get('image_url') in dead_urls:
+            product = dict(product, image_url=placeholder)
+        yield product
+
+def load_dead_images(status_path=IMAGE_STATUS_PATH):
+    """روابط الصور المفقودة من ذاكرة الفحص (بدون أي طلبات شبكة أثناء البناء)"""
+    dead = dead_image_urls(load_image_status(status_path))
+    print(f"🖼️ {len(dead)} صورة مفقودة ستُستبدل بالصورة البديلة (من {status_path})")
+    return dead
+
+def _print_category_stats(categories):
+    print("\n📊 إحصائيات الفئات:")
+    for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
+        print(f"   {cat}: {count} منتج")
+
+def run_streaming_build(products_path=PRODUCTS_PATH, force=False, jobs=1, sitemap_gzip=False, writer=None,
+                        minify=False, report=None, dead_images=None, locales=DEFAULT_LOCALES):
+    """بناء متدفق بذاكرة ثابتة في مرور واحد: قراءة ← توليد وكتابة (مع صفحات الفئات) ← قائمة NDJSON ← sitemap
+
+    المراحل متداخلة هنا، فزمن generate يشمل load و slug و render و write وصفحات الفئات، ومرحلة
+    sitemap هي ما يتبقى من زمن كتابة sitemap بعد طرح زمن توليد الصفحات التي يستهلكها.
+    المنتجات ذات الصلة واكتشاف المكررات يحتاجان الكتالوج كاملًا قبل أول صفحة (مرور إضافي وحالة
+    لكل منتج)، فلا يعملان هنا: الصفحات تُولد بدون كتلة المنتجات ذات الصلة. dead_images: روابط صور
+    تُستبدل بالصورة البديلة. كل لغات locales تُولد وتُضاف إلى sitemap في نفس المرور.
+    """
+    writer = writer or OutputWriter()
+    report = report or BuildReport('generate_static_pages', slowest=0)
+    listings = CategoryPagesWriter(writer=writer)
+    products = report.timed('load', iter_products(products_path))
+    if dead_images:
+        products = replace_dead_images(products, dead_images)
+    pages = stream_product_pages(products, force=force, jobs=jobs, writer=writer, minify=minify, report=report,
+                                 category_pages=listings, locales=locales)
+    pages = report.timed('generate', _write_pages_list(pages, writer=writer))
+    clock = stage_clock()
+    count = create_sitemap(pages, gzip_output=sitemap_gzip, writer=writer, category_pages=listings.sitemap_urls(),
+                           locales=locales)
+    wall, cpu = elapsed(clock)
+    generate = report.stages.get('generate', {'wall': 0.0, 'cpu': 0.0})
+    report.add('sitemap', wall - generate['wall'], cpu - generate['cpu'])
+    
+    print(f"✅ تم إنشاء {count} صفحة منتج بنجاح و {len(listings.pages)} صفحة فئات")
+    _print_category_stats(listings.counts)
+    return count
+
+def precompress_outputs(jobs=1, writer=None, minify=False, locales=DEFAULT_LOCALES):
+    """مرحلة ما بعد البناء: نسخ .gz/.br للصفحات وملفات sitemap والأصول المشتركة عبر مجموعة عمليات"""
+    paths = ([folder for _, folder in locale_folders(PRODUCT_PAGES_FOLDER, normalize_locales(locales))]
+             + sorted(glob(os.path.join(CATEGORY_PAGES_FOLDER, '*', '')))
+             + sorted(glob('sitemap*.xml')) + list(shared_asset_paths(minify=minify).values()))
+    written = precompress_paths(paths, jobs=jobs, writer=writer)
+    print(f"🗜️ تم إنشاء/تحديث {written} ملف مضغوط")
+
+def write_offline_cache(writer=None):
+    """مرحلة ما بعد البناء: sw.js وقائمة التخزين المسبق من الملفات المكتوبة (الواجهة والأصول وأجزاء الكتالوج)"""
+    manifest = write_service_worker(writer)
+    print(f"📴 عامل الخدمة: {len(manifest['entries'])} ملف في التخزين المسبق (المراجعة {manifest['revision']})")
+
+def validate_outputs(jobs=1, writer=None, report_path=VALIDATION_REPORT_PATH):
+    """مرحلة ما بعد البناء: التحقق من الروابط و JSON-LD والعناوين وتغطية sitemap ومعرفات الفيد"""
+    result = validate_site(jobs=jobs)
+    (writer or OutputWriter()).write(report_path, json.dumps(result.to_dict(), ensure_ascii=False, indent=2) + '\n')
+    print(result.summary())
+    return result
+
+def parse_args(argv=None):
+    """قراءة خيارات سطر الأوامر"""
+    parser = argparse.ArgumentParser(description='مولد صفحات المنتجات الثابتة - سوق الإمارات')
+    parser.add_argument('--force', action='store_true',
+                        help='إعادة توليد كل الصفحات وتجاهل بيان البناء')
+    parser.add_argument('--stream', action='store_true',
+                        help='بناء متدفق بذاكرة ثابتة في مرور واحد (يقبل مصفوفة JSON أو NDJSON)، '
+                             'بدون المنتجات ذات الصلة واكتشاف المكررات')
+    parser.add_argument('--products', default=PRODUCTS_PATH,
+                        help='مسار ملف المنتجات')
+    parser.add_argument('--sitemap-gzip', action='store_true',
+                        help='كتابة أجزاء sitemap مضغوطة بصيغة .xml.gz')
+    parser.add_argument('--locales', default=','.join(DEFAULT_LOCALES),
+                        help=f"لغات صفحات المنتجات مفصولة بفواصل (المتاح: {', '.join(LOCALES)})؛ "
+                             f"العربية أساسية دائمًا")
+    parser.add_argument('--minify', action='store_true',
+                        help='تصغير صفحات المنتجات وملفات CSS/JS المشتركة')
+    parser.add_argument('--precompress', action='store_true',
+                        help='إنشاء نسخ .gz (و .br إن توفرت brotli) للصفحات وملفات sitemap')
+    parser.add_argument('--validate', action='store_true',
+                        help=f"التحقق من المخرجات بعد البناء (تقرير في {VALIDATION_REPORT_PATH})")
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='عدد العمليات المتوازية لتوليد الصفحات (0 = عدد الأنوية)')
+    # معطلة افتراضيًا: بصمات MinHash لكل الكتالوج هي معظم زمن البناء التزايدي (شغّلها عند تحديث الكتالوج)
+    parser.add_argument('--dedup', choices=('off', 'report', 'merge'), default='off',
+                        help=f"المنتجات المكررة تقريبًا: تقرير في {DUPLICATES_REPORT_PATH} أو دمجها في المنتج الأسبق")
+    parser.add_argument('--replace-dead-images', action='store_true',
+                        help=f"استبدال الصور المفقودة حسب ذاكرة probe_images.py ({IMAGE_STATUS_PATH}) بصورة بديلة")
+    # التقرير يحمل وقت التشغيل، فلا يُكتب إلا عند طلبه حتى لا يغير كل بناء ملفات المستودع
+    parser.add_argument('--report', nargs='?', const=BUILD_REPORT_PATH, metavar='PATH',
+                        help=f"كتابة تقرير البناء JSON (أزمنة المراحل والملفات والذاكرة وأبطأ المنتجات) "
+                             f"في PATH أو {BUILD_REPORT_PATH}")
+    parser.add_argument('--slowest', type=int, default=DEFAULT_SLOWEST_COUNT, metavar='N',
+                        help='عدد أبطأ المنتجات في التقرير')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='قياس أقصى ذاكرة Python عبر tracemalloc (يبطئ البناء)')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='حفظ ملف cProfile للبناء كاملًا في PATH')
+    args = parser.parse_args(argv)
+    if args.stream and args.dedup != 'off':
+        parser.error('--dedup يحتاج الكتالوج كاملًا ولا يعمل مع --stream')
+    try:
+        args.locales = normalize_locales([locale.strip() for locale in args.locales.split(',') if locale.strip()])
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+def main(argv=None):
+    """تشغيل المولد الرئيسي (يعيد 1 عند فشل البناء حتى يفشل خط النشر)"""
+    args = parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    writer = OutputWriter()
+    report = BuildReport('generate_static_pages', slowest=args.slowest, trace_memory=args.trace_memory)
+    status = 'failed'
+    try:
+        with profiled(args.profile):
+            _run_build(args, jobs, writer, report)
+        status = 'ok'
     except Exception as e:
         print(f"❌ حدث خطأ: {e}")
+    finally:
+        if args.report:
+            report.save(args.report, writer, status=status, jobs=jobs, stream=args.stream, force=args.force,
+                        locales=list(args.locales))
+    print(report.summary())
+    return 0 if status == 'ok' else 1
+
+def _run_build(args, jobs, writer, report):
+    """مراحل البناء (العادي أو المتدفق) مع تسجيل أزمنتها في التقرير"""
+    if args.stream:
+        run_streaming_build(args.products, force=args.force, jobs=jobs, sitemap_gzip=args.sitemap_gzip,
+                            writer=writer, minify=args.minify, report=report,
+                            dead_images=load_dead_images() if args.replace_dead_images else None,
+                            locales=args.locales)
+        with report.stage('service-worker'):
+            write_offline_cache(writer)
+        if args.precompress:
+            with report.stage('precompress'):
+                precompress_outputs(jobs, writer, args.minify, args.locales)
+        if args.validate:
+            with report.stage('validate'):
+                validate_outputs(jobs, writer)
+        print(writer.summary())
+        print(f"\n🎉 تم الانتهاء بنجاح! جميع صفحات المنتجات جاهزة في مجلد data/pruducts-pages/")
+        return
+    
+    # تحميل بيانات المنتجات
+    with report.stage('load'):
+        products = list(iter_products(args.products))
+    
+    print(f"📂 تم تحميل {len(products)} منتج من ملف البيانات")
+    
+    # اكتشاف المنتجات المكررة تقريبًا (وحذفها من البناء في وضع الدمج)
+    duplicates = None
+    if args.dedup != 'off':
+        with report.stage('dedup'):
+            duplicates = DuplicateStage(products, args.dedup)
+            products = list(duplicates.filter(products))
+    
+    if args.replace_dead_images:
+        products = list(replace_dead_images(products, load_dead_images()))
+    
+    # توليد صفحات المنتجات
+    with report.stage('generate'):
+        generated = generate_all_product_pages(products, force=args.force, jobs=jobs, writer=writer,
+                                               minify=args.minify, report=report, locales=args.locales)
+    
+    print(f"✅ تم إنشاء {len(generated)} صفحة منتج بنجاح")
+    
+    # صفحات الفئات المرقمة وإحصائيات الفئات في مرور واحد
+    with report.stage('categories'):
+        listings = write_category_pages(products, generated, writer=writer)
+    print(f"🗂️ تم إنشاء {len(listings.pages)} صفحة فئات في مجلد {CATEGORY_PAGES_FOLDER}/")
+    
+    _print_category_stats(listings.counts)
+    
+    # حفظ قائمة الملفات المولدة
+    writer.write('data/generated-pages-list.json', json.dumps(generated, ensure_ascii=False, indent=2))
+    
+    # إنشاء sitemap
+    with report.stage('sitemap'):
+        create_sitemap(generated, gzip_output=args.sitemap_gzip, writer=writer, category_pages=listings.pages,
+                       locales=args.locales)
+    if duplicates:
+        with report.stage('dedup'):
+            duplicates.finish(writer, locales=args.locales)
+    with report.stage('service-worker'):
+        write_offline_cache(writer)
+    if args.precompress:
+        with report.stage('precompress'):
+            precompress_outputs(jobs, writer, args.minify, args.locales)
+    if args.validate:
+        with report.stage('validate'):
+            validate_outputs(jobs, writer)
+    print(writer.summary())
+    
+    print(f"\n🎉 تم الانتهاء بنجاح! جميع صفحات المنتجات جاهزة في مجلد data/pruducts-pages/")
+    print("📄 تم إنشاء sitemap.xml لمحركات البحث")
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
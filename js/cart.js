@@ -3,6 +3,81 @@
  * Enhanced Cart System - Bilingual Support (Arabic/English)
  */
 
+// Per-product JSON records written by generate_static_pages.py:
+// data/products/index.json maps id -> content hash, data/products/{id}.{hash}.json holds one product
+const productRecords = {
+    indexPromise: null,
+
+    basePath() {
+        return window.location.pathname.includes('/en/') ? '../data/products/' : './data/products/';
+    },
+
+    // The index changes with every catalog update, so always revalidate it
+    loadIndex() {
+        if (!this.indexPromise) {
+            this.indexPromise = fetch(this.basePath() + 'index.json', { cache: 'no-cache' })
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.json();
+                })
+                .catch(error => {
+                    this.indexPromise = null;
+                    throw error;
+                });
+        }
+        return this.indexPromise;
+    },
+
+    // Record files are named by content hash, so the browser may cache them forever
+    async get(productId) {
+        const index = await this.loadIndex();
+        const hash = index[String(productId)];
+        if (!hash) return null;
+        const safeId = String(productId).replace(/[^0-9A-Za-z_-]/g, '_');
+        const response = await fetch(`${this.basePath()}${safeId}.${hash}.json`);
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json();
+    }
+};
+
+window.fetchProductRecord = productId => productRecords.get(productId);
+
+// Static page of a product: catalog cards carry it as `url` and product records as `page`.
+// The shared id -> static page table (data/product-urls.json) is only fetched the first time a product
+// without either is opened; until it arrives links fall back to product.html?id=.
+const productUrls = {
+    table: null,
+    tablePromise: null,
+
+    rootPath() {
+        return window.location.pathname.includes('/en/') ? '../' : './';
+    },
+
+    load() {
+        if (!this.tablePromise) {
+            this.tablePromise = fetch(this.rootPath() + 'data/product-urls.json', { cache: 'no-cache' })
+                .then(response => response.ok ? response.json() : null)
+                .then(table => { this.table = table; })
+                .catch(error => {
+                    this.tablePromise = null;
+                    console.warn('Product URL table unavailable:', error);
+                });
+        }
+        return this.tablePromise;
+    },
+
+    get(productId, product) {
+        let path = product && (product.url || product.page);
+        if (!path) {
+            path = this.table && this.table[String(productId)];
+            if (!this.table) this.load();
+        }
+        return this.rootPath() + (path ? encodeURI(path) : `product.html?id=${encodeURIComponent(productId)}`);
+    }
+};
+
+window.getProductUrl = (productId, product) => productUrls.get(productId, product);
+
 class EmiratesCart {
     constructor() {
         this.items = [];
@@ -107,10 +182,34 @@ class EmiratesCart {
         this.createCartUI();
         this.setupEventListeners();
         this.updateCartDisplay();
+        this.refreshPrices();
         
         console.log(`✅ Emirates Cart ready (${lang}) - ${this.items.length} items`);
     }
 
+    // Re-price stored items from their product records (a few hundred bytes per item)
+    async refreshPrices() {
+        if (this.items.length === 0) return;
+        const items = [...this.items];
+        const records = await Promise.all(items.map(item =>
+            productRecords.get(item.id).catch(() => null)
+        ));
+        let changed = false;
+        records.forEach((record, i) => {
+            const price = record && (record.sale_price || record.regular_price);
+            if (price && items[i].price !== price) {
+                items[i].price = price;
+                changed = true;
+            }
+        });
+        if (changed) {
+            console.log('💱 Cart prices updated from product records');
+            this.saveToStorage();
+            this.updateCartDisplay();
+            this.renderCartItems();
+        }
+    }
+
     createCartUI() {
         // Remove existing elements to avoid conflicts
         document.querySelectorAll('#cart-float, #cart-overlay, #cart-sidebar').forEach(el => el.remove());
@@ -764,6 +863,14 @@ class EmiratesCart {
             }
         }
 
+        // Try the product's own record before the full catalog
+        try {
+            const record = await productRecords.get(productId);
+            if (record) return record;
+        } catch (error) {
+            console.warn('Product record unavailable, loading full catalog:', error);
+        }
+
         // Try direct fetch if not found in memory
         try {
             const dataPath = this.isEnglish ? '../data/uae-products.json' : './data/uae-products.json';
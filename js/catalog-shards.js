@@ -0,0 +1,63 @@
+// Catalog shard loader - per-category card pages written by build_catalog_shards.py
+// Pages load only the categories they render instead of the full data/uae-products.json
+(function(){
+  'use strict';
+
+  const ALL = 'all';
+
+  function basePath(){
+    return window.location.pathname.includes('/en/') ? '../data/catalog/' : './data/catalog/';
+  }
+
+  let manifestPromise = null;
+  const pageCache = new Map();
+
+  function fetchJson(url, options){
+    return fetch(url, options).then(response => {
+      if(!response.ok){ throw new Error(`HTTP ${response.status}: ${url}`); }
+      return response.json();
+    });
+  }
+
+  // The manifest changes with every catalog update, so always revalidate it
+  function loadManifest(){
+    if(!manifestPromise){
+      manifestPromise = fetchJson(basePath() + 'manifest.json', { cache: 'no-cache' })
+        .catch(error => { manifestPromise = null; throw error; });
+    }
+    return manifestPromise;
+  }
+
+  // Page files are named by content hash, so a fetched page never goes stale
+  function loadPage(file){
+    if(!pageCache.has(file)){
+      pageCache.set(file, fetchJson(basePath() + file)
+        .catch(error => { pageCache.delete(file); throw error; }));
+    }
+    return pageCache.get(file);
+  }
+
+  async function loadCategory(category, maxPages){
+    const manifest = await loadManifest();
+    const entry = manifest.categories[category || ALL];
+    if(!entry){ return []; }
+    const pages = maxPages ? entry.pages.slice(0, maxPages) : entry.pages;
+    const cards = await Promise.all(pages.map(page => loadPage(page.file)));
+    return cards.flat();
+  }
+
+  async function categoryCounts(){
+    const manifest = await loadManifest();
+    return Object.entries(manifest.categories)
+      .filter(([name]) => name !== ALL)
+      .map(([name, entry]) => ({ name, count: entry.count }));
+  }
+
+  window.CatalogShards = {
+    ALL,
+    loadManifest,
+    loadPage,
+    loadCategory,
+    categoryCounts
+  };
+})();
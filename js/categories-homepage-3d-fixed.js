@@ -178,9 +178,11 @@ class CategoriesHomepage3DFixed {
     openCategoryInNewTab(categoryName) {
         console.log(`🏪 فتح فئة "${categoryName}" في تبويب جديد`);
         
-        // إنشاء رابط مع معامل الفئة
+        // صفحة قائمة الفئة الثابتة (categories/<slug>/)، أو صفحة الفئة العامة إن لم يُحمّل ملف التوجيه
         const categorySlug = this.createCategorySlug(categoryName);
-        const categoryUrl = `./category.html?name=${encodeURIComponent(categoryName)}&slug=${categorySlug}`;
+        const categoryUrl = window.getCategoryPage
+            ? `./${window.getCategoryPage(categoryName)}`
+            : `./category.html?name=${encodeURIComponent(categoryName)}&slug=${categorySlug}`;
         
         // فتح في تبويب جديد
         window.open(categoryUrl, '_blank', 'noopener,noreferrer');
@@ -206,8 +208,10 @@ class CategoriesHomepage3DFixed {
             return;
         }
         
-        // فتح صفحة product.html مع معرف المنتج
-        const productUrl = `./product.html?id=${encodeURIComponent(productId)}`;
+        // فتح الصفحة الثابتة للمنتج (أو product.html مع معرف المنتج)
+        const productUrl = window.getProductUrl
+            ? window.getProductUrl(productId, product)
+            : `./product.html?id=${encodeURIComponent(productId)}`;
         window.open(productUrl, '_blank', 'noopener,noreferrer');
         
         this.showSuccess(`جاري فتح تفاصيل "${product.title}" في تبويب جديد...`);
@@ -326,8 +330,18 @@ class CategoriesHomepage3DFixed {
             
             let rawProducts = null;
             let loadedFrom = '';
-            
-            for (const source of dataSources) {
+
+            // Card shards carry only what the homepage renders (no descriptions)
+            if (window.CatalogShards) {
+                try {
+                    rawProducts = await window.CatalogShards.loadCategory(window.CatalogShards.ALL);
+                    loadedFrom = 'data/catalog';
+                } catch (err) {
+                    console.warn('❌ فشل تحميل صفحات الكتالوج المقسمة:', err.message);
+                }
+            }
+
+            for (const source of rawProducts ? [] : dataSources) {
                 try {
                     console.log(`🔄 محاولة التحميل من: ${source}`);
                     const response = await fetch(source);
@@ -752,7 +766,7 @@ class CategoriesHomepage3DFixed {
     }
 
     // SEARCH FUNCTIONALITY
-    performSearch() {
+    async performSearch() {
         const searchInput = document.getElementById('main-search');
         const query = searchInput ? searchInput.value.trim() : '';
         
@@ -768,13 +782,9 @@ class CategoriesHomepage3DFixed {
         
         console.log(`🔍 البحث عن: ${query}`);
         
-        // Filter products locally
-        const searchResults = this.products.filter(product => 
-            product.title.toLowerCase().includes(query.toLowerCase()) ||
-            product.category.toLowerCase().includes(query.toLowerCase()) ||
-            (product.description && product.description.toLowerCase().includes(query.toLowerCase())) ||
-            (product.seo_keywords && product.seo_keywords.toLowerCase().includes(query.toLowerCase()))
-        );
+        const searchResults = await this.searchProducts(query);
+        // A newer keystroke started another search while this one was loading index shards
+        if (searchInput && searchInput.value.trim() !== query) return;
         
         if (searchResults.length === 0) {
             this.showError(`لا توجد نتائج للبحث عن "${query}"`);
@@ -803,6 +813,24 @@ class CategoriesHomepage3DFixed {
         this.showSuccess(`تم العثور على ${searchResults.length} منتج للبحث عن "${query}"`);
     }
     
+    // Card shards carry no descriptions or keywords, so matching goes through the prebuilt search index
+    async searchProducts(query) {
+        if (window.SearchIndex) {
+            try {
+                return await window.SearchIndex.filter(this.products, query);
+            } catch (error) {
+                console.warn('⚠️ فهرس البحث غير متاح، سيتم البحث في العناوين والفئات:', error);
+            }
+        }
+        const term = query.toLowerCase();
+        return this.products.filter(product =>
+            product.title.toLowerCase().includes(term) ||
+            product.category.toLowerCase().includes(term) ||
+            (product.description && product.description.toLowerCase().includes(term)) ||
+            (product.seo_keywords && product.seo_keywords.toLowerCase().includes(term))
+        );
+    }
+    
     renderFilteredProducts(products, categoryName) {
         const container = document.getElementById('all-container');
         if (!container) return;
@@ -140,19 +140,35 @@
     window.categoryProducts = [];
     window.filteredProducts = [];
     
+    // Prefer the per-category card shards; fall back to the full catalog file
+    async function loadProductsForPage() {
+        if (window.CatalogShards) {
+            try {
+                const manifest = await window.CatalogShards.loadManifest();
+                const targetCategory = getCategoryFromPage();
+                const category = manifest.categories[targetCategory] ? targetCategory : window.CatalogShards.ALL;
+                console.log(`🗂️ Loading catalog shards for: "${category}"`);
+                return await window.CatalogShards.loadCategory(category);
+            } catch (error) {
+                console.warn('⚠️ Catalog shards unavailable, loading full catalog:', error.message);
+            }
+        }
+
+        const isInEnFolder = window.location.pathname.includes('/en/');
+        const dataPath = isInEnFolder ? '../data/uae-products.json' : './data/uae-products.json';
+
+        const response = await fetch(dataPath);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: Failed to fetch data`);
+        }
+        return response.json();
+    }
+
     async function loadCategoryData() {
         try {
             console.log('📦 Loading category data...');
             
-            const isInEnFolder = window.location.pathname.includes('/en/');
-            const dataPath = isInEnFolder ? '../data/uae-products.json' : './data/uae-products.json';
-            
-            const response = await fetch(dataPath);
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}: Failed to fetch data`);
-            }
-            
-            window.allProducts = await response.json();
+            window.allProducts = await loadProductsForPage();
             console.log(`✅ Loaded ${window.allProducts.length} total products`);
             
             // Get all unique categories from data for debugging
@@ -417,9 +433,12 @@
     
     window.openProductPage = function(productId) {
         const isInEnFolder = window.location.pathname.includes('/en/');
-        const productUrl = isInEnFolder 
-            ? `../product.html?id=${encodeURIComponent(productId)}`
-            : `./product.html?id=${encodeURIComponent(productId)}`;
+        const product = (window.categoryProducts || []).find(p => String(p.id) === String(productId));
+        const productUrl = window.getProductUrl
+            ? window.getProductUrl(productId, product)
+            : isInEnFolder
+                ? `../product.html?id=${encodeURIComponent(productId)}`
+                : `./product.html?id=${encodeURIComponent(productId)}`;
         window.open(productUrl, '_blank', 'noopener,noreferrer');
     };
     
@@ -1,19 +1,32 @@
 /**
- * Category routing script - map Arabic category names to SEO static pages
+ * Category routing script - map Arabic category names to the static category listings
+ * (categories/<slug>/, written by generate_static_pages.py)
  */
 (function(){
+  // Must match CATEGORY_SLUGS and category_slug() in generate_static_pages.py
   const map = {
-    'الأجهزة المنزلية والكهربائية': 'home-appliances-electrical.html',
-    'الإلكترونيات والتكنولوجيا': 'electronics-technology.html',
-    'العناية الشخصية والصحة والجمال': 'personal-care-health-beauty.html',
-    'الأحذية والملابس والإكسسوارات': 'shoes-clothing-accessories.html',
-    'الرياضة واللياقة والصحة': 'sports-fitness-health.html',
-    'الأثاث والأدوات المنزلية': 'furniture-home-tools.html',
-    'الأدوات والصيانة': 'tools-maintenance.html',
-    'منتجات متنوعة': 'miscellaneous-products.html'
+    'الأجهزة المنزلية والكهربائية': 'home-appliances-electrical',
+    'الإلكترونيات والتكنولوجيا': 'electronics-technology',
+    'العناية الشخصية والصحة والجمال': 'personal-care-health-beauty',
+    'الأحذية والملابس والإكسسوارات': 'shoes-clothing-accessories',
+    'الرياضة واللياقة والصحة': 'sports-fitness-health',
+    'الأثاث والأدوات المنزلية': 'furniture-home-tools',
+    'الأدوات والصيانة': 'tools-maintenance',
+    'منتجات متنوعة': 'miscellaneous-products'
   };
 
-  window.getCategoryPage = function(name){
-    return map[name] || 'miscellaneous-products.html';
+  function categorySlug(name){
+    const category = (name || '').trim();
+    if(map[category]){ return map[category]; }
+    const slug = category
+      .replace(/[^\u0600-\u06FF\u0750-\u077F\w\s-]/g, '')
+      .replace(/[\s-]+/g, '-')
+      .replace(/^-+|-+$/g, '');
+    return slug || 'غير-محدد';
   }
-})();
\ No newline at end of file
+
+  // Listing path relative to the site root
+  window.getCategoryPage = function(name){
+    return `categories/${categorySlug(name)}/`;
+  };
+})();
@@ -1,6 +1,6 @@
 // يتم جلب المنتجات حصراً من هذا الملف والالتزام به حرفياً
 export async function fetchUaeProducts(){
-  const res = await fetch('data/uae-products.json',{cache:'no-store'});
+  const res = await fetch('data/uae-products.json',{cache:'no-cache'});
   if(!res.ok){throw new Error('failed to load products');}
   return await res.json();
 }
@@ -595,7 +595,9 @@ class ResponsiveProductCards {
             }
             
             // الانتقال في نفس النافذة بدلاً من النافذة المنبثقة
-            const detailsUrl = `./product.html?id=${encodeURIComponent(productId)}`;
+            const detailsUrl = window.getProductUrl
+                ? window.getProductUrl(productId, product)
+                : `./product.html?id=${encodeURIComponent(productId)}`;
             this.showNotification(`🎯 جاري الانتقال لتفاصيل "${product.title.substring(0, 30)}..."`, 'info');
             
             // انتقال مباشر بدون popup
@@ -0,0 +1,100 @@
+// Search index client - prefix-sharded inverted index written by build_search_index.py
+// A query fetches only the shards for its words instead of scanning the full catalog
+(function(){
+  'use strict';
+
+  function basePath(){
+    return window.location.pathname.includes('/en/') ? '../data/search-index/' : './data/search-index/';
+  }
+
+  let manifestPromise = null;
+  const shardCache = new Map();
+
+  function fetchJson(url, options){
+    return fetch(url, options).then(response => {
+      if(!response.ok){ throw new Error(`HTTP ${response.status}: ${url}`); }
+      return response.json();
+    });
+  }
+
+  // Must match normalize_text/tokenize in arabic_text.py
+  function normalize(text){
+    return (text || '')
+      .replace(/\*\*|&nbsp;|\uFEFF/g, ' ')
+      .replace(/[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]/g, '')
+      .replace(/[أإآٱ]/g, 'ا')
+      .replace(/[ىئ]/g, 'ي')
+      .replace(/ؤ/g, 'و')
+      .replace(/ة/g, 'ه')
+      .toLowerCase();
+  }
+
+  function tokens(text, minLength){
+    const words = normalize(text).match(/[\p{L}\p{N}]+/gu) || [];
+    return words
+      .map(word => word.replace(/^[وبكف]?ال(?=..)/, ''))
+      .filter(word => word.length >= minLength);
+  }
+
+  // The manifest changes with every catalog update, so always revalidate it
+  function loadManifest(){
+    if(!manifestPromise){
+      manifestPromise = fetchJson(basePath() + 'manifest.json', { cache: 'no-cache' })
+        .catch(error => { manifestPromise = null; throw error; });
+    }
+    return manifestPromise;
+  }
+
+  // Shard names are content hashes, so a fetched shard never goes stale
+  function loadShard(file){
+    if(!shardCache.has(file)){
+      shardCache.set(file, fetchJson(basePath() + file)
+        .catch(error => { shardCache.delete(file); throw error; }));
+    }
+    return shardCache.get(file);
+  }
+
+  // Product ids (strings) matching every query word as a word prefix, best score first
+  async function search(query){
+    const manifest = await loadManifest();
+    const words = [...new Set(tokens(query, manifest.min_token_length))];
+    if(words.length === 0){ return []; }
+
+    const perWord = await Promise.all(words.map(async word => {
+      const scores = new Map();
+      const file = manifest.shards[word.slice(0, manifest.prefix_length)];
+      if(!file){ return scores; }
+      const shard = await loadShard(file);
+      for(const [term, postings] of Object.entries(shard)){
+        if(!term.startsWith(word)){ continue; }
+        for(const [id, score] of postings){
+          scores.set(id, Math.max(scores.get(id) || 0, score));
+        }
+      }
+      return scores;
+    }));
+
+    const [first, ...rest] = perWord;
+    const results = [];
+    for(const [id, score] of first){
+      if(rest.every(scores => scores.has(id))){
+        results.push([id, rest.reduce((total, scores) => total + scores.get(id), score)]);
+      }
+    }
+    return results.sort((a, b) => b[1] - a[1]).map(([id]) => id);
+  }
+
+  // Products from a loaded list that match the query, in index ranking order
+  async function filter(products, query){
+    const byId = new Map(products.map(product => [String(product.id), product]));
+    return (await search(query)).map(id => byId.get(id)).filter(Boolean);
+  }
+
+  window.SearchIndex = {
+    normalize,
+    tokens,
+    loadManifest,
+    search,
+    filter
+  };
+})();
@@ -0,0 +1,16 @@
+// Registers the service worker written by build_service_worker.py (sw.js at the site root)
+(function(){
+  'use strict';
+
+  if(!('serviceWorker' in navigator)){ return; }
+  // The local preview server (watch_site.py) live-reloads pages, so cached copies would only get in the way
+  if(['localhost', '127.0.0.1'].includes(window.location.hostname)){ return; }
+
+  // This file lives in js/, so the site root is one level above it (works from en/ pages too)
+  const root = new URL('..', document.currentScript.src);
+
+  window.addEventListener('load', () => {
+    navigator.serviceWorker.register(new URL('sw.js', root).href, { scope: root.pathname })
+      .catch(error => console.warn('Service worker registration failed:', error));
+  });
+})();
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تصغير صفحات HTML وإنشاء نسخ مضغوطة مسبقًا (.gz و .br) - سوق الإمارات
+التصغير آمن للنص العربي ولمحتوى white-space: pre-line ولكتل JSON-LD
+"""
+
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import re
+from glob import glob
+
+from build_output import OutputWriter, delete_if_exists, write_if_changed
+
+try:
+    import brotli
+except ImportError:  # اختياري: بدونه تُنشأ نسخ .gz فقط
+    brotli = None
+
+# امتدادات الملفات التي تُضغط مسبقًا
+PRECOMPRESS_EXTENSIONS = ('.html', '.xml', '.css', '.js', '.json', '.ndjson')
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+# أجزاء لا يُمس محتواها عند تصغير HTML
+_PROTECTED_BLOCK = re.compile(
+    r'<(script|style|pre|textarea)\b[^>]*>.*?</\1\s*>'
+    r'|<(div|p|span)\b[^>]*white-space:\s*pre[^>]*>.*?</\2\s*>',
+    re.DOTALL | re.IGNORECASE
+)
+_HTML_COMMENT = re.compile(r'<!--(?!\s*SEO:|\[if).*?-->', re.DOTALL)
+_JSON_LD_OPEN = re.compile(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>', re.IGNORECASE)
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+def _collapse_whitespace(text):
+    """دمج المسافات المتتالية في مسافة واحدة (أو سطر جديد إن احتوت على سطر)"""
+    return re.sub(r'\s+', lambda m: '\n' if '\n' in m.group(0) else ' ', text)
+
+def minify_css(css):
+    """تصغير CSS: حذف التعليقات والمسافات حول الأقواس والفواصل"""
+    css = _CSS_COMMENT.sub('', css)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+def minify_js(js):
+    """تصغير محافظ لـ JavaScript: حذف المسافات في بداية ونهاية الأسطر والأسطر الفارغة فقط"""
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+def _minify_protected(block, tag):
+    tag = (tag or '').lower()
+    open_end = block.index('>') + 1
+    close_start = block.rindex('</')
+    opening, content, closing = block[:open_end], block[open_end:close_start], block[close_start:]
+    if tag == 'style':
+        return f"{opening}{minify_css(content)}{closing}"
+    if tag == 'script':
+        if _JSON_LD_OPEN.match(opening):
+            try:
+                data = json.loads(content)
+            except ValueError:
+                return block
+            compact = json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+            return f"{opening}{compact}{closing}"
+        return f"{opening}{minify_js(content)}{closing}"
+    # pre / textarea / عناصر white-space: pre* تبقى كما هي
+    return block
+
+def minify_html(html):
+    """تصغير HTML مع الحفاظ على السكربتات والأنماط ومحتوى pre-line كما هي دلاليًا"""
+    output = []
+    position = 0
+    for match in _PROTECTED_BLOCK.finditer(html):
+        output.append(_minify_text(html[position:match.start()]))
+        output.append(_minify_protected(match.group(0), match.group(1)))
+        position = match.end()
+    output.append(_minify_text(html[position:]))
+    return ''.join(output).strip() + '\n'
+
+def _minify_text(text):
+    # التعليقات العادية تُحذف، وعلامات SEO:BEGIN/END تبقى لأن سكربت السيو يعتمد عليها
+    return _collapse_whitespace(_HTML_COMMENT.sub('', text))
+
+def gzip_bytes(data):
+    """ضغط gzip حتمي (بدون اسم ملف أو وقت في الترويسة)"""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def _is_fresh(source, target):
+    try:
+        return os.path.getmtime(target) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+def precompress_file(path):
+    """إنشاء ملفات .gz و .br بجانب الملف إن كانت غير موجودة أو أقدم منه؛ تعيد عدد الملفات المكتوبة"""
+    targets = [path + '.gz']
+    if brotli is not None:
+        targets.append(path + '.br')
+    if all(_is_fresh(path, target) for target in targets):
+        return 0
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = 0
+    written += write_if_changed(path + '.gz', gzip_bytes(data))
+    if brotli is not None:
+        written += write_if_changed(path + '.br', brotli.compress(data, quality=11))
+    # تحديث وقت التعديل حتى لا يُعاد الضغط في التشغيل القادم إن لم يتغير المحتوى
+    for target in targets:
+        os.utime(target)
+    return written
+
+def _precompress_task(path):
+    try:
+        return path, precompress_file(path), None
+    except Exception as e:
+        return path, 0, str(e)
+
+def iter_precompress_candidates(paths):
+    """الملفات القابلة للضغط من قائمة ملفات ومجلدات (بدون الدخول في المجلدات الفرعية)"""
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(PRECOMPRESS_EXTENSIONS):
+                        yield entry.path
+        elif os.path.isfile(path) and path.endswith(PRECOMPRESS_EXTENSIONS):
+            yield path
+
+def discard_variants(path):
+    """حذف نسخ .gz/.br لملف تغير أو حُذف حتى لا تُخدم نسخة قديمة منه"""
+    for suffix in COMPRESSED_SUFFIXES:
+        delete_if_exists(path + suffix)
+
+def remove_orphan_variants(folder, writer=None):
+    """حذف ملفات .gz/.br التي لم يعد ملفها الأصلي موجودًا"""
+    writer = writer or OutputWriter()
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            for suffix in COMPRESSED_SUFFIXES:
+                original = entry.path[:-len(suffix)]
+                if (entry.name.endswith(suffix) and original.endswith(PRECOMPRESS_EXTENSIONS)
+                        and not os.path.exists(original)):
+                    writer.delete(entry.path)
+
+def precompress_paths(paths, jobs=1, writer=None):
+    """ضغط كل الملفات المرشحة عبر مجموعة عمليات؛ تعيد عدد الملفات المكتوبة"""
+    writer = writer or OutputWriter()
+    for path in paths:
+        if os.path.isdir(path):
+            remove_orphan_variants(path, writer)
+    candidates = iter_precompress_candidates(paths)
+    written = 0
+    if jobs <= 1:
+        results = map(_precompress_task, candidates)
+        written = _collect_results(results, writer)
+    else:
+        with multiprocessing.Pool(processes=jobs) as pool:
+            results = pool.imap_unordered(_precompress_task, candidates, chunksize=16)
+            written = _collect_results(results, writer)
+    return written
+
+def _collect_results(results, writer):
+    written = 0
+    for path, count, error in results:
+        if error is not None:
+            print(f"❌ خطأ في ضغط {path}: {error}")
+            continue
+        written += count
+        writer.written += count
+    return written
+
+def default_precompress_paths():
+    """مجلد صفحات المنتجات وملفات sitemap في جذر الموقع"""
+    return ['data/pruducts-pages'] + sorted(glob('sitemap*.xml'))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='إنشاء نسخ .gz و .br مضغوطة مسبقًا للملفات المولدة')
+    parser.add_argument('paths', nargs='*',
+                        help='ملفات أو مجلدات للضغط (الافتراضي: صفحات المنتجات وملفات sitemap)')
+    parser.add_argument('--jobs', type=int, default=0, metavar='N',
+                        help='عدد العمليات المتوازية (0 = عدد الأنوية)')
+    args = parser.parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    if brotli is None:
+        print("⚠️ مكتبة brotli غير مثبتة، سيتم إنشاء نسخ .gz فقط")
+    writer = OutputWriter()
+    written = precompress_paths(args.paths or default_precompress_paths(), jobs=jobs, writer=writer)
+    print(f"🗜️ تم إنشاء/تحديث {written} ملف مضغوط")
+    print(writer.summary())
+
+if __name__ == "__main__":
+    main()
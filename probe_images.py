@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+فحص توفر صور المنتجات على خوادمها - سوق الإمارات
+asyncio بطلبات HEAD (أو GET عند رفض HEAD) عبر مجمّع اتصالات محدود مع حد لكل خادم،
+وطلبات شرطية (If-None-Match / If-Modified-Since) من ذاكرة نتائج على القرص لها مدة صلاحية
+"""
+
+import argparse
+import asyncio
+import json
+import ssl
+import time
+from urllib.parse import quote, urljoin, urlsplit
+
+from build_output import OutputWriter
+
+# ذاكرة نتائج الفحص: {الرابط: {status, alive, checked, expires, etag, last_modified, content_type}}
+IMAGE_STATUS_PATH = 'data/image-status.json'
+
+# مدة صلاحية النتيجة بالثواني: الصورة المتاحة تُعاد بعد أسبوع، والمفقودة بعد يوم، وأخطاء الشبكة بعد ساعة
+ALIVE_TTL = 7 * 24 * 3600
+DEAD_TTL = 24 * 3600
+ERROR_TTL = 3600
+
+# حالات HTTP التي تعني أن الصورة غير موجودة فعلًا (وليست عطلًا مؤقتًا في الخادم)
+DEAD_STATUSES = frozenset({404, 410})
+# رفض HEAD: يُعاد الطلب بـ GET ويُغلق الاتصال بعد قراءة الرأس فقط
+HEAD_REJECTED_STATUSES = frozenset({403, 405, 501})
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+MAX_REDIRECTS = 3
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_PER_HOST = 6
+DEFAULT_TIMEOUT = 10.0
+
+USER_AGENT = 'sooq-alemarat-image-prober/1.0'
+
+def load_image_status(path=IMAGE_STATUS_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_image_status(status, path=IMAGE_STATUS_PATH, writer=None):
+    content = json.dumps(dict(sorted(status.items())), ensure_ascii=False, separators=(',', ':'))
+    return (writer or OutputWriter()).write(path, content)
+
+def dead_image_urls(status):
+    """روابط الصور المؤكد فقدها (404/410) في ذاكرة الفحص، بغض النظر عن انتهاء صلاحيتها"""
+    return {url for url, entry in status.items() if entry.get('alive') is False}
+
+def expired_urls(urls, status, now=None):
+    """الروابط التي لم تُفحص بعد أو انتهت صلاحية نتيجتها"""
+    now = time.time() if now is None else now
+    return [url for url in urls if status.get(url, {}).get('expires', 0) <= now]
+
+class _Response:
+    def __init__(self, status, headers):
+        self.status = status
+        self.headers = headers
+
+class ConnectionPool:
+    """اتصالات keep-alive مفتوحة لكل خادم مع حد إجمالي للاتصالات وحد لكل خادم"""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.per_host = per_host
+        self._total = asyncio.Semaphore(concurrency)
+        self._hosts = {}
+        self._idle = {}
+        self._ssl = ssl.create_default_context()
+
+    def _host_limit(self, origin):
+        if origin not in self._hosts:
+            self._hosts[origin] = asyncio.Semaphore(self.per_host)
+        return self._hosts[origin]
+
+    async def request(self, method, url, headers):
+        """طلب واحد بدون جسم استجابة؛ يعيد _Response (الحالة والرؤوس بأحرف صغيرة)"""
+        parts = urlsplit(url)
+        secure = parts.scheme == 'https'
+        port = parts.port or (443 if secure else 80)
+        origin = (parts.scheme, parts.hostname, port)
+        target = quote(parts.path or '/', safe="/%:@!$&'()*+,;=-._~")
+        if parts.query:
+            target += '?' + quote(parts.query, safe="/%:@!$&'()*+,;=-._~?")
+        host = parts.hostname if port in (80, 443) else f"{parts.hostname}:{port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}", 'Accept: image/*',
+                 f"Connection: {'keep-alive' if method == 'HEAD' else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1', 'replace')
+
+        async with self._host_limit(origin), self._total:
+            idle = self._idle.setdefault(origin, [])
+            # اتصال مفتوح سابقًا قد يكون الخادم أغلقه: يُعاد الطلب مرة على اتصال جديد
+            for reuse in ((True, False) if idle else (False,)):
+                if reuse:
+                    reader, writer = idle.pop()
+                else:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(parts.hostname, port, ssl=self._ssl if secure else None,
+                                                server_hostname=parts.hostname if secure else None),
+                        self.timeout)
+                try:
+                    writer.write(payload)
+                    response, keep_alive = await asyncio.wait_for(self._read_head(reader), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reuse:
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive and method == 'HEAD':
+                    idle.append((reader, writer))
+                else:
+                    writer.close()
+                return response
+
+    @staticmethod
+    async def _read_head(reader):
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        version, status = lines[0].split(' ', 2)[:2]
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' and (version != 'HTTP/1.0' or connection == 'keep-alive')
+        return _Response(int(status), headers), keep_alive
+
+    def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+class ImageProber:
+    """فحص مجموعة روابط صور وتحديث ذاكرة النتائج (status) في مكانها"""
+
+    def __init__(self, status, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT):
+        self.status = status
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.counts = {'alive': 0, 'dead': 0, 'error': 0, 'not-modified': 0}
+
+    async def probe_all(self, urls):
+        pool = ConnectionPool(self.concurrency, self.per_host, self.timeout)
+        pending = iter(urls)
+
+        async def worker():
+            # كل العمال يسحبون من نفس المكرر، فلا يزيد عدد الطلبات الجارية عن concurrency
+            for url in pending:
+                self.status[url] = await self.probe(pool, url)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            pool.close()
+        return self.counts
+
+    async def probe(self, pool, url):
+        """نتيجة فحص رابط واحد (مدخل ذاكرة النتائج)"""
+        previous = self.status.get(url, {})
+        headers = {}
+        if previous.get('alive'):
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        now = time.time()
+        try:
+            response = await self._request(pool, url, headers)
+        except (OSError, EOFError, asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError) as e:
+            self.counts['error'] += 1
+            entry = dict(previous, error=str(e) or type(e).__name__, checked=int(now), expires=int(now + ERROR_TTL))
+            # عطل مؤقت لا يغير حكمًا سابقًا على الصورة
+            entry.setdefault('alive', None)
+            return entry
+
+        if response.status == 304:
+            self.counts['not-modified'] += 1
+            entry = dict(previous, status=304, checked=int(now), expires=int(now + ALIVE_TTL))
+            entry.pop('error', None)
+            return entry
+        content_type = response.headers.get('content-type', '')
+        if 200 <= response.status < 300:
+            alive = True
+        elif response.status in DEAD_STATUSES:
+            alive = False
+        else:
+            alive = None
+        self.counts['alive' if alive else 'dead' if alive is False else 'error'] += 1
+        entry = {
+            'status': response.status,
+            'alive': alive,
+            'checked': int(now),
+            'expires': int(now + (ALIVE_TTL if alive else DEAD_TTL if alive is False else ERROR_TTL)),
+        }
+        if content_type:
+            entry['content_type'] = content_type
+        if alive and response.headers.get('etag'):
+            entry['etag'] = response.headers['etag']
+        if alive and response.headers.get('last-modified'):
+            entry['last_modified'] = response.headers['last-modified']
+        return entry
+
+    async def _request(self, pool, url, headers):
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await pool.request('HEAD', url, headers)
+            if response.status in HEAD_REJECTED_STATUSES:
+                response = await pool.request('GET', url, dict(headers, Range='bytes=0-0'))
+            if response.status not in REDIRECT_STATUSES or 'location' not in response.headers:
+                return response
+            url = urljoin(url, response.headers['location'])
+            # الطلب الشرطي يخص الرابط الأصلي فقط
+            headers = {}
+        return response
+
+def probe_images(urls, status_path=IMAGE_STATUS_PATH, force=False, concurrency=DEFAULT_CONCURRENCY,
+                 per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT, writer=None):
+    """فحص الروابط المنتهية صلاحيتها فقط (أو كلها مع force) وحفظ الذاكرة؛ يعيد (الذاكرة، العدادات)"""
+    status = load_image_status(status_path)
+    urls = sorted({url for url in urls if url and urlsplit(url).scheme in ('http', 'https')})
+    pending = urls if force else expired_urls(urls, status)
+    started = time.perf_counter()
+    prober = ImageProber(status, concurrency, per_host, timeout)
+    counts = asyncio.run(prober.probe_all(pending)) if pending else dict(prober.counts)
+    # روابط لم تعد في الكتالوج لا تبقى في الذاكرة
+    wanted = set(urls)
+    status = {url: entry for url, entry in status.items() if url in wanted}
+    save_image_status(status, status_path, writer)
+    print(f"🖼️ فُحص {len(pending)} من {len(urls)} رابط صورة في {time.perf_counter() - started:.2f}ث: "
+          f"متاح {counts['alive']}، لم يتغير {counts['not-modified']}، مفقود {counts['dead']}، "
+          f"تعذر الفحص {counts['error']}")
+    return status, counts
+
+def main(argv=None):
+    from generate_static_pages import PRODUCTS_PATH, iter_products
+
+    parser = argparse.ArgumentParser(description='فحص توفر صور المنتجات - سوق الإمارات')
+    parser.add_argument('urls', nargs='*', help='روابط صور محددة بدل صور الكتالوج')
+    parser.add_argument('--products', default=PRODUCTS_PATH, help='مسار ملف المنتجات (JSON أو NDJSON)')
+    parser.add_argument('--cache', default=IMAGE_STATUS_PATH, help='ملف ذاكرة نتائج الفحص')
+    parser.add_argument('--force', action='store_true', help='إعادة فحص كل الروابط وتجاهل مدة الصلاحية')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='أقصى عدد اتصالات متزامنة')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST, help='أقصى عدد اتصالات لكل خادم')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='مهلة الاتصال والاستجابة بالثواني')
+    args = parser.parse_args(argv)
+    urls = args.urls or [product.get('image_url') for product in iter_products(args.products)]
+    status, _ = probe_images(urls, args.cache, args.force, args.concurrency, args.per_host, args.timeout)
+    dead = sorted(dead_image_urls(status))
+    for url in dead[:20]:
+        print(f"   ❌ {status[url].get('status')} {url}")
+    if len(dead) > 20:
+        print(f"   ... و {len(dead) - 20} رابط آخر")
+
+if __name__ == "__main__":
+    main()
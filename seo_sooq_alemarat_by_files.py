@@ -5,25 +5,99 @@
 خاص بمشروع: سوق الإمارات (sooq-alemarat)
 """
 
+import argparse
+import html as html_lib
+import json
 import os
 import sys
 import re
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from build_output import OutputWriter
+from build_report import BuildReport, DEFAULT_SLOWEST_COUNT, elapsed, profiled, stage_clock
+from slug_registry import is_redirect_stub
+
+# علامات بداية ونهاية كتلة السيو المحقونة حتى يمكن استبدالها في مكانها عند كل تشغيل
+SEO_BLOCK_BEGIN = "<!-- SEO:BEGIN (Auto) -->"
+SEO_BLOCK_END = "<!-- SEO:END (Auto) -->"
+# الكتلة التي يكتبها generate_static_pages.py من بيانات الكتالوج مباشرة (لا يعيد هذا السكربت حسابها)
+SEO_BLOCK_BEGIN_CATALOG = "<!-- SEO:BEGIN (Catalog) -->"
+SEO_BLOCK_BEGIN_PREFIX = "<!-- SEO:BEGIN"
+
+# تقرير التشغيل (JSON): زمن القراءة والحقن والكتابة وأبطأ الصفحات
+SEO_REPORT_PATH = 'data/seo-report.json'
+
+# حالة التوفر في الكتالوج ← قيم schema.org
+SCHEMA_AVAILABILITY = {
+    'in stock': 'https://schema.org/InStock',
+    'out of stock': 'https://schema.org/OutOfStock',
+    'preorder': 'https://schema.org/PreOrder',
+    'backorder': 'https://schema.org/BackOrder',
+}
+
+# كتلة السيو القديمة بدون علامات (من الإصدارات السابقة للسكربت)
+LEGACY_SEO_BLOCK = re.compile(
+    r'\s*<!-- SEO Meta Tags \(Auto\) -->.*?<!-- LocalBusiness Schema JSON-LD \(Auto\) -->\s*'
+    r'<script[^>]*>.*?</script>',
+    re.DOTALL
+)
+
+# لاحقة عنوان الصفحة داخل الكتلة المحقونة
+SEO_TITLE_SUFFIX = " - سوق الإمارات | أفضل العروض والأسعار"
+
+# نصوص وسوم الميتا لكل لغة (مفتاحها og:locale)؛ الصفحات العربية هي الافتراضية
+META_TEXTS = {
+    'ar_AE': {
+        'site_name': 'سوق الإمارات',
+        'title_suffix': SEO_TITLE_SUFFIX,
+        'call_to_action': 'اطلب الآن من سوق الإمارات مع توصيل سريع لجميع إمارات الدولة:',
+        'keywords': 'سوق الإمارات, تسوق اونلاين, منتجات الإمارات, عروض الإمارات',
+        'cities': 'دبي، أبوظبي، الشارقة، عجمان، رأس الخيمة، الفجيرة، أم القيوين',
+        'placename': 'الإمارات',
+    },
+    'en_AE': {
+        'site_name': 'Emirates Souq',
+        'title_suffix': ' - Emirates Souq | Best Offers and Prices',
+        'call_to_action': 'Order now from Emirates Souq with fast delivery across the UAE:',
+        'keywords': 'Emirates Souq, online shopping, UAE products, UAE offers',
+        'cities': 'Dubai, Abu Dhabi, Sharjah, Ajman, Ras Al Khaimah, Fujairah, Umm Al Quwain',
+        'placename': 'UAE',
+    },
+}
+
+# وسوم الرأس التي تعرّفها الكتلة المحقونة وتُحذف نسخها الأصلية لتجنب التكرار
+DUPLICATE_HEAD_TAGS = re.compile(
+    r'[ \t]*(?:<title[^>]*>.*?</title>'
+    r'|<meta\s+(?:name|property)=["\'](?:description|keywords|robots|viewport|og:[\w:]+|'
+    r'product:[\w:]+|twitter:[\w:]+)["\'][^>]*>'
+    r'|<link\s+rel=["\']canonical["\'][^>]*>'
+    r'|<!-- (?:Open Graph Tags|JSON-LD Schema) -->)[ \t]*\r?\n?',
+    re.DOTALL | re.IGNORECASE
+)
+
+JSON_LD_SCRIPT = re.compile(
+    r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>.*?</script>',
+    re.DOTALL | re.IGNORECASE
+)
 
 def extract_title(html):
     m = re.search(r'<title[^>]*>(.*?)</title>', html, re.IGNORECASE | re.DOTALL)
     if m:
-        return m.group(1).strip()
+        title = m.group(1).strip()
+        # عنوان من كتلة محقونة سابقًا: نعيد العنوان الأصلي بدون اللاحقة
+        if title.endswith(SEO_TITLE_SUFFIX):
+            title = title[:-len(SEO_TITLE_SUFFIX)].strip()
+        return html_lib.unescape(title)
     m = re.search(r'<h1[^>]*>(.*?)</h1>', html, re.IGNORECASE | re.DOTALL)
     if m:
-        return re.sub(r'<.*?>', '', m.group(1)).strip()
+        return html_lib.unescape(re.sub(r'<.*?>', '', m.group(1)).strip())
     return "منتج من سوق الإمارات"
 
 def extract_image(html):
     m = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', html, re.IGNORECASE)
     if m:
-        src = m.group(1)
+        src = html_lib.unescape(m.group(1))
         if src.startswith('http'):
             return src
         return f"https://sherow1982.github.io/sooq-alemarat/{src.lstrip('/')}"
@@ -43,39 +117,46 @@ def build_product_url(file_path: Path):
     name = file_path.name
     return f"https://sherow1982.github.io/sooq-alemarat/data/pruducts-pages/{name}"
 
-def create_product_schema(title, image, url, price):
+def json_ld(data):
+    """تسلسل كائن JSON-LD بشكل صالح دائمًا (حتى مع علامات الاقتباس) وآمن داخل <script>"""
+    return json.dumps(data, ensure_ascii=False, indent=2).replace('</', '<\\/')
+
+def create_product_schema(title, image, url, price, description=None, sku="",
+                          brand=None, category=None, currency="AED",
+                          availability="https://schema.org/InStock"):
     if not price:
         price = 0
-    price_valid_until = (datetime.now() + timedelta(days=365)).strftime('%Y-%m-%d')
-    schema = f"""
-{{
-  "@context": "https://schema.org/",
-  "@type": "Product",
-  "name": "{title}",
-  "image": ["{image}"],
-  "description": "{title} - تسوق الآن من سوق الإمارات مع توصيل سريع لكل إمارات الدولة.",
-  "sku": "",
-  "mpn": "",
-  "brand": {{
-    "@type": "Brand",
-    "name": "سوق الإمارات"
-  }},
-  "offers": {{
-    "@type": "Offer",
-    "url": "{url}",
-    "priceCurrency": "AED",
-    "price": "{price}",
-    "priceValidUntil": "{price_valid_until}",
-    "itemCondition": "https://schema.org/NewCondition",
-    "availability": "https://schema.org/InStock",
-    "seller": {{
-      "@type": "Organization",
-      "name": "سوق الإمارات"
-    }}
-  }}
-}}
-"""
-    return schema.strip()
+    # تاريخ ثابت طوال السنة (نهاية السنة القادمة) حتى لا تتغير الكتلة يوميًا
+    price_valid_until = f"{datetime.now().year + 1}-12-31"
+    schema = {
+        "@context": "https://schema.org/",
+        "@type": "Product",
+        "name": title,
+        "image": [image],
+        "description": description or f"{title} - تسوق الآن من سوق الإمارات مع توصيل سريع لكل إمارات الدولة.",
+        "sku": str(sku),
+        "mpn": "",
+        "brand": {
+            "@type": "Brand",
+            "name": brand or "سوق الإمارات"
+        },
+    }
+    if category:
+        schema["category"] = category
+    schema["offers"] = {
+        "@type": "Offer",
+        "url": url,
+        "priceCurrency": currency,
+        "price": str(price),
+        "priceValidUntil": price_valid_until,
+        "itemCondition": "https://schema.org/NewCondition",
+        "availability": availability,
+        "seller": {
+            "@type": "Organization",
+            "name": "سوق الإمارات"
+        }
+    }
+    return json_ld(schema)
 
 def create_local_business_schema():
     return """
@@ -113,61 +194,68 @@ def create_local_business_schema():
 }
 """.strip()
 
-def create_meta_tags(title, desc, image, url, price):
+def create_meta_tags(title, desc, image, url, price, currency="AED", locale='ar_AE', alternates=()):
+    """وسوم الميتا؛ alternates أزواج (hreflang، الرابط) لنسخ الصفحة بلغات أخرى"""
+    texts = META_TEXTS[locale]
     if len(desc) > 155:
         desc = desc[:152] + "..."
-    emirates_cities = "دبي، أبوظبي، الشارقة، عجمان، رأس الخيمة، الفجيرة، أم القيوين"
+    title = html_lib.escape(title)
+    desc = html_lib.escape(desc)
+    image = html_lib.escape(image)
+    url = html_lib.escape(url)
+    site_name = texts['site_name']
+    emirates_cities = texts['cities']
+    alternate_links = ''.join(
+        f'\n    <link rel="alternate" hreflang="{hreflang}" href="{html_lib.escape(href)}">'
+        for hreflang, href in alternates
+    )
     meta = f"""
     <!-- SEO Meta Tags (Auto) -->
-    <title>{title} - سوق الإمارات | أفضل العروض والأسعار</title>
-    <meta name="description" content="{desc} اطلب الآن من سوق الإمارات مع توصيل سريع لجميع إمارات الدولة: {emirates_cities}.">
-    <meta name="keywords" content="{title}, سوق الإمارات, تسوق اونلاين, منتجات الإمارات, عروض الإمارات, {emirates_cities}">
+    <title>{title}{texts['title_suffix']}</title>
+    <meta name="description" content="{desc} {texts['call_to_action']} {emirates_cities}.">
+    <meta name="keywords" content="{title}, {texts['keywords']}, {emirates_cities}">
     <meta name="robots" content="index, follow">
     <meta name="viewport" content="width=device-width, initial-scale=1">
     <meta name="geo.region" content="AE">
-    <meta name="geo.placename" content="الإمارات">
+    <meta name="geo.placename" content="{texts['placename']}">
     <meta name="geo.position" content="25.2048;55.2708">
     <meta name="ICBM" content="25.2048, 55.2708">
-    <link rel="canonical" href="{url}">
+    <link rel="canonical" href="{url}">{alternate_links}
     
     <!-- Open Graph Meta Tags -->
-    <meta property="og:title" content="{title} - سوق الإمارات">
+    <meta property="og:title" content="{title} - {site_name}">
     <meta property="og:description" content="{desc}">
     <meta property="og:image" content="{image}">
     <meta property="og:url" content="{url}">
     <meta property="og:type" content="product">
-    <meta property="og:site_name" content="سوق الإمارات">
-    <meta property="og:locale" content="ar_AE">
+    <meta property="og:site_name" content="{site_name}">
+    <meta property="og:locale" content="{locale}">
     <meta property="product:price:amount" content="{price}">
-    <meta property="product:price:currency" content="AED">
+    <meta property="product:price:currency" content="{currency}">
     
     <!-- Twitter Card Meta Tags -->
     <meta name="twitter:card" content="summary_large_image">
-    <meta name="twitter:title" content="{title} - سوق الإمارات">
+    <meta name="twitter:title" content="{title} - {site_name}">
     <meta name="twitter:description" content="{desc}">
     <meta name="twitter:image" content="{image}">
     """
     return meta.strip()
 
-def inject_seo(html, title, image, url, price):
-    head_close = "</head>"
-    if head_close not in html:
-        print("   ⚠️ لا يوجد </head> في الصفحة، سيتم تخطي هذا الملف")
-        return html
-
-    html = re.sub(
-        r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>.*?</script>',
-        '',
-        html,
-        flags=re.DOTALL | re.IGNORECASE
-    )
+def build_seo_block(title, image, url, price, desc=None, schema_fields=None,
+                    begin_marker=SEO_BLOCK_BEGIN, locale='ar_AE', alternates=()):
+    """كتلة الميتا والسكيما الكاملة محاطة بعلامات البداية والنهاية
 
-    desc = title
-    meta = create_meta_tags(title, desc, image, url, price)
-    product_schema = create_product_schema(title, image, url, price)
+    schema_fields حقول إضافية لسكيما المنتج (الوصف، sku، العلامة، الفئة، العملة، التوفر)
+    يمررها المولد من بيانات الكتالوج؛ بدونها تُبنى الكتلة من العنوان فقط كما في وضع التهيئة.
+    locale و alternates: لغة الصفحة (og:locale) وروابط نسخها بلغات أخرى (hreflang).
+    """
+    schema_fields = schema_fields or {}
+    meta = create_meta_tags(title, desc or title, image, url, price,
+                            currency=schema_fields.get('currency', 'AED'), locale=locale, alternates=alternates)
+    product_schema = create_product_schema(title, image, url, price, **schema_fields)
     local_schema = create_local_business_schema()
 
-    injection = f"""
+    return f"""{begin_marker}
 {meta}
 
 <!-- Product Schema JSON-LD (Auto) -->
@@ -179,29 +267,108 @@ def inject_seo(html, title, image, url, price):
 <script type="application/ld+json">
 {local_schema}
 </script>
+{SEO_BLOCK_END}"""
 
-</head>"""
+def catalog_seo_block(product, url, description=None, locale='ar_AE', alternates=()):
+    """كتلة السيو لصفحة منتج مبنية مباشرة من حقول uae-products.json (تُستدعى وقت التوليد)"""
+    title = product.get('title', '')
+    brand = product.get('brand', '')
+    schema_fields = {
+        'description': description or None,
+        'sku': product.get('id', ''),
+        'brand': brand if brand and brand != 'none' else None,
+        'category': product.get('category') or None,
+        'currency': product.get('currency', 'AED'),
+        'availability': SCHEMA_AVAILABILITY.get(
+            str(product.get('stock_status', 'in stock')).lower(), SCHEMA_AVAILABILITY['in stock']),
+    }
+    return build_seo_block(title, product.get('image_url', ''), url, product.get('sale_price', 0),
+                           desc=description or title, schema_fields=schema_fields,
+                           begin_marker=SEO_BLOCK_BEGIN_CATALOG, locale=locale, alternates=alternates)
 
-    return html.replace(head_close, injection)
+def find_seo_block(html):
+    """موضع كتلة السيو (البداية، النهاية) أو None إن لم توجد"""
+    begin = html.find(SEO_BLOCK_BEGIN_PREFIX)
+    if begin == -1:
+        return None
+    end = html.find(SEO_BLOCK_END, begin)
+    if end == -1:
+        return None
+    return begin, end + len(SEO_BLOCK_END)
 
-def process_file(file_path: Path):
+def inject_seo(html, title, image, url, price):
+    """حقن كتلة السيو أو استبدالها في مكانها؛ تشغيله مرتين يعطي نفس النتيجة"""
+    block = build_seo_block(title, image, url, price)
+
+    span = find_seo_block(html)
+    if span is not None:
+        begin, end = span
+        if html[begin:end] == block:
+            return html
+        return html[:begin] + block + html[end:]
+
+    head_close = "</head>"
+    if head_close not in html:
+        print("   ⚠️ لا يوجد </head> في الصفحة، سيتم تخطي هذا الملف")
+        return html
+
+    # أول تشغيل: إزالة الكتل القديمة غير المعلّمة وأي JSON-LD أو وسوم ميتا مكررة ثم الحقن قبل </head>
+    head, body = html.split(head_close, 1)
+    head = LEGACY_SEO_BLOCK.sub('', head)
+    head = JSON_LD_SCRIPT.sub('', head)
+    head = DUPLICATE_HEAD_TAGS.sub('', head)
+    head = re.sub(r'\n(?:[ \t]*\r?\n){2,}', '\n\n', head)
+    return f"{head.rstrip()}\n\n{block}\n\n{head_close}{body}"
+
+def process_file(file_path: Path, writer=None, report=None, verbose=True):
+    """معالجة صفحة واحدة وإرجاع الحالة: updated أو unchanged أو failed
+
+    عند تمرير report تُسجل أزمنة مراحل read و seo و write لهذه الصفحة.
+    """
+    report = report or BuildReport('seo_sooq_alemarat_by_files', slowest=0)
     try:
+        clock = stage_clock()
         with open(file_path, "r", encoding="utf-8") as f:
             html = f.read()
+        report.add('read', *elapsed(clock))
+        # صفحات أنتجها المولد تحمل سيو مبنيًا من الكتالوج، وصفحات التحويل لا تُفهرس؛ التهيئة للصفحات الأخرى فقط
+        if SEO_BLOCK_BEGIN_CATALOG in html or is_redirect_stub(html):
+            return "unchanged"
+        clock = stage_clock()
         title = extract_title(html)
         image = extract_image(html)
         price = extract_price(html)
         url = build_product_url(file_path)
         updated = inject_seo(html, title, image, url, price)
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(updated)
-        print(f"   ✅ تم تحديث: {file_path.name}")
-        return True
+        report.add('seo', *elapsed(clock))
+        if updated == html:
+            return "unchanged"
+        clock = stage_clock()
+        (writer or OutputWriter()).write(file_path, updated)
+        report.add('write', *elapsed(clock))
+        if verbose:
+            print(f"   ✅ تم تحديث: {file_path.name}")
+        return "updated"
     except Exception as e:
         print(f"   ❌ خطأ في {file_path.name}: {e}")
-        return False
+        return "failed"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='سيو وسكيما لصفحات المنتجات في data/pruducts-pages - سوق الإمارات')
+    parser.add_argument('--verbose', action='store_true', help='طباعة سطر لكل صفحة')
+    # التقرير يحمل وقت التشغيل، فلا يُكتب إلا عند طلبه حتى لا يغير كل تشغيل ملفات المستودع
+    parser.add_argument('--report', nargs='?', const=SEO_REPORT_PATH, metavar='PATH',
+                        help=f"كتابة تقرير التشغيل JSON (أزمنة المراحل والملفات والذاكرة وأبطأ الصفحات) "
+                             f"في PATH أو {SEO_REPORT_PATH}")
+    parser.add_argument('--slowest', type=int, default=DEFAULT_SLOWEST_COUNT, metavar='N',
+                        help='عدد أبطأ الصفحات في التقرير')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='قياس أقصى ذاكرة Python عبر tracemalloc (يبطئ التشغيل)')
+    parser.add_argument('--profile', metavar='PATH', help='حفظ ملف cProfile للتشغيل في PATH')
+    return parser.parse_args(argv)
 
-def main():
+def main(argv=None):
+    args = parse_args(argv)
     print("\n" + "="*60)
     print("🇦🇪 سكربت سيو/سكيما لكل ملفات المنتجات في data/pruducts-pages - سوق الإمارات 🇦🇪")
     print("="*60 + "\n")
@@ -214,7 +381,9 @@ def main():
         print("تحقق من اسم المجلد بدقة (الإملاء مهم جدًا).")
         sys.exit(1)
 
-    html_files = list(products_dir.glob("*.html"))
+    report = BuildReport('seo_sooq_alemarat_by_files', slowest=args.slowest, trace_memory=args.trace_memory)
+    with report.stage('load'):
+        html_files = list(products_dir.glob("*.html"))
     if not html_files:
         print("❌ لا يوجد أي ملفات HTML داخل data/pruducts-pages/")
         sys.exit(1)
@@ -222,22 +391,36 @@ def main():
     print(f"📦 تم العثور على {len(html_files)} صفحة منتج في data/pruducts-pages/\n")
 
     ok = 0
+    unchanged = 0
     fail = 0
+    writer = OutputWriter()
 
-    for i, fp in enumerate(html_files, 1):
-        print(f"[{i}/{len(html_files)}] معالجة: {fp.name} ...")
-        if process_file(fp):
-            ok += 1
-        else:
-            fail += 1
+    with profiled(args.profile):
+        for i, fp in enumerate(html_files, 1):
+            if args.verbose:
+                print(f"[{i}/{len(html_files)}] معالجة: {fp.name} ...")
+            clock = stage_clock()
+            status = process_file(fp, writer, report, args.verbose)
+            report.note_item(fp.name, elapsed(clock)[0])
+            if status == "updated":
+                ok += 1
+            elif status == "unchanged":
+                unchanged += 1
+            else:
+                fail += 1
 
     print("\n" + "="*60)
     print("📊 النتائج النهائية:")
     print("="*60)
-    print(f"✅ نجح: {ok} ملف")
+    print(f"✅ تم تحديث: {ok} ملف")
+    print(f"⏭️ بدون تغيير: {unchanged} ملف")
     print(f"❌ فشل: {fail} ملف")
+    print(writer.summary())
     if html_files:
-        print(f"📈 نسبة النجاح: {(ok/len(html_files)*100):.1f}%")
+        print(f"📈 نسبة النجاح: {((ok + unchanged)/len(html_files)*100):.1f}%")
+    if args.report:
+        report.save(args.report, writer, pages=len(html_files), updated=ok, unchanged=unchanged, failed=fail)
+    print(report.summary())
     print("\n✨ انتهى التنفيذ، الصفحات التي نجحت الآن تحتوي على سكيما ومنظومة ميتا كاملة جاهزة للـ SEO والـ Rich Results\n")
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+سجل روابط المنتجات الثابت - سوق الإمارات
+يحفظ لكل منتج رابطه (slug) والروابط القديمة التي تحولت إليه، حتى لا يتغير رابط الصفحة مع كل تشغيل
+ولا تضيع الروابط القديمة المفهرسة في محركات البحث
+"""
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+from html import escape as html_escape
+
+from build_output import OutputWriter
+
+# سجل الروابط (NDJSON): سطر لكل منتج {id, slug, title, aliases}؛ غير مضاف إلى المستودع، ويحفظه
+# خط النشر بين التشغيلات عبر actions/cache (.github/workflows/pages.yml)
+SLUG_REGISTRY_PATH = 'data/slug-registry.ndjson'
+
+# جدول المعرف ← رابط الصفحة المشترك بين sitemap والفيد وسكربتات الموقع
+PRODUCT_URLS_PATH = 'data/product-urls.json'
+
+# أقصى طول لجزء العنوان في الرابط (أسماء الملفات الطويلة تتجاوز حد نظام الملفات)
+MAX_SLUG_TITLE_LENGTH = 70
+
+_LEGACY_PAGE_PATTERN = re.compile(r'.*-([0-9A-Za-z_]+)\.html')
+
+REDIRECT_STUB_TEMPLATE = """<!DOCTYPE html>
+<html lang="ar" dir="rtl">
+<head>
+<meta charset="UTF-8">
+<title>تم نقل الصفحة - سوق الإمارات</title>
+<meta name="robots" content="noindex, follow">
+<link rel="canonical" href="{url}">
+<meta http-equiv="refresh" content="0; url={target}">
+</head>
+<body>
+<p>تم نقل هذه الصفحة إلى <a href="{target}">{target_text}</a></p>
+</body>
+</html>
+"""
+
+def create_arabic_slug(title, product_id):
+    """إنشاء رابط عربي للمنتج"""
+    slug = title.strip()
+
+    # تنظيف الرموز الخاصة مع الحفاظ على العربية
+    slug = re.sub(r'[^\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\u0590-\u05FF\w\s-]', '', slug)
+    slug = re.sub(r'[\s-]+', '-', slug)
+    slug = slug.strip('-')
+
+    # قص العناوين الطويلة عند حد كلمة
+    if len(slug) > MAX_SLUG_TITLE_LENGTH:
+        slug = slug[:MAX_SLUG_TITLE_LENGTH + 1].rsplit('-', 1)[0] or slug[:MAX_SLUG_TITLE_LENGTH]
+
+    return f"{slug}-{product_id}" if slug else str(product_id)
+
+def is_clean_slug(slug, product_id):
+    """هل الرابط بالشكل الحالي؟ (الروابط القديمة قد تبدأ بـ - أو تحتوي -- أو تكون طويلة جدًا)"""
+    title_part = slug[:-len(f"-{product_id}")] if slug.endswith(f"-{product_id}") else None
+    if slug == str(product_id):
+        return True
+    return (
+        bool(title_part)
+        and not title_part.startswith('-')
+        and '--' not in slug
+        and len(title_part) <= MAX_SLUG_TITLE_LENGTH
+    )
+
+def is_redirect_stub(html):
+    """هل الصفحة صفحة تحويل من رابط قديم؟ (لا تُحقن فيها كتلة سيو)"""
+    return 'http-equiv="refresh"' in html and 'name="robots" content="noindex' in html
+
+def redirect_stub_html(target_filename, url):
+    """صفحة تحويل خفيفة من رابط قديم إلى الصفحة الحالية للمنتج"""
+    return REDIRECT_STUB_TEMPLATE.format(
+        url=html_escape(url),
+        target=html_escape(target_filename),
+        target_text=html_escape(target_filename.rsplit('.', 1)[0].replace('-', ' ')),
+    )
+
+class SlugRegistry:
+    """سجل المعرف ↔ الرابط مفهرس في sqlite مؤقت (بحث O(1) في الاتجاهين وذاكرة ثابتة)
+
+    يُحمَّل من SLUG_REGISTRY_PATH، أو يُبذر أول مرة من بيان البناء وأسماء الصفحات الموجودة
+    حتى تبقى الروابط المنشورة كما هي.
+    """
+
+    def __init__(self, registry_path=SLUG_REGISTRY_PATH, seed_manifest_entries=None, pages_folder=None):
+        fd, self.db_path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute('CREATE TABLE entries (id TEXT PRIMARY KEY, slug TEXT, title TEXT, aliases TEXT,'
+                        ' seen INTEGER DEFAULT 0, position INTEGER)')
+        self.db.execute('CREATE TABLE slugs (slug TEXT PRIMARY KEY, id TEXT)')
+        self.collisions = []
+        self._position = 0
+        try:
+            with open(registry_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._insert(str(entry['id']), entry['slug'], entry.get('title'), entry.get('aliases', []))
+        except FileNotFoundError:
+            self._seed(seed_manifest_entries or (), pages_folder)
+
+    def _insert(self, product_id, slug, title, aliases):
+        self._position += 1
+        self.db.execute('INSERT INTO entries (id, slug, title, aliases, position) VALUES (?, ?, ?, ?, ?)',
+                        (product_id, slug, title, json.dumps(aliases, ensure_ascii=False), self._position))
+        self._claim_names(product_id, [slug] + aliases)
+
+    def _update(self, product_id, slug, title, aliases):
+        self.db.execute('UPDATE entries SET slug = ?, title = ?, aliases = ? WHERE id = ?',
+                        (slug, title, json.dumps(aliases, ensure_ascii=False), product_id))
+        self._claim_names(product_id, [slug] + aliases)
+
+    def _claim_names(self, product_id, names):
+        self.db.executemany('INSERT OR REPLACE INTO slugs (slug, id) VALUES (?, ?)',
+                            ((name, product_id) for name in names))
+
+    def _seed(self, manifest_entries, pages_folder):
+        """بذر السجل من بيان البناء (المعرف ← الرابط) ثم من أسماء الصفحات الموجودة بنمط ...-{id}.html"""
+        for product_id, entry in manifest_entries:
+            if entry.get('slug'):
+                self._insert(str(product_id), entry['slug'], None, [])
+        if not pages_folder or not os.path.isdir(pages_folder):
+            return
+        for name in sorted(os.listdir(pages_folder)):
+            match = _LEGACY_PAGE_PATTERN.fullmatch(name)
+            if not match:
+                continue
+            slug, product_id = name[:-len('.html')], match.group(1)
+            row = self._entry(product_id)
+            if row is None:
+                self._insert(product_id, slug, None, [])
+            elif slug != row[0] and slug not in row[2]:
+                self._update(product_id, row[0], row[1], row[2] + [slug])
+
+    def _entry(self, product_id):
+        row = self.db.execute('SELECT slug, title, aliases FROM entries WHERE id = ?', (product_id,)).fetchone()
+        return None if row is None else (row[0], row[1], json.loads(row[2]))
+
+    def _owner(self, slug):
+        row = self.db.execute('SELECT id FROM slugs WHERE slug = ?', (slug,)).fetchone()
+        return row and row[0]
+
+    def _claim(self, candidate, product_id):
+        """أول رابط متاح يبدأ بالمرشح؛ عند التصادم مع منتج آخر يضاف رقم ويُسجل التصادم"""
+        slug = candidate
+        suffix = 2
+        while self._owner(slug) not in (None, product_id):
+            slug = f"{candidate}-{suffix}"
+            suffix += 1
+        if slug != candidate:
+            self.collisions.append((product_id, candidate, self._owner(candidate)))
+        return slug
+
+    def resolve(self, product_id, title):
+        """رابط المنتج الحالي والروابط القديمة التي تُحوَّل إليه: (slug, aliases)
+
+        الرابط المسجل يُستخدم كما هو ما دام العنوان لم يتغير؛ عند تغيره يُحسب رابط جديد
+        ويضاف القديم إلى aliases.
+        """
+        product_id = str(product_id)
+        row = self._entry(product_id)
+        if row is not None and is_clean_slug(row[0], product_id) and row[1] in (None, title):
+            slug, aliases = row[0], row[2]
+            if row[1] is None:
+                self.db.execute('UPDATE entries SET title = ? WHERE id = ?', (title, product_id))
+        else:
+            slug = self._claim(create_arabic_slug(title, product_id), product_id)
+            aliases = row[2] if row else []
+            if row and row[0] != slug:
+                aliases = aliases + [row[0]]
+            aliases = [alias for alias in aliases if alias != slug]
+            if row is None:
+                self._insert(product_id, slug, title, aliases)
+            else:
+                self._update(product_id, slug, title, aliases)
+        self.db.execute('UPDATE entries SET seen = 1 WHERE id = ?', (product_id,))
+        return slug, aliases
+
+    def removed(self):
+        """(المعرف، الرابط، الروابط القديمة) للمنتجات التي اختفت من الكتالوج"""
+        rows = self.db.execute('SELECT id, slug, aliases FROM entries WHERE seen = 0 ORDER BY position')
+        for product_id, slug, aliases in rows.fetchall():
+            yield product_id, slug, json.loads(aliases)
+
+    def save(self, registry_path=SLUG_REGISTRY_PATH, writer=None):
+        """حفظ منتجات هذا التشغيل فقط (تُحذف المنتجات المختفية وتتحرر روابطها)"""
+        with (writer or OutputWriter()).open(registry_path) as f:
+            rows = self.db.execute('SELECT id, slug, title, aliases FROM entries WHERE seen = 1 ORDER BY position')
+            for product_id, slug, title, aliases in rows:
+                record = {'id': product_id, 'slug': slug, 'title': title, 'aliases': json.loads(aliases)}
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write('\n')
+
+    def close(self):
+        self.db.close()
+        os.remove(self.db_path)
+
+def load_product_urls(path=PRODUCT_URLS_PATH):
+    """جدول المعرف ← مسار صفحة المنتج (نسبةً إلى جذر الموقع)، أو جدول فارغ إن لم يُبنَ بعد"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_slug_aliases(registry_path=SLUG_REGISTRY_PATH):
+    """الروابط القديمة لكل منتج من سجل الروابط: {المعرف: [slug قديم]} (لإعادة توليد منتجات بعينها)"""
+    aliases = {}
+    try:
+        with open(registry_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    aliases[str(entry['id'])] = entry.get('aliases', [])
+    except FileNotFoundError:
+        pass
+    return aliases
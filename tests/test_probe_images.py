@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+اختبارات فاحص الصور (probe_images.py) مقابل خادم http.server محلي - سوق الإمارات
+الحالات: 200، 404، رفض HEAD (405) ثم GET، تحويل 301، وطلب شرطي يعيد 304
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from probe_images import ImageProber, dead_image_urls, load_image_status, probe_images
+
+ETAG = '"v1"'
+LAST_MODIFIED = 'Mon, 05 Oct 2026 10:00:00 GMT'
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, headers=(), body=b''):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _handle(self):
+        self.server.requests.append((self.command, self.path, dict(self.headers)))
+        if self.path == '/ok.jpg':
+            if self.headers.get('If-None-Match') == ETAG:
+                self._reply(304, [('ETag', ETAG)])
+            else:
+                self._reply(200, [('Content-Type', 'image/jpeg'), ('ETag', ETAG), ('Last-Modified', LAST_MODIFIED)])
+        elif self.path == '/no-head.jpg':
+            if self.command == 'HEAD':
+                self._reply(405, [('Allow', 'GET')])
+            else:
+                self._reply(200, [('Content-Type', 'image/png')], b'x')
+        elif self.path == '/moved.jpg':
+            self._reply(301, [('Location', '/ok.jpg')])
+        else:
+            self._reply(404)
+
+    do_HEAD = _handle
+    do_GET = _handle
+
+class ProbeImagesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _ImageHandler)
+        cls.server.daemon_threads = True
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests.clear()
+
+    def probe(self, *paths, status=None):
+        prober = ImageProber({} if status is None else status, concurrency=4, per_host=2, timeout=5)
+        counts = asyncio.run(prober.probe_all([self.base + path for path in paths]))
+        return prober.status, counts
+
+    def requests_for(self, path):
+        return [(method, headers) for method, request_path, headers in self.server.requests if request_path == path]
+
+    def test_alive_image_keeps_validators(self):
+        status, counts = self.probe('/ok.jpg')
+        entry = status[self.base + '/ok.jpg']
+        self.assertEqual((entry['status'], entry['alive']), (200, True))
+        self.assertEqual(entry['etag'], ETAG)
+        self.assertEqual(entry['last_modified'], LAST_MODIFIED)
+        self.assertEqual(entry['content_type'], 'image/jpeg')
+        self.assertEqual(counts['alive'], 1)
+        self.assertEqual([method for method, _ in self.requests_for('/ok.jpg')], ['HEAD'])
+
+    def test_missing_image_is_dead(self):
+        status, counts = self.probe('/missing.jpg')
+        entry = status[self.base + '/missing.jpg']
+        self.assertEqual((entry['status'], entry['alive']), (404, False))
+        self.assertNotIn('etag', entry)
+        self.assertEqual(counts['dead'], 1)
+        self.assertEqual(dead_image_urls(status), {self.base + '/missing.jpg'})
+
+    def test_rejected_head_falls_back_to_ranged_get(self):
+        status, _ = self.probe('/no-head.jpg')
+        entry = status[self.base + '/no-head.jpg']
+        self.assertEqual((entry['status'], entry['alive']), (200, True))
+        requests = self.requests_for('/no-head.jpg')
+        self.assertEqual([method for method, _ in requests], ['HEAD', 'GET'])
+        self.assertEqual(requests[1][1].get('Range'), 'bytes=0-0')
+
+    def test_redirect_is_followed(self):
+        status, _ = self.probe('/moved.jpg')
+        entry = status[self.base + '/moved.jpg']
+        self.assertEqual((entry['status'], entry['alive']), (200, True))
+        self.assertEqual(len(self.requests_for('/moved.jpg')), 1)
+        self.assertEqual(len(self.requests_for('/ok.jpg')), 1)
+
+    def test_conditional_request_returns_not_modified(self):
+        url = self.base + '/ok.jpg'
+        status, _ = self.probe('/ok.jpg')
+        self.server.requests.clear()
+        status, counts = self.probe('/ok.jpg', status=status)
+        entry = status[url]
+        self.assertEqual(counts['not-modified'], 1)
+        self.assertEqual((entry['status'], entry['alive'], entry['etag']), (304, True, ETAG))
+        headers = self.requests_for('/ok.jpg')[0][1]
+        self.assertEqual(headers.get('If-None-Match'), ETAG)
+        self.assertEqual(headers.get('If-Modified-Since'), LAST_MODIFIED)
+
+    def test_cached_results_skip_the_network_until_they_expire(self):
+        urls = [self.base + path for path in ('/ok.jpg', '/missing.jpg')]
+        with tempfile.TemporaryDirectory() as folder:
+            cache_path = os.path.join(folder, 'image-status.json')
+            probe_images(urls, cache_path, concurrency=2)
+            self.assertEqual(len(self.server.requests), 2)
+            self.server.requests.clear()
+            _, counts = probe_images(urls, cache_path, concurrency=2)
+            self.assertEqual(self.server.requests, [])
+            self.assertEqual(sum(counts.values()), 0)
+            self.assertEqual(set(load_image_status(cache_path)), set(urls))
+
+if __name__ == "__main__":
+    unittest.main()
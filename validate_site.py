@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+التحقق من اتساق مخرجات البناء قبل النشر - سوق الإمارات
+فهرس واحد في الذاكرة لكل ملفات الموقع ثم فحص الصفحات المولدة بالتوازي: الروابط الداخلية،
+صحة JSON-LD، تكرار <title>، تغطية sitemap للملفات، ومعرفات فيد Google Merchant
+"""
+
+import argparse
+import csv
+import gzip
+import html as html_lib
+import json
+import multiprocessing
+import os
+import posixpath
+import re
+import time
+from functools import lru_cache
+from urllib.parse import unquote, urlsplit
+from xml.sax.saxutils import unescape as xml_unescape
+
+from build_output import OutputWriter
+from slug_registry import PRODUCT_URLS_PATH, is_redirect_stub, load_product_urls
+
+# تقرير التحقق (JSON): عدد المشاكل لكل نوع وأمثلة منها
+VALIDATION_REPORT_PATH = 'data/validation-report.json'
+
+# المجلدات المولدة التي تُفحص صفحاتها افتراضيًا
+DEFAULT_PAGE_FOLDERS = ('data/pruducts-pages', 'en/products', 'categories')
+SITEMAP_INDEX_PATH = 'sitemap.xml'
+FEED_PATHS = ('google-merchant-feed.xml', 'google-merchant-feed.csv',
+              'google-merchant-feed-supplemental.xml', 'google-merchant-feed-supplemental.csv')
+
+# مجلدات لا تدخل فهرس الموقع
+SKIPPED_FOLDERS = frozenset({'.git', 'node_modules', '__pycache__'})
+
+# عدد الأمثلة المحفوظة لكل نوع مشكلة في التقرير
+EXAMPLES_PER_KIND = 20
+# أنواع المشاكل التي لا تُفشل التحقق
+WARNING_KINDS = frozenset({'duplicate-title', 'not-in-sitemap'})
+
+PAGE_CHUNK_SIZE = 64
+
+# أنماط حساسة لحالة الأحرف تبدأ بنص ثابت: أسرع بكثير على صفحات عربية طويلة (المخرجات المولدة بأحرف صغيرة)
+_LINK_PATTERNS = (re.compile(r'href=["\']([^"\']*)["\']'), re.compile(r'src=["\']([^"\']*)["\']'))
+_TITLE_PATTERN = re.compile(r'<title[^>]*>(.*?)</title>', re.DOTALL)
+_JSON_LD_PATTERN = re.compile(r'application/ld\+json["\'][^>]*>(.*?)</script>', re.DOTALL)
+_NOINDEX_PATTERN = re.compile(r'<meta\s+name=["\']robots["\']\s+content=["\'][^"\']*noindex', re.IGNORECASE)
+_CANONICAL_PATTERN = re.compile(r'<link\s+rel=["\']canonical["\']\s+href=["\']([^"\']*)["\']')
+_LOC_PATTERN = re.compile(r'<loc>(.*?)</loc>', re.DOTALL)
+_FEED_ITEM_PATTERN = re.compile(r'<g:id>(.*?)</g:id>.*?<g:link>(.*?)</g:link>', re.DOTALL)
+# روابط خارجية أو لا تشير إلى ملف
+_EXTERNAL_LINK = re.compile(r'^(?:[a-z][a-z0-9+.-]*:|//|#)', re.IGNORECASE)
+
+def build_file_index(root='.'):
+    """كل ملفات الموقع كمسارات نسبية بصيغة الروابط (a/b.html) في مجموعة واحدة"""
+    index = set()
+    for folder, folders, files in os.walk(root):
+        folders[:] = [name for name in folders if name not in SKIPPED_FOLDERS]
+        relative = os.path.relpath(folder, root)
+        prefix = '' if relative == '.' else relative.replace(os.sep, '/') + '/'
+        index.update(prefix + name for name in files)
+    return index
+
+def resolve_link(index, folder, link, base_url):
+    """(الهدف، موجود؟) لرابط داخلي في صفحة داخل المجلد folder، أو None للروابط الخارجية
+
+    الروابط المطلقة التي تبدأ بعنوان الموقع تُعامل كروابط داخلية من الجذر، والروابط إلى نفس
+    الصفحة (#... أو ?...) لا تُفحص.
+    """
+    if base_url and link.startswith(base_url + '/'):
+        link = link[len(base_url) + 1:] or './'
+        folder = ''
+    elif not link or _EXTERNAL_LINK.match(link):
+        return None
+    path = unquote(urlsplit(link).path)
+    if not path:
+        return None
+    if path.startswith('/'):
+        return link, False
+    resolved = posixpath.normpath(posixpath.join(folder, path))
+    if resolved.startswith('../') or resolved == '..':
+        return link, False
+    if path.endswith('/') or resolved == '.':
+        resolved = 'index.html' if resolved == '.' else f"{resolved}/index.html"
+    return resolved, resolved in index or f"{resolved}/index.html" in index
+
+_worker_index = None
+_worker_base_url = None
+
+def _init_worker(index, base_url):
+    global _worker_index, _worker_base_url
+    _worker_index = index
+    _worker_base_url = base_url
+    _resolve_in_worker.cache_clear()
+
+@lru_cache(maxsize=1 << 16)
+def _resolve_in_worker(folder, link):
+    # نفس الروابط تتكرر في كل صفحات المجلد (القوالب والأصول المشتركة)، فتُحل مرة واحدة
+    return resolve_link(_worker_index, folder, html_lib.unescape(link), _worker_base_url)
+
+def is_own_canonical(folder, page_path, html):
+    """هل الصفحة هي النسخة الأساسية من نفسها؟ (الصفحات غير المترجمة تشير canonical إلى الصفحة العربية)"""
+    match = _CANONICAL_PATTERN.search(html)
+    if not match:
+        return True
+    result = _resolve_in_worker(folder, match.group(1))
+    return result is None or result[0] == page_path
+
+def check_page(page_path):
+    """فحص صفحة واحدة: (المسار، العنوان، قابلة للفهرسة؟، [(النوع، الرسالة)])"""
+    problems = []
+    try:
+        with open(page_path, 'r', encoding='utf-8') as f:
+            html = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return page_path, None, False, [('unreadable', str(e))]
+
+    folder = posixpath.dirname(page_path)
+    for link in sorted({link for pattern in _LINK_PATTERNS for link in pattern.findall(html)}):
+        result = _resolve_in_worker(folder, link)
+        if result is not None and not result[1]:
+            problems.append(('broken-link', f"{link} → {result[0]}"))
+
+    for block in _JSON_LD_PATTERN.findall(html):
+        try:
+            json.loads(block)
+        except ValueError as e:
+            problems.append(('invalid-json-ld', str(e)))
+
+    titles = _TITLE_PATTERN.findall(html)
+    if len(titles) > 1:
+        problems.append(('multiple-titles', f"{len(titles)} وسوم <title>"))
+    elif not titles:
+        problems.append(('missing-title', 'لا يوجد <title>'))
+    indexable = not is_redirect_stub(html) and not _NOINDEX_PATTERN.search(html) and is_own_canonical(folder, page_path, html)
+    title = ' '.join(titles[0].split()) if titles else None
+    return page_path, title, indexable, problems
+
+def _check_page_task(page_path):
+    try:
+        return check_page(page_path)
+    except Exception as e:
+        return page_path, None, False, [('error', str(e))]
+
+def iter_page_paths(index, folders=DEFAULT_PAGE_FOLDERS):
+    """صفحات HTML داخل المجلدات المطلوبة من الفهرس (بدون النسخ المضغوطة)"""
+    prefixes = tuple(folder.rstrip('/') + '/' for folder in folders)
+    return sorted(path for path in index if path.endswith('.html') and path.startswith(prefixes))
+
+def _read_text(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return f.read()
+
+def sitemap_locations(index_path=SITEMAP_INDEX_PATH, base_url=''):
+    """روابط كل الصفحات في sitemap (مع أجزائه إن كان فهرسًا) كمسارات نسبية من جذر الموقع"""
+    content = _read_text(index_path)
+    locations = [xml_unescape(loc.strip()) for loc in _LOC_PATTERN.findall(content)]
+    if '<sitemapindex' not in content:
+        return locations
+    pages = []
+    folder = os.path.dirname(index_path)
+    for shard in locations:
+        name = shard[len(base_url) + 1:] if base_url and shard.startswith(base_url + '/') else shard
+        pages.extend(xml_unescape(loc.strip()) for loc in _LOC_PATTERN.findall(_read_text(os.path.join(folder, name))))
+    return pages
+
+def feed_entries(path):
+    """(المعرف، الرابط) لكل عنصر في فيد XML أو CSV"""
+    if path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return [(row.get('id', ''), row.get('link', '')) for row in csv.DictReader(f)]
+    content = _read_text(path)
+    return [(xml_unescape(product_id.strip()), xml_unescape(link.strip()))
+            for product_id, link in _FEED_ITEM_PATTERN.findall(content)]
+
+class ValidationResult:
+    """مشاكل التحقق مجمعة حسب النوع مع أمثلة محدودة لكل نوع"""
+
+    def __init__(self):
+        self.counts = {}
+        self.examples = {}
+        self.pages = 0
+
+    def add(self, kind, path, message):
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        examples = self.examples.setdefault(kind, [])
+        if len(examples) < EXAMPLES_PER_KIND:
+            examples.append({'path': path, 'message': message})
+
+    @property
+    def errors(self):
+        return sum(count for kind, count in self.counts.items() if kind not in WARNING_KINDS)
+
+    @property
+    def warnings(self):
+        return sum(count for kind, count in self.counts.items() if kind in WARNING_KINDS)
+
+    def to_dict(self):
+        return {
+            'pages': self.pages,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'counts': dict(sorted(self.counts.items())),
+            'examples': dict(sorted(self.examples.items())),
+        }
+
+    def summary(self):
+        status = '✅' if not self.errors else '❌'
+        lines = [f"{status} التحقق من {self.pages} صفحة: {self.errors} خطأ، {self.warnings} تحذير"]
+        for kind, count in sorted(self.counts.items()):
+            example = self.examples[kind][0]
+            lines.append(f"   {'⚠️' if kind in WARNING_KINDS else '❌'} {kind}: {count} "
+                         f"(مثال: {example['path']} — {example['message']})")
+        return '\n'.join(lines)
+
+def validate_site(folders=DEFAULT_PAGE_FOLDERS, jobs=1, base_url=None, sitemap_path=SITEMAP_INDEX_PATH,
+                  feed_paths=FEED_PATHS, urls_path=PRODUCT_URLS_PATH):
+    """التحقق من مخرجات الموقع (من جذره في المجلد الحالي) وإرجاع ValidationResult
+
+    الصفحات تُفحص عبر مجموعة عمليات عند jobs > 1 (كل عملية تأخذ نسخة من فهرس الملفات مرة واحدة).
+    """
+    if base_url is None:
+        from generate_static_pages import site_base_url
+        base_url = site_base_url()
+    base_url = base_url.rstrip('/')
+    result = ValidationResult()
+    index = build_file_index()
+    pages = iter_page_paths(index, folders)
+    result.pages = len(pages)
+
+    titles = {}
+    indexable_pages = set()
+    if jobs <= 1 or len(pages) < PAGE_CHUNK_SIZE * 2:
+        _init_worker(index, base_url)
+        _collect_pages(map(_check_page_task, pages), result, titles, indexable_pages)
+    else:
+        with multiprocessing.Pool(processes=jobs, initializer=_init_worker, initargs=(index, base_url)) as pool:
+            _collect_pages(pool.imap_unordered(_check_page_task, pages, chunksize=PAGE_CHUNK_SIZE),
+                           result, titles, indexable_pages)
+
+    _check_sitemap(sitemap_path, index, base_url, indexable_pages, result)
+    _check_feeds(feed_paths, index, base_url, load_product_urls(urls_path), result)
+    return result
+
+def _collect_pages(checks, result, titles, indexable_pages):
+    for page_path, title, indexable, problems in checks:
+        for kind, message in problems:
+            result.add(kind, page_path, message)
+        if not indexable:
+            continue
+        indexable_pages.add(page_path)
+        if title:
+            first = titles.setdefault(title, page_path)
+            if first != page_path:
+                result.add('duplicate-title', page_path, f"نفس عنوان {first}")
+
+def _check_sitemap(sitemap_path, index, base_url, indexable_pages, result):
+    """كل رابط في sitemap له ملف، وكل صفحة مولدة قابلة للفهرسة موجودة في sitemap"""
+    try:
+        locations = sitemap_locations(sitemap_path, base_url)
+    except (OSError, UnicodeDecodeError) as e:
+        result.add('sitemap-unreadable', sitemap_path, str(e))
+        return
+    listed = set()
+    for loc in locations:
+        resolved = resolve_link(index, '', loc, base_url)
+        if resolved is None:
+            result.add('sitemap-external', sitemap_path, loc)
+            continue
+        target, exists = resolved
+        if not exists:
+            result.add('sitemap-missing-file', sitemap_path, f"{loc} → {target}")
+        listed.add(target)
+        listed.add(posixpath.join(target, 'index.html'))
+    for page_path in sorted(indexable_pages - listed):
+        result.add('not-in-sitemap', page_path, 'الصفحة غير موجودة في sitemap')
+
+def _check_feeds(feed_paths, index, base_url, product_urls, result):
+    """معرفات الفيد فريدة وموجودة في الكتالوج، وروابطها تشير إلى ملفات موجودة"""
+    for path in feed_paths:
+        if not os.path.exists(path):
+            continue
+        try:
+            entries = feed_entries(path)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            result.add('feed-unreadable', path, str(e))
+            continue
+        seen = set()
+        for product_id, link in entries:
+            if not product_id:
+                result.add('feed-missing-id', path, link)
+                continue
+            if product_id in seen:
+                result.add('feed-duplicate-id', path, product_id)
+            seen.add(product_id)
+            if product_urls and product_id not in product_urls:
+                result.add('feed-unknown-id', path, product_id)
+            resolved = resolve_link(index, '', link, base_url)
+            if resolved is None or not resolved[1]:
+                result.add('feed-broken-link', path, f"{product_id}: {link}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='التحقق من اتساق مخرجات البناء - سوق الإمارات')
+    parser.add_argument('folders', nargs='*', default=list(DEFAULT_PAGE_FOLDERS),
+                        help='مجلدات الصفحات المطلوب فحصها (الافتراضي: صفحات المنتجات والفئات)')
+    parser.add_argument('--jobs', type=int, default=0, metavar='N',
+                        help='عدد العمليات المتوازية (0 = عدد الأنوية)')
+    parser.add_argument('--report', default=VALIDATION_REPORT_PATH, metavar='PATH',
+                        help='مسار تقرير التحقق JSON')
+    args = parser.parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    started = time.perf_counter()
+    result = validate_site(folders=args.folders, jobs=jobs)
+    print(result.summary())
+    print(f"⏱️ تم التحقق في {time.perf_counter() - started:.2f}ث")
+    if args.report:
+        OutputWriter().write(args.report, json.dumps(result.to_dict(), ensure_ascii=False, indent=2) + '\n')
+    return 1 if result.errors else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+وضع المراقبة مع خادم معاينة محلي - سوق الإمارات
+يراقب ملف المنتجات ويعيد بناء ما تغير فقط (الصفحات، sitemap، الفيد، فهرس البحث، صفحات الفئات)
+ثم يحدّث المتصفح تلقائيًا عبر live reload
+"""
+
+import argparse
+import functools
+import io
+import os
+import threading
+import time
+from contextlib import nullcontext, redirect_stdout
+from datetime import datetime, timezone
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build_catalog_shards import CARD_FIELDS, build_catalog_shards
+from build_output import OutputWriter
+from build_report import BuildReport
+from build_service_worker import write_service_worker
+from build_search_index import SearchIndexState
+from generate_merchant_feed import feed_row, generate_merchant_feeds, write_feed_rows
+from generate_static_pages import (PRODUCTS_PATH, RelatedLinks, create_sitemap, generate_all_product_pages,
+                                   iter_products, load_build_manifest, load_site_config, product_hash,
+                                   render_product_page, save_build_manifest, site_base_url, write_category_pages,
+                                   write_records_index)
+from slug_registry import load_product_urls, load_slug_aliases
+
+DEFAULT_PORT = 8000
+WATCH_INTERVAL = 0.3
+
+# نقطة Server-Sent Events التي تستمع لها الصفحات المعروضة
+LIVE_RELOAD_PATH = '/__livereload'
+
+LIVE_RELOAD_SNIPPET = f"""<script>
+(function(){{
+  var source = new EventSource('{LIVE_RELOAD_PATH}');
+  source.addEventListener('reload', function(){{ window.location.reload(); }});
+}})();
+</script>
+"""
+
+# حقول بطاقات صفحات الفئات وأجزاء الكتالوج (والعنوان لأنه يغير رابط الصفحة)؛ تعديل حقل خارجها لا يعيد بناءها
+CATALOG_FIELDS = frozenset(CARD_FIELDS) | {'title'}
+
+# حقول تغير رابط الصفحة أو كتل المنتجات ذات الصلة في صفحات منتجات أخرى؛ تعديل حقل خارجها يعيد
+# توليد صفحات المنتجات المعدلة فقط
+RELATED_FIELDS = frozenset({'title', 'category', 'image_url'})
+
+def catalog_by_id(products):
+    """الكتالوج مفهرسًا بالمعرف مع بصمة كل منتج: {id: (البصمة، المنتج)}"""
+    return {str(product.get('id', '')): (product_hash(product), product) for product in products}
+
+def diff_catalog(old, new):
+    """(معرفات معدلة، مضافة، محذوفة، الحقول المعدلة) بين نسختين من الكتالوج"""
+    changed = []
+    fields = set()
+    for product_id, (digest, product) in new.items():
+        if product_id in old and old[product_id][0] != digest:
+            changed.append(product_id)
+            previous = old[product_id][1]
+            fields.update(key for key in previous.keys() | product.keys() if previous.get(key) != product.get(key))
+    added = [product_id for product_id in new if product_id not in old]
+    removed = [product_id for product_id in old if product_id not in new]
+    return changed, added, removed, fields
+
+class LiveReload:
+    """رقم إصدار البناء مع انتظار تغييره (كل اتصال SSE ينتظر في خيطه)"""
+
+    def __init__(self):
+        self.version = 0
+        self._condition = threading.Condition()
+
+    def notify(self):
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait(self, version, timeout):
+        """انتظار إصدار أحدث من version؛ يعيد الإصدار الحالي"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """خادم الملفات الثابتة مع حقن سكربت live reload في صفحات HTML"""
+
+    live_reload = None
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            self._stream_reload_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            # المجلد بدون / في آخره يُحوَّل كالمعتاد من الخادم الأساسي
+            if not self.path.split('?', 1)[0].endswith('/'):
+                super().do_GET()
+                return
+            path = os.path.join(path, 'index.html')
+        if not path.endswith('.html') or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        marker = body.rfind(b'</body>')
+        snippet = LIVE_RELOAD_SNIPPET.encode('utf-8')
+        body = body[:marker] + snippet + body[marker:] if marker >= 0 else body + snippet
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_reload_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        version = self.live_reload.version
+        try:
+            while True:
+                current = self.live_reload.wait(version, timeout=15)
+                # سطر تعليق كل 15 ثانية يبقي الاتصال مفتوحًا عبر الوكلاء
+                self.wfile.write(b'event: reload\ndata: {}\n\n' if current != version else b': ping\n\n')
+                self.wfile.flush()
+                version = current
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def log_message(self, format, *args):
+        pass
+
+class SiteBuilder:
+    """يحتفظ بالكتالوج الأخير في الذاكرة ويعيد بناء المخرجات المتأثرة بالتغيير فقط
+
+    القالب المجمّع يبقى في ذاكرة العملية (lru_cache). تعديل لا يمس الروابط ولا المنتجات ذات الصلة
+    (الأسعار والوصف والمخزون...) يعيد توليد صفحات المنتجات المعدلة وحدها كما في build_daemon.py، ويكتب
+    صفوفها في الفيد الإضافي بدل الفيد الكامل؛ الإضافة والحذف وتغيير العنوان أو الفئة أو الصورة تمر
+    عبر التوليد التزايدي للكتالوج كاملًا. فهرس البحث محفوظ في الذاكرة وتُعاد كتابة أجزاء كلمات المنتجات
+    المعدلة فقط، وصفحات الفئات لا يُعاد بناؤها إلا عند تغير حقول بطاقاتها.
+    """
+
+    def __init__(self, products_path=PRODUCTS_PATH, jobs=1, verbose=False):
+        self.products_path = products_path
+        self.jobs = jobs
+        self.verbose = verbose
+        self.catalog = None
+        self.search = SearchIndexState()
+        self.category_pages = []
+        config = load_site_config()
+        self.base_url = site_base_url(config)
+        self.shipping_fee = config.get('shipping_fee', 0)
+        # حالة الصفحات من آخر توليد كامل: سجلات الصفحات وبيان البناء والروابط القديمة وجدول الروابط
+        self.files = {}
+        self.manifest = None
+        self.aliases = {}
+        self.product_urls = {}
+        self.related = None
+        # صفوف الفيد المعدلة منذ آخر فيد كامل
+        self.feed_patches = {}
+
+    def build(self):
+        """قراءة الكتالوج ومقارنته بالنسخة السابقة ثم إعادة البناء عند وجود تغيير؛ يعيد True إذا بُني"""
+        started = time.perf_counter()
+        try:
+            products = list(iter_products(self.products_path))
+        except ValueError as e:
+            # الملف قد يكون في منتصف الحفظ؛ تُعاد المحاولة عند التغيير التالي
+            print(f"⚠️ تعذرت قراءة {self.products_path}: {e}")
+            return False
+        catalog = catalog_by_id(products)
+        if self.catalog is not None:
+            changed, added, removed, fields = diff_catalog(self.catalog, catalog)
+            if not (changed or added or removed):
+                return False
+            description = f"معدل {len(changed)}، مضاف {len(added)}، محذوف {len(removed)}"
+            updates = {product_id: catalog[product_id][1] for product_id in changed + added}
+            updates.update((product_id, None) for product_id in removed)
+            rebuild_catalog = bool(added or removed or fields & CATALOG_FIELDS)
+            rebuild_pages = bool(added or removed or fields & RELATED_FIELDS)
+        else:
+            description = f"{len(products)} منتج"
+            updates = None
+            rebuild_catalog = True
+            rebuild_pages = True
+
+        writer = OutputWriter()
+        report = BuildReport('watch_site', slowest=0)
+        output = None if self.verbose else io.StringIO()
+        with redirect_stdout(output) if output is not None else nullcontext():
+            self._run_stages(products, writer, report, updates, rebuild_catalog, rebuild_pages)
+        if output is not None:
+            # رسائل الأخطاء والتحذيرات فقط من مخرجات المولدات
+            for line in output.getvalue().splitlines():
+                if line.startswith(('❌', '⚠️')):
+                    print(line)
+        self.catalog = catalog
+        print(f"⚡ [{time.strftime('%H:%M:%S')}] {description} ← تم البناء في "
+              f"{time.perf_counter() - started:.2f}ث (كُتب {writer.written}، حُذف {writer.deleted})")
+        if self.verbose:
+            print(report.summary())
+        return True
+
+    def _run_stages(self, products, writer, report, updates, rebuild_catalog, rebuild_pages):
+        """updates: {المعرف: المنتج أو None للمحذوف}، أو None في البناء الأول"""
+        if rebuild_pages:
+            with report.stage('pages'):
+                generated = generate_all_product_pages(products, jobs=self.jobs, writer=writer, report=report)
+                self._load_page_state(generated)
+        else:
+            with report.stage('pages'):
+                now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+                for product_id, product in updates.items():
+                    self._render(product_id, product, products, now, writer)
+                save_build_manifest(self.manifest, writer=writer)
+                write_records_index(self.manifest['products'], writer=writer)
+            generated = [self.files[str(product.get('id', ''))] for product in products
+                         if str(product.get('id', '')) in self.files]
+        if rebuild_catalog:
+            with report.stage('categories'):
+                self.category_pages = write_category_pages(products, generated, writer=writer).pages
+        with report.stage('sitemap'):
+            create_sitemap(generated, writer=writer, category_pages=self.category_pages)
+        with report.stage('feed'):
+            if rebuild_pages:
+                generate_merchant_feeds(products, writer=writer)
+                self.feed_patches = {}
+            else:
+                # الفيد الإضافي يحمل الصفوف المعدلة منذ آخر فيد كامل (كما في build_daemon.py)
+                write_feed_rows(self.feed_patches.values(), self.base_url, writer)
+        with report.stage('search'):
+            if updates is None:
+                for product in products:
+                    self.search.set_product(product.get('id', ''), product)
+            else:
+                for product_id, product in updates.items():
+                    self.search.set_product(product_id, product)
+            self.search.write(writer, rewrite_all=updates is None)
+        if rebuild_catalog:
+            with report.stage('catalog'):
+                build_catalog_shards(products, writer=writer)
+                write_service_worker(writer)
+
+    def _load_page_state(self, generated):
+        """حالة الصفحات بعد توليد كامل؛ المنتجات ذات الصلة تُحسب عند أول تعديل تزايدي"""
+        self.files = {str(file_info['id']): file_info for file_info in generated}
+        self.manifest = load_build_manifest()
+        self.aliases = load_slug_aliases()
+        self.product_urls = load_product_urls()
+        self.related = None
+
+    def _render(self, product_id, product, products, now, writer):
+        """إعادة توليد صفحة منتج معدل وسجله JSON وصف الفيد الخاص به"""
+        if self.related is None:
+            self.related = RelatedLinks(products, writer=writer)
+        old_entry = self.manifest['products'].get(product_id)
+        slug = old_entry['slug'] if old_entry else self.files[product_id]['slug']
+        related = self.related.links(product_id, lambda other, title: self.files[other]['slug'])
+        result = render_product_page(product, slug, self.aliases.get(product_id, []), old_entry, now,
+                                     writer=writer, related=related)
+        self.manifest['products'][product_id] = result['manifest']
+        self.files[product_id] = result['file']
+        self.feed_patches[product_id] = feed_row(product, self.base_url, self.shipping_fee,
+                                                 self.product_urls.get(product_id))
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def watch(builder, live_reload=None, interval=WATCH_INTERVAL):
+    """مراقبة ملف المنتجات بالاستطلاع وإعادة البناء عند تغيره"""
+    signature = _file_signature(builder.products_path)
+    while True:
+        time.sleep(interval)
+        current = _file_signature(builder.products_path)
+        if current == signature:
+            continue
+        signature = current
+        if builder.build() and live_reload is not None:
+            live_reload.notify()
+
+def serve(root, port, live_reload):
+    """تشغيل خادم المعاينة في خيط خلفي"""
+    handler = functools.partial(type('Handler', (PreviewHandler,), {'live_reload': live_reload}), directory=root)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='وضع المراقبة وخادم المعاينة - سوق الإمارات')
+    parser.add_argument('--products', default=PRODUCTS_PATH, help='مسار ملف المنتجات')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='منفذ خادم المعاينة')
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL, help='فترة فحص الملف بالثواني')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N', help='عدد العمليات لتوليد الصفحات')
+    parser.add_argument('--no-serve', action='store_true', help='المراقبة وإعادة البناء فقط بدون خادم')
+    parser.add_argument('--verbose', action='store_true', help='عرض مخرجات المولدات كاملة')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    builder = SiteBuilder(args.products, args.jobs, args.verbose)
+    builder.build()
+    live_reload = None
+    if not args.no_serve:
+        live_reload = LiveReload()
+        server = serve(os.getcwd(), args.port, live_reload)
+        print(f"🌐 المعاينة على http://127.0.0.1:{server.server_address[1]}/")
+    print(f"👀 مراقبة {args.products} (Ctrl+C للإيقاف)")
+    try:
+        watch(builder, live_reload, args.interval)
+    except KeyboardInterrupt:
+        print("\n👋 تم إيقاف المراقبة")
+
+if __name__ == "__main__":
+    main()